@@ -1,19 +1,29 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from models.presentation import PresentationRequest
 from services.presentation_service import (
+    get_batch_status,
+    get_presentation_slides,
     get_presentation_status,
     get_user_stats,
     download_presentation,
-    start_presentation_generation
+    list_user_presentations,
+    start_batch_generation,
+    start_presentation_generation,
+    start_slide_edit,
+    stream_presentation_status
 )
 from pydantic import BaseModel
 from typing import Optional, List
-from utils.helpers import check_daily_limit, increment_user_count
-import cloudinary
-from utils.redis import redis_client
-from models.presentation import TopicInput, TopicSuggestion, PresentationRequest, PresentationResponse
-from utils.openai import openai_client
-import json
+from starlette.concurrency import run_in_threadpool
+from utils.deck_cache import invalidate_deck_async
+from utils.presentation_store import delete_presentation_async, get_presentation_async
+from utils.rate_limit import enforce_rate_limit, release_daily_quota_async
+from utils.slide_store import delete_slide_model_async
+from utils.storage import delete_location, get_held_files_async, release_file_async
+from config import settings
+from models.presentation import BatchPresentationRequest, SlideEdit, SlideRegenerateRequest, TopicInput, TopicSuggestion, PresentationRequest, PresentationResponse
+from utils.openai import async_openai_client
+from utils.suggestion_cache import get_or_generate_suggestions, get_suggestion_stats
 
 router = APIRouter()
 
@@ -28,15 +38,15 @@ class SuggestionRequest(BaseModel):
     industry: Optional[str] = None
     audience: Optional[str] = None
     slide_count: Optional[int] = 10
+    # Still being typed; a finished topic sets False so it is never answered for a longer one
+    partial: bool = True
 
 @router.get("/")
 async def root():
     return {"message": "Text-to-PPT API is running"}
 
-@router.post("/suggestions")
-async def get_suggestions(request: SuggestionRequest):
-    try:
-        prompt = f"""Generate 5 professional presentation topics based on: '{request.topic}'
+async def _generate_suggestions(request: SuggestionRequest) -> List[str]:
+    prompt = f"""Generate 5 professional presentation topics based on: '{request.topic}'
         
         Requirements:
         - Each topic should be specific and engaging
@@ -44,44 +54,116 @@ async def get_suggestions(request: SuggestionRequest):
         - Format each topic as a single line
         - Make topics suitable for a business presentation
         """
+    
+    if request.industry:
+        prompt += f"\nIndustry Context: {request.industry}"
+    if request.audience:
+        prompt += f"\nTarget Audience: {request.audience}"
         
-        if request.industry:
-            prompt += f"\nIndustry Context: {request.industry}"
-        if request.audience:
-            prompt += f"\nTarget Audience: {request.audience}"
-            
-        response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a professional presentation topic generator. Generate clear, specific, and engaging presentation topics."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=500,
-            temperature=0.7
+    response = await async_openai_client.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": "You are a professional presentation topic generator. Generate clear, specific, and engaging presentation topics."},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=500,
+        temperature=0.7
+    )
+    
+    suggestions = response.choices[0].message.content.strip().split('\n')
+    suggestions = [s.strip() for s in suggestions if s.strip()]
+    suggestions = [s.split('.', 1)[1].strip() if '.' in s else s for s in suggestions]
+    return suggestions[:5]
+
+def _client_address(http_request: Request) -> str:
+    return http_request.client.host if http_request.client else "unknown"
+
+@router.post("/suggestions")
+async def get_suggestions(request: SuggestionRequest, http_request: Request):
+    # Requests carry no user, so limit per client address before any LLM spend
+    await enforce_rate_limit(
+        "suggestions",
+        _client_address(http_request),
+        settings.SUGGESTION_RATE_LIMIT_PER_MINUTE,
+        settings.SUGGESTION_RATE_LIMIT_BURST
+    )
+    
+    try:
+        # Repeated and partially typed topics are answered from cache
+        suggestions = await get_or_generate_suggestions(
+            request.topic,
+            request.industry,
+            request.audience,
+            lambda: _generate_suggestions(request),
+            partial=request.partial
         )
-        
-        suggestions = response.choices[0].message.content.strip().split('\n')
-        suggestions = [s.strip() for s in suggestions if s.strip()]
-        suggestions = [s.split('.', 1)[1].strip() if '.' in s else s for s in suggestions]
-        
-        return {"suggestions": suggestions[:5]}
+        return {"suggestions": suggestions}
         
     except Exception as e:
         print(f"Error generating suggestions: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate suggestions")
 
+@router.get("/suggestions/stats")
+async def suggestion_stats():
+    return get_suggestion_stats()
+
 @router.post("/generate")
 async def generate_presentation(request: PresentationRequest):
-   print("request: ", request)
-   return await start_presentation_generation(request)
+    # Refuse before anything is queued; this also reserves one of today's presentations
+    limit = await enforce_rate_limit(
+        "generate",
+        request.user_id,
+        settings.RATE_LIMIT_PER_MINUTE,
+        settings.RATE_LIMIT_BURST,
+        daily_user=request.user_id
+    )
+    
+    try:
+        return await start_presentation_generation(request, limit.quota_day)
+    except Exception:
+        await release_daily_quota_async(request.user_id, quota_day=limit.quota_day)
+        raise
+
+@router.post("/generate/batch")
+async def generate_presentation_batch(request: BatchPresentationRequest):
+    count = len(request.items)
+    if not 0 < count <= min(settings.BATCH_MAX_SIZE, settings.MAX_PRESENTATIONS_PER_DAY):
+        raise HTTPException(
+            status_code=422,
+            detail=f"A batch holds 1 to {min(settings.BATCH_MAX_SIZE, settings.MAX_PRESENTATIONS_PER_DAY)} topics"
+        )
+    
+    # One request against the rate limit, but every deck counts towards the daily quota
+    limit = await enforce_rate_limit(
+        "generate",
+        request.user_id,
+        settings.RATE_LIMIT_PER_MINUTE,
+        settings.RATE_LIMIT_BURST,
+        daily_user=request.user_id,
+        daily_cost=count
+    )
+    
+    try:
+        return await start_batch_generation(request, limit.quota_day)
+    except Exception:
+        await release_daily_quota_async(request.user_id, count, limit.quota_day)
+        raise
+
+@router.get("/batch/{batch_id}")
+async def batch_status(batch_id: str):
+    return await get_batch_status(batch_id)
 
 @router.get("/status/{presentation_id}")
 async def status(presentation_id: str):
     return await get_presentation_status(presentation_id)
 
+@router.get("/status/{presentation_id}/events")
+async def status_events(presentation_id: str):
+    return await stream_presentation_status(presentation_id)
+
 @router.get("/download/{presentation_id}")
-async def download_presentation_endpoint(presentation_id: str):
-    return await download_presentation(presentation_id)
+async def download_presentation_endpoint(presentation_id: str, request: Request):
+    return await download_presentation(presentation_id, request)
 
 @router.get("/user/{user_id}/stats")
 async def user_stats(user_id: str):
@@ -90,37 +172,65 @@ async def user_stats(user_id: str):
 @router.delete("/presentation/{presentation_id}")
 async def delete_presentation(presentation_id: str):
     try:
-        cloudinary.uploader.destroy(f"presentations/{presentation_id}")
-        redis_client.delete(f"presentation:{presentation_id}")
+        record = await get_presentation_async(presentation_id)
+        cache_key = record.get("cache_key") if record else None
+        
+        # Stop handing the deck out to identical requests before letting go of its file
+        if cache_key:
+            await invalidate_deck_async(cache_key)
+        
+        # The current deck plus any revision an edit uploaded but never finished.
+        # Copies served from the deck cache share a file; only its last holder
+        # deletes it, from wherever it was stored rather than today's backend.
+        # Storage clients are blocking.
+        locations = await get_held_files_async(presentation_id)
+        if record and record.get("download_url"):
+            locations.add(record["download_url"])
+        for location in locations:
+            if await release_file_async(presentation_id, location):
+                await run_in_threadpool(delete_location, location)
+        await delete_presentation_async(presentation_id)
+        await delete_slide_model_async(presentation_id)
         return {"message": "Presentation deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/presentation/{presentation_id}/slides")
+async def presentation_slides(presentation_id: str):
+    return await get_presentation_slides(presentation_id)
+
+async def _limit_slide_edits(http_request: Request):
+    # Edits carry no user; limit per client address like suggestions
+    await enforce_rate_limit(
+        "slide_edit",
+        _client_address(http_request),
+        settings.SLIDE_EDIT_RATE_LIMIT_PER_MINUTE,
+        settings.SLIDE_EDIT_RATE_LIMIT_BURST
+    )
+
+@router.put("/presentation/{presentation_id}/slides/{index}", status_code=202)
+async def edit_slide(presentation_id: str, index: int, edit: SlideEdit, http_request: Request):
+    edits = edit.dict(exclude_none=True)
+    if not edits:
+        raise HTTPException(status_code=422, detail="Nothing to change; send at least one slide field")
+    
+    await _limit_slide_edits(http_request)
+    return await start_slide_edit(presentation_id, index, edits=edits)
+
+@router.post("/presentation/{presentation_id}/slides/{index}/regenerate", status_code=202)
+async def regenerate_slide(presentation_id: str, index: int, http_request: Request, request: Optional[SlideRegenerateRequest] = None):
+    await _limit_slide_edits(http_request)
+    return await start_slide_edit(presentation_id, index, instructions=request.instructions if request else None)
+
 @router.get("/presentations/{user_id}")
-async def get_user_presentations(user_id: str):
-    try:
-        presentation_keys = redis_client.keys(f"presentation:*:data")
-        presentations = []
-        
-        for key in presentation_keys:
-            data = redis_client.get(key)
-            if data:
-                presentation_data = json.loads(data)
-                if presentation_data.get("user_id") == user_id:
-                    presentation_id = key.split(":")[1]
-                    status = redis_client.get(f"presentation:{presentation_id}:status")
-                    if status:
-                        presentations.append({
-                            "id": presentation_id,
-                            "topic": presentation_data.get("topic"),
-                            "status": status,
-                            "created_at": presentation_data.get("created_at"),
-                            "slide_count": presentation_data.get("slide_count")
-                        })
-        
-        presentations.sort(key=lambda x: x["created_at"], reverse=True)
-        return presentations
-        
-    except Exception as e:
-        logger.error(f"Error getting user presentations: {e}")
-        raise HTTPException(status_code=500, detail="Failed to get user presentations")
+async def get_user_presentations(
+    user_id: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100)
+):
+    presentations, next_cursor = await list_user_presentations(user_id, cursor, limit)
+    # The body stays a plain list; the next page is requested with ?cursor=<X-Next-Cursor>
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return presentations
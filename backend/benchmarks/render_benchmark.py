@@ -0,0 +1,315 @@
+"""
+Rendering benchmark for services/presentation_generator.py.
+
+Renders decks of several sizes across every slide type with the network
+stubbed out: image providers serve one fixed local image and the OpenAI
+client returns a canned deck, so only our own code is measured (content
+parsing, image normalization, slide building and saving).
+
+Reports wall time per slide type, both rendered and spliced from the
+slide cache, and wall time, peak Python memory and .pptx size per deck
+size. Results can be stored as baselines and later
+runs checked against them; a regression beyond the tolerance exits 1.
+
+    python benchmarks/render_benchmark.py                   # print results
+    python benchmarks/render_benchmark.py --save-baseline   # write baselines.json
+    python benchmarks/render_benchmark.py --check           # fail on regressions
+
+Time checks are scaled by a calibration workload timed in the same run,
+which absorbs most machine-to-machine and load differences. Baselines are
+still best recorded on the machine (or CI runner class) that runs --check.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# Settings are read at import time; nothing below talks to Redis or OpenAI
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("IMAGE_CACHE_ENABLED", "false")
+# Deck timings measure rendering; the spliced group switches the in-process slide cache on for itself
+os.environ.setdefault("SLIDE_CACHE_ENABLED", "false")
+os.environ.setdefault("SLIDE_CACHE_SHARED", "false")
+
+from PIL import Image
+
+import services.presentation_generator as generator
+from config import settings
+from services.presentation_generator import ImagePrefetcher, SlideContent
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+DECK_SIZES = (5, 10, 20, 100)
+SLIDE_TYPES = ("title", "agenda", "content", "two_column", "section")
+
+def make_image(path: str = None) -> bytes:
+    """A fixed photo-sized JPEG, or the bytes of ``path``"""
+    if path:
+        with open(path, "rb") as f:
+            return f.read()
+    image = Image.linear_gradient("L").resize((1600, 1200)).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+def canned_deck(slide_count: int) -> Dict:
+    """A deck shaped like the model's output, cycling through every layout"""
+    slides = [
+        {"title": "Benchmark Deck", "content": [], "slide_type": "title", "layout": "content", "image_query": "title"},
+        {"title": "Agenda", "content": [f"Agenda item {i}" for i in range(5)], "slide_type": "agenda", "layout": "agenda", "image_query": "agenda"},
+    ]
+    for i in range(len(slides), slide_count):
+        if i % 7 == 0:
+            slides.append({"title": f"Section {i}", "content": [], "slide_type": "section", "layout": "content", "image_query": "section"})
+            continue
+        slides.append({
+            "title": f"Slide {i}: concise title with a clear message",
+            "content": [f"Point {j} with a realistic amount of text" for j in range(5)],
+            "slide_type": "content",
+            "layout": "two_column" if i % 3 == 0 else "content",
+            "image_query": f"query {i % 10}",
+        })
+    return {"presentation_title": "Benchmark Deck", "subtitle": "Stubbed", "slides": slides[:slide_count]}
+
+class StubOpenAI:
+    """Just enough of the OpenAI client for generate_presentation_content"""
+
+    def __init__(self):
+        self.deck = None
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        message = SimpleNamespace(content=json.dumps(self.deck))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+def install_stubs(image_bytes: bytes) -> StubOpenAI:
+    stub = StubOpenAI()
+    generator.openai_client = stub
+    generator.download_image = lambda query, width=800, height=600: io.BytesIO(image_bytes)
+    return stub
+
+def render_deck(stub: StubOpenAI, slide_count: int) -> bytes:
+    """Content parsing, image fetch and normalization, slide building and save"""
+    stub.deck = canned_deck(slide_count)
+    with contextlib.redirect_stdout(io.StringIO()):
+        slides = generator.generate_presentation_content("benchmark", slide_count)
+
+    prs = generator._new_presentation()
+    with ImagePrefetcher() as images:
+        images.submit_all(slide.image_query for slide in slides if generator._uses_slide_image(slide))
+        generator.render_slides(prs, slides, images, len(slides))
+
+    output = io.BytesIO()
+    prs.save(output)
+    return output.getvalue()
+
+class FixedImages:
+    def __init__(self, image_bytes: bytes):
+        self.image = generator.normalize_image(io.BytesIO(image_bytes), generator.SLIDE_IMAGE_WIDTH, generator.SLIDE_IMAGE_HEIGHT).getvalue()
+
+    def get(self, query):
+        return io.BytesIO(self.image)
+
+def render_slide_type(slide_type: str, count: int, images: FixedImages) -> None:
+    """Build ``count`` slides of one type; images are pre-normalized so only the builder is timed"""
+    prs = generator._new_presentation()
+    slide = SlideContent(
+        title="A concise title with a clear message",
+        content=[f"Point {j} with a realistic amount of text" for j in range(5)],
+        image_query="fixed",
+    )
+    for _ in range(count):
+        if slide_type == "title":
+            generator.create_title_slide(prs, slide.title, "Professional Presentation")
+        elif slide_type == "agenda":
+            generator.create_agenda_slide(prs, slide)
+        elif slide_type == "section":
+            generator.create_section_slide(prs, slide.title)
+        elif slide_type == "two_column":
+            generator.create_two_column_slide(prs, slide)
+        else:
+            generator.create_content_slide_with_image(prs, slide, images)
+
+def splice_slide_type(slide_type: str, count: int, images: FixedImages) -> None:
+    """Add ``count`` copies of an already rendered slide, as the slide cache does on a hit"""
+    prs = generator._new_presentation()
+    slide = SlideContent(
+        title="A concise title with a clear message",
+        content=[f"Point {j} with a realistic amount of text" for j in range(5)],
+        slide_type=slide_type if slide_type != "two_column" else "content",
+        image_query="fixed",
+        layout="two_column" if slide_type == "two_column" else "content",
+    )
+    # A slide_total of 0 keeps render_slides from adding section dividers
+    generator.render_slides(prs, [slide] * count, images, 0)
+
+def best_seconds(fn, repeats: int) -> float:
+    """Fastest of ``repeats`` runs; slower runs measure scheduler and GC noise, not our code"""
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return min(samples)
+
+def calibrate(repeats: int) -> float:
+    """
+    Time a fixed pure-Python workload (XML-heavy, like rendering). Time
+    checks are scaled by this, so a machine that is slower or busier as a
+    whole is not reported as a regression in our code.
+    """
+    from lxml import etree
+
+    def workload():
+        root = etree.Element("root")
+        for i in range(20000):
+            etree.SubElement(root, "item", index=str(i)).text = f"value {i}"
+        etree.tostring(root)
+        json.loads(json.dumps([{"key": i, "value": str(i)} for i in range(20000)]))
+
+    return best_seconds(workload, repeats)
+
+def run(repeats: int, image_bytes: bytes, sizes=DECK_SIZES) -> Dict:
+    stub = install_stubs(image_bytes)
+    images = FixedImages(image_bytes)
+    # Warm imports, the theme cache and the executor before timing
+    render_deck(stub, 5)
+
+    results = {"calibration_seconds": round(calibrate(repeats), 5), "slide_types": {}, "decks": {}}
+    per_type = 20
+    for slide_type in SLIDE_TYPES:
+        seconds = best_seconds(lambda: render_slide_type(slide_type, per_type, images), repeats)
+        results["slide_types"][slide_type] = {"ms_per_slide": round(seconds / per_type * 1000, 3)}
+
+    # Cache hits only: the first run of each type fills the in-process cache
+    results["spliced_slide_types"] = {}
+    settings.SLIDE_CACHE_ENABLED = True
+    try:
+        for slide_type in SLIDE_TYPES:
+            splice_slide_type(slide_type, 1, images)
+            seconds = best_seconds(lambda: splice_slide_type(slide_type, per_type, images), repeats)
+            results["spliced_slide_types"][slide_type] = {"ms_per_slide": round(seconds / per_type * 1000, 3)}
+    finally:
+        settings.SLIDE_CACHE_ENABLED = False
+
+    for size in sizes:
+        seconds = best_seconds(lambda: render_deck(stub, size), repeats)
+
+        # Separate pass: tracemalloc slows everything down, so it never overlaps timing
+        tracemalloc.start()
+        pptx = render_deck(stub, size)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results["decks"][str(size)] = {
+            "seconds": round(seconds, 4),
+            "ms_per_slide": round(seconds / size * 1000, 3),
+            "peak_kb": round(peak / 1024, 1),
+            "pptx_bytes": len(pptx),
+        }
+    return results
+
+# metric -> tolerance option; each is the allowed relative increase over baseline
+CHECKED_METRICS = {
+    "ms_per_slide": "time_tolerance",
+    "seconds": "time_tolerance",
+    "peak_kb": "memory_tolerance",
+    "pptx_bytes": "size_tolerance",
+}
+
+def check(results: Dict, baselines: Dict, tolerances: Dict) -> List[str]:
+    regressions = []
+    # How much slower this machine is right now than when the baselines were recorded
+    speed = results["calibration_seconds"] / baselines["calibration_seconds"]
+    # Anything measured without a baseline would otherwise pass unchecked
+    for group, entries in results.items():
+        if not isinstance(entries, dict):
+            continue
+        if not isinstance(baselines.get(group), dict):
+            regressions.append(f"{group}: no baseline recorded; run with --save-baseline")
+            continue
+        for name in entries:
+            if name not in baselines[group]:
+                regressions.append(f"{group}/{name}: no baseline recorded; run with --save-baseline")
+    for group, entries in baselines.items():
+        if not isinstance(entries, dict):
+            continue
+        for name, metrics in entries.items():
+            current = results.get(group, {}).get(name)
+            if current is None:
+                continue
+            for metric, baseline in metrics.items():
+                if metric not in CHECKED_METRICS or metric not in current:
+                    continue
+                tolerance = tolerances[CHECKED_METRICS[metric]]
+                if CHECKED_METRICS[metric] == "time_tolerance":
+                    baseline = baseline * speed
+                if current[metric] > baseline * (1 + tolerance):
+                    regressions.append(
+                        f"{group}/{name} {metric}: {current[metric]} > {baseline:.4g} "
+                        f"(+{(current[metric] / baseline - 1) * 100:.1f}%, allowed +{tolerance * 100:.0f}%)"
+                    )
+    return regressions
+
+def print_results(results: Dict) -> None:
+    print(f"calibration    {results['calibration_seconds'] * 1000:.1f} ms")
+    print()
+    print("slide type     ms/slide   spliced")
+    for slide_type, metrics in results["slide_types"].items():
+        spliced = results.get("spliced_slide_types", {}).get(slide_type, {}).get("ms_per_slide", "")
+        print(f"{slide_type:<14} {metrics['ms_per_slide']:>8} {spliced:>9}")
+    print()
+    print("deck   seconds  ms/slide   peak KiB  pptx bytes")
+    for size, metrics in results["decks"].items():
+        print(f"{size:<6} {metrics['seconds']:>7} {metrics['ms_per_slide']:>9} {metrics['peak_kb']:>10} {metrics['pptx_bytes']:>11}")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeats", type=int, default=7, help="timed runs per measurement; the fastest is kept")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DECK_SIZES), help="comma-separated deck sizes")
+    parser.add_argument("--image", help="serve this file instead of the generated test image")
+    parser.add_argument("--baselines", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baselines")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any metric regressed past its tolerance")
+    parser.add_argument("--time-tolerance", type=float, default=0.5)
+    parser.add_argument("--memory-tolerance", type=float, default=0.15)
+    parser.add_argument("--size-tolerance", type=float, default=0.05)
+    parser.add_argument("--json", help="also write the results to this path")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run(args.repeats, make_image(args.image), sizes)
+    print_results(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baselines, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"\nBaselines written to {args.baselines}")
+
+    if args.check:
+        with open(args.baselines) as f:
+            baselines = json.load(f)
+        regressions = check(results, baselines, vars(args))
+        if regressions:
+            print("\nREGRESSIONS:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nNo regressions against baselines")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from typing import Dict, Any
 from dotenv import load_dotenv
 
@@ -14,25 +15,141 @@ class Settings:
     CLOUDINARY_API_SECRET: str = os.getenv("CLOUDINARY_API_SECRET")
     PEXELS_API_KEY: str = os.getenv("PEXELS_API_KEY")
     PIXABAY_API_KEY: str = os.getenv("PIXABAY_API_KEY")
+    # Upstream endpoints, overridable to point at local stand-ins (loadtest/e2e_pipeline.py)
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL")  # None uses the client's default
+    PEXELS_API_URL: str = os.getenv("PEXELS_API_URL", "https://api.pexels.com/v1")
+    PIXABAY_API_URL: str = os.getenv("PIXABAY_API_URL", "https://pixabay.com/api")
+    UNSPLASH_SOURCE_URL: str = os.getenv("UNSPLASH_SOURCE_URL", "https://source.unsplash.com")
+    CLOUDINARY_UPLOAD_PREFIX: str = os.getenv("CLOUDINARY_UPLOAD_PREFIX")  # None uses https://api.cloudinary.com
     # Rate Limiting
+    # Token buckets: refill at the per-minute rate, hold up to the burst
     RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "5"))
-    MAX_PRESENTATIONS_PER_DAY: int = int(os.getenv("MAX_PRESENTATIONS_PER_DAY", "5"))
+    RATE_LIMIT_BURST: int = int(os.getenv("RATE_LIMIT_BURST", os.getenv("RATE_LIMIT_PER_MINUTE", "5")))
+    SUGGESTION_RATE_LIMIT_PER_MINUTE: int = int(os.getenv("SUGGESTION_RATE_LIMIT_PER_MINUTE", "30"))
+    SUGGESTION_RATE_LIMIT_BURST: int = int(os.getenv("SUGGESTION_RATE_LIMIT_BURST", "10"))
+    # Counted per UTC day when a generation is accepted; DAILY_LIMIT is the old name
+    MAX_PRESENTATIONS_PER_DAY: int = int(os.getenv("MAX_PRESENTATIONS_PER_DAY", os.getenv("DAILY_LIMIT", "5")))
     
     # Caching
     CACHE_TTL: int = int(os.getenv("CACHE_TTL", "3600"))
+    DECK_LOCK_TTL: int = int(os.getenv("DECK_LOCK_TTL", "900"))
+    # One lifetime for a presentation's record, user index entry and stored URL
+    PRESENTATION_TTL: int = int(os.getenv("PRESENTATION_TTL", str(7 * 24 * 60 * 60)))
 
     # Presentation Defaults
     DEFAULT_SLIDE_COUNT: int = int(os.getenv("DEFAULT_SLIDE_COUNT", "10"))
     MAX_SLIDE_COUNT: int = int(os.getenv("MAX_SLIDE_COUNT", "20"))
     MIN_SLIDE_COUNT: int = int(os.getenv("MIN_SLIDE_COUNT", "5"))
-    
+
+    # Image Prefetch
+    IMAGE_PREFETCH_CONCURRENCY: int = int(os.getenv("IMAGE_PREFETCH_CONCURRENCY", "8"))
+    IMAGE_PREFETCH_DEADLINE: float = float(os.getenv("IMAGE_PREFETCH_DEADLINE", "45"))
+
+    # Image Cache
+    IMAGE_CACHE_ENABLED: bool = os.getenv("IMAGE_CACHE_ENABLED", "true").lower() == "true"
+    IMAGE_CACHE_DIR: str = os.getenv("IMAGE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "ppt_image_cache"))
+    IMAGE_CACHE_MAX_BYTES: int = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+    IMAGE_CACHE_TTL: int = int(os.getenv("IMAGE_CACHE_TTL", str(7 * 24 * 60 * 60)))
+    IMAGE_CACHE_SWEEP_INTERVAL: int = int(os.getenv("IMAGE_CACHE_SWEEP_INTERVAL", "60"))
+
+    # Image Providers
+    IMAGE_PROVIDER_TIMEOUT: float = float(os.getenv("IMAGE_PROVIDER_TIMEOUT", "20"))
+    IMAGE_HEDGE_DELAY: float = float(os.getenv("IMAGE_HEDGE_DELAY", "1.5"))
+    IMAGE_HEDGE_PERCENTILE: int = int(os.getenv("IMAGE_HEDGE_PERCENTILE", "90"))
+    IMAGE_HEDGE_MIN_SAMPLES: int = int(os.getenv("IMAGE_HEDGE_MIN_SAMPLES", "10"))
+    IMAGE_HEDGE_WORKERS: int = int(os.getenv("IMAGE_HEDGE_WORKERS", "24"))
+    PROVIDER_FAILURE_THRESHOLD: int = int(os.getenv("PROVIDER_FAILURE_THRESHOLD", "3"))
+    PROVIDER_COOLDOWN: float = float(os.getenv("PROVIDER_COOLDOWN", "60"))
+    PROVIDER_LATENCY_WINDOW: int = int(os.getenv("PROVIDER_LATENCY_WINDOW", "100"))
+
+    # Image Normalization
+    IMAGE_DPI: int = int(os.getenv("IMAGE_DPI", "150"))
+    IMAGE_JPEG_QUALITY: int = int(os.getenv("IMAGE_JPEG_QUALITY", "80"))
+
+    # Outbound HTTP
+    HTTP_POOL_CONNECTIONS: int = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+    HTTP_POOL_MAXSIZE: int = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))
+    HTTP_CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+    HTTP_READ_TIMEOUT: float = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+    HTTP_MAX_RETRIES: int = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+    HTTP_BACKOFF_FACTOR: float = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.3"))
+
+    # API Clients (shared by all requests on one API process)
+    REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    REDIS_POOL_TIMEOUT: float = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+    ASYNC_HTTP_MAX_CONNECTIONS: int = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", "100"))
+    ASYNC_HTTP_MAX_KEEPALIVE: int = int(os.getenv("ASYNC_HTTP_MAX_KEEPALIVE", "20"))
+
+    # Topic Suggestions
+    SUGGESTION_CACHE_SIZE: int = int(os.getenv("SUGGESTION_CACHE_SIZE", "2048"))
+    SUGGESTION_CACHE_TTL: int = int(os.getenv("SUGGESTION_CACHE_TTL", str(24 * 60 * 60)))
+    SUGGESTION_PREFIX_MIN_CHARS: int = int(os.getenv("SUGGESTION_PREFIX_MIN_CHARS", "4"))
+    SUGGESTION_PREFIX_SCAN: int = int(os.getenv("SUGGESTION_PREFIX_SCAN", "256"))
+    SUGGESTION_LATENCY_WINDOW: int = int(os.getenv("SUGGESTION_LATENCY_WINDOW", "1000"))
+
+    # Content Generation
+    LLM_STREAMING: bool = os.getenv("LLM_STREAMING", "true").lower() == "true"
+
+    # Rendering
+    THEME_PATH: str = os.getenv("THEME_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "theme.pptx"))
+    PPTX_SPOOL_MAX_BYTES: int = int(os.getenv("PPTX_SPOOL_MAX_BYTES", str(32 * 1024 * 1024)))
+
+    # Slide Fragment Cache
+    SLIDE_CACHE_ENABLED: bool = os.getenv("SLIDE_CACHE_ENABLED", "true").lower() == "true"
+    SLIDE_CACHE_MAX_BYTES: int = int(os.getenv("SLIDE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))  # per process
+    SLIDE_CACHE_SHARED: bool = os.getenv("SLIDE_CACHE_SHARED", "true").lower() == "true"  # also keep fragments in Redis
+    SLIDE_CACHE_TTL: int = int(os.getenv("SLIDE_CACHE_TTL", str(24 * 60 * 60)))
+
+    # Generation Pipeline
+    PIPELINE_MODE: str = os.getenv("PIPELINE_MODE", "canvas")  # "canvas" (staged subtasks) or "single" (one streaming task)
+    ARTIFACT_TTL: int = int(os.getenv("ARTIFACT_TTL", "3600"))
+
+    # Batch Generation
+    BATCH_MAX_SIZE: int = int(os.getenv("BATCH_MAX_SIZE", "50"))
+    BATCH_OUTLINE_MAX_SLIDES: int = int(os.getenv("BATCH_OUTLINE_MAX_SLIDES", "20"))  # Slides requested per grouped outline completion
+
+    # Slide Editing
+    SLIDE_EDIT_RATE_LIMIT_PER_MINUTE: int = int(os.getenv("SLIDE_EDIT_RATE_LIMIT_PER_MINUTE", "20"))
+    SLIDE_EDIT_RATE_LIMIT_BURST: int = int(os.getenv("SLIDE_EDIT_RATE_LIMIT_BURST", "5"))
+    # An edit in flight blocks the next one on the same deck for at most this long
+    SLIDE_EDIT_LOCK_TTL: int = int(os.getenv("SLIDE_EDIT_LOCK_TTL", "300"))
+
+    # Status Streaming
+    SSE_HEARTBEAT_INTERVAL: float = float(os.getenv("SSE_HEARTBEAT_INTERVAL", "15"))
+
+    # File Storage
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "cloudinary")  # "cloudinary", "local" or "s3"
+    # Decks larger than this are uploaded in parts of this size (both Cloudinary and S3 need at least 5 MiB)
+    STORAGE_CHUNK_SIZE: int = int(os.getenv("STORAGE_CHUNK_SIZE", str(8 * 1024 * 1024)))
+    # Must be the same directory for the API and the workers
+    LOCAL_STORAGE_DIR: str = os.getenv("LOCAL_STORAGE_DIR", os.path.join(tempfile.gettempdir(), "ppt_presentations"))
+    # nginx internal location aliasing LOCAL_STORAGE_DIR; when set the API answers with X-Accel-Redirect and nginx sends the file
+    LOCAL_STORAGE_ACCEL_PREFIX: str = os.getenv("LOCAL_STORAGE_ACCEL_PREFIX", "")
+    S3_BUCKET: str = os.getenv("S3_BUCKET")
+    S3_ENDPOINT_URL: str = os.getenv("S3_ENDPOINT_URL")  # e.g. a MinIO server; None for AWS
+    S3_REGION: str = os.getenv("S3_REGION")
+    S3_PRESIGN_TTL: int = int(os.getenv("S3_PRESIGN_TTL", "3600"))
+
+    # Downloads
+    DOWNLOAD_MODE: str = os.getenv("DOWNLOAD_MODE", "stream")  # "stream" or "redirect"
+    DOWNLOAD_CHUNK_SIZE: int = int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(64 * 1024)))
+    DOWNLOAD_CACHE_CONTROL: str = os.getenv("DOWNLOAD_CACHE_CONTROL", "private, max-age=3600")
+
+    # Metrics
+    CELERY_METRICS_PORT: int = int(os.getenv("CELERY_METRICS_PORT", "9808"))  # 0 disables the worker exporter
+
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
-    DAILY_LIMIT: int = int(os.getenv("DAILY_LIMIT", "5"))
-    MAX_PRESENTATIONS_PER_DAY: int = int(os.getenv("MAX_PRESENTATIONS_PER_DAY", "5"))
     # Celery Configuration
     CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
     CELERY_RESULT_BACKEND: str = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
+    CELERY_PREFETCH_MULTIPLIER: int = int(os.getenv("CELERY_PREFETCH_MULTIPLIER", "1"))
+    CELERY_ACKS_LATE: bool = os.getenv("CELERY_ACKS_LATE", "true").lower() == "true"
+    CELERY_RESULT_EXPIRES: int = int(os.getenv("CELERY_RESULT_EXPIRES", "3600"))
+    # Unacked messages are redelivered after this long; must exceed the slowest task, retry countdowns included
+    CELERY_VISIBILITY_TIMEOUT: int = int(os.getenv("CELERY_VISIBILITY_TIMEOUT", "3600"))
+    CELERY_IO_CONCURRENCY: int = int(os.getenv("CELERY_IO_CONCURRENCY", "100"))
+    CELERY_CPU_CONCURRENCY: int = int(os.getenv("CELERY_CPU_CONCURRENCY", "0"))  # 0 means one process per core
     
     @classmethod
     def validate(cls) -> Dict[str, Any]:
@@ -0,0 +1,170 @@
+"""
+Concurrency load test for the API tier.
+
+Fires a fixed number of requests at one API process at several concurrency
+levels and reports throughput and latency percentiles per level. Run it
+against the same endpoint before and after a change to compare how many
+concurrent requests a single uvicorn process sustains.
+
+To make upstream latency reproducible, the script can also serve a fake
+OpenAI endpoint that answers chat completions after a fixed delay. The
+OpenAI SDK reads OPENAI_BASE_URL from the environment, so no code change is
+needed on the API side:
+
+    python loadtest/api_concurrency.py fake-openai --port 9100 --latency 0.5
+    OPENAI_BASE_URL=http://127.0.0.1:9100/v1 SUGGESTION_RATE_LIMIT_PER_MINUTE=1000000 \\
+        SUGGESTION_RATE_LIMIT_BURST=1000000 uvicorn main:app --port 8000 --workers 1
+    python loadtest/api_concurrency.py run --base-url http://127.0.0.1:8000 \\
+        --endpoint suggestions --concurrency 1,10,50 --requests 200
+
+With a blocking client every /suggestions call holds the event loop for the
+full upstream delay, so throughput stays flat as concurrency rises; with
+async clients it scales with concurrency until another limit is reached.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+import httpx
+
+ENDPOINTS = {
+    "suggestions": ("POST", "/api/v1/suggestions", {"topic": "renewable energy", "audience": "investors"}),
+    "status": ("GET", "/api/v1/status/{presentation_id}", None),
+    "user-stats": ("GET", "/api/v1/user/loadtest/stats", None),
+    "presentations": ("GET", "/api/v1/presentations/loadtest", None),
+}
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+async def run_level(client: httpx.AsyncClient, method: str, path: str, body, concurrency: int, total: int) -> Dict:
+    latencies = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                if response.status_code >= 500:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 1),
+    }
+
+async def run(args) -> List[Dict]:
+    method, path, body = ENDPOINTS[args.endpoint]
+    path = path.format(presentation_id=args.presentation_id)
+    levels = [int(level) for level in args.concurrency.split(",")]
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+
+    results = []
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        for concurrency in levels:
+            result = await run_level(client, method, path, body, concurrency, args.requests)
+            results.append(result)
+            print(
+                f"c={concurrency:<4} {result['throughput_rps']:>8} req/s  "
+                f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms  "
+                f"errors={result['errors']}",
+                flush=True,
+            )
+    return results
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    latency = 0.5
+
+    def do_POST(self):
+        length = int(self.headers.get("content-length") or 0)
+        self.rfile.read(length)
+        time.sleep(self.latency)
+        body = json.dumps({
+            "id": "chatcmpl-loadtest",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-3.5-turbo",
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": "1. First topic\n2. Second topic\n3. Third topic"},
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 would become the bottleneck under load
+    request_queue_size = 1024
+    daemon_threads = True
+
+def serve_fake_openai(args) -> None:
+    FakeOpenAIHandler.latency = args.latency
+    server = FakeOpenAIServer(("127.0.0.1", args.port), FakeOpenAIHandler)
+    print(f"Fake OpenAI on http://127.0.0.1:{args.port}/v1 answering after {args.latency}s", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="drive load against a running API process")
+    run_parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    run_parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="suggestions")
+    run_parser.add_argument("--presentation-id", default="loadtest", help="id used by the status endpoint")
+    run_parser.add_argument("--concurrency", default="1,10,50", help="comma-separated concurrency levels")
+    run_parser.add_argument("--requests", type=int, default=200, help="requests per concurrency level")
+    run_parser.add_argument("--timeout", type=float, default=60)
+    run_parser.add_argument("--output", help="write results as JSON to this path")
+
+    fake_parser = commands.add_parser("fake-openai", help="serve a fixed-latency chat completions endpoint")
+    fake_parser.add_argument("--port", type=int, default=9100)
+    fake_parser.add_argument("--latency", type=float, default=0.5)
+
+    args = parser.parse_args()
+    if args.command == "fake-openai":
+        serve_fake_openai(args)
+        return 0
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"endpoint": args.endpoint, "base_url": args.base_url, "results": results}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
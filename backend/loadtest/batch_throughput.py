@@ -0,0 +1,250 @@
+"""
+Deck throughput of the batch endpoint against independent /generate calls.
+
+Submits the same number of fresh topics either as one POST /generate/batch or
+as that many POST /generate requests, polls until every deck is completed or
+failed, and reports decks per minute. Run both modes against the same API and
+workers to compare them.
+
+The script can also serve a fake OpenAI endpoint that answers deck prompts,
+single and grouped, with valid slide JSON. Its latency is a fixed part per
+request plus a part per slide in the reply, since completion time grows with
+output tokens. ``--max-concurrent`` caps the requests answered at once, as an
+account's rate limits do; requests over the cap wait their turn. Those two
+settings decide how much grouping outlines saves. The fake also counts the
+completions it served:
+
+    python loadtest/batch_throughput.py fake-openai --port 9100 --base-latency 2 --per-slide 0.3 --max-concurrent 4
+    OPENAI_BASE_URL=http://127.0.0.1:9100/v1 RATE_LIMIT_BURST=1000 MAX_PRESENTATIONS_PER_DAY=100000 \\
+        uvicorn main:app --port 8000
+    OPENAI_BASE_URL=http://127.0.0.1:9100/v1 python -m utils.celery_worker io
+    python -m utils.celery_worker render
+    python -m utils.celery_worker default
+    python loadtest/batch_throughput.py run --mode single --topics 20 --slides 8 --fake-openai http://127.0.0.1:9100
+    python loadtest/batch_throughput.py run --mode batch --topics 20 --slides 8 --fake-openai http://127.0.0.1:9100
+"""
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import httpx
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+# How deck prompts in services/presentation_generator.py name their decks
+SINGLE_DECK = re.compile(r"with (\d+) slides about: (.*)")
+GROUPED_DECK = re.compile(r"^\s+(\d+)\. (\d+) slides about: (.*)$", re.MULTILINE)
+
+def submit_single(client: httpx.Client, topics: List[str], slides: int, user_id: str) -> List[str]:
+    ids = []
+    for topic in topics:
+        response = client.post("/api/v1/generate", json={
+            "selected_topic": topic,
+            "user_id": user_id,
+            "preferences": {"slide_count": slides},
+            "client_id": "loadtest",
+        })
+        response.raise_for_status()
+        ids.append(response.json()["presentation_id"])
+    return ids
+
+def submit_batch(client: httpx.Client, topics: List[str], slides: int, user_id: str) -> List[str]:
+    response = client.post("/api/v1/generate/batch", json={
+        "user_id": user_id,
+        "items": [{"selected_topic": topic} for topic in topics],
+        "preferences": {"slide_count": slides},
+        "client_id": "loadtest",
+    })
+    response.raise_for_status()
+    return [presentation["presentation_id"] for presentation in response.json()["presentations"]]
+
+def wait_for(client: httpx.Client, ids: List[str], poll: float, timeout: float) -> Dict[str, str]:
+    statuses = {presentation_id: "queued" for presentation_id in ids}
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for presentation_id, status in statuses.items():
+            if status not in TERMINAL_STATUSES:
+                statuses[presentation_id] = client.get(f"/api/v1/status/{presentation_id}").json().get("status", "unknown")
+        if all(status in TERMINAL_STATUSES for status in statuses.values()):
+            break
+        time.sleep(poll)
+    return statuses
+
+def fake_openai_stats(url: Optional[str]) -> Optional[Dict]:
+    if not url:
+        return None
+    return httpx.get(f"{url.rstrip('/')}/stats").json()
+
+def run(args) -> Dict:
+    run_id = uuid.uuid4().hex[:8]
+    # Fresh topics so nothing is answered from the deck cache
+    topics = [f"{args.topic} {run_id} part {index}" for index in range(args.topics)]
+    before = fake_openai_stats(args.fake_openai)
+
+    with httpx.Client(base_url=args.base_url, timeout=60) as client:
+        started = time.perf_counter()
+        submit = submit_batch if args.mode == "batch" else submit_single
+        ids = submit(client, topics, args.slides, f"loadtest-{run_id}")
+        submitted = time.perf_counter() - started
+        statuses = wait_for(client, ids, args.poll, args.timeout)
+        elapsed = time.perf_counter() - started
+
+    completed = sum(1 for status in statuses.values() if status == "completed")
+    result = {
+        "mode": args.mode,
+        "topics": args.topics,
+        "slides": args.slides,
+        "completed": completed,
+        "failed": sum(1 for status in statuses.values() if status == "failed"),
+        "unfinished": sum(1 for status in statuses.values() if status not in TERMINAL_STATUSES),
+        "submit_seconds": round(submitted, 3),
+        "seconds": round(elapsed, 3),
+        "decks_per_minute": round(completed / elapsed * 60, 2),
+    }
+    after = fake_openai_stats(args.fake_openai)
+    if before and after:
+        result["llm_requests"] = after["requests"] - before["requests"]
+    return result
+
+def fake_deck(topic: str, slides: int) -> Dict:
+    """Deck JSON as the content prompts ask for it"""
+    return {
+        "presentation_title": topic,
+        "subtitle": "Load test",
+        "slides": [
+            {
+                "title": topic if index == 0 else f"{topic}: point {index}",
+                "content": [f"Point {line} with a realistic amount of text" for line in range(5)],
+                "slide_type": "title" if index == 0 else "content",
+                "layout": "two_column" if index % 3 == 0 else "content",
+                # A few shared queries, like real decks on related topics
+                "image_query": f"business {['strategy', 'growth', 'team', 'data'][index % 4]}",
+            }
+            for index in range(slides)
+        ],
+    }
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    base_latency = 2.0
+    per_slide = 0.3
+    requests = 0
+    lock = threading.Lock()
+    slots: Optional[threading.Semaphore] = None
+
+    def do_GET(self):
+        self._send({"requests": FakeOpenAIHandler.requests})
+
+    def do_POST(self):
+        length = int(self.headers.get("content-length") or 0)
+        prompt = json.loads(self.rfile.read(length))["messages"][-1]["content"]
+        with FakeOpenAIHandler.lock:
+            FakeOpenAIHandler.requests += 1
+
+        grouped = GROUPED_DECK.findall(prompt)
+        if grouped:
+            decks = [(int(index), int(slides), topic) for index, slides, topic in grouped]
+            reply = {"presentations": [dict(fake_deck(topic, slides), index=index) for index, slides, topic in decks]}
+        else:
+            match = SINGLE_DECK.search(prompt)
+            slides, topic = (int(match.group(1)), match.group(2)) if match else (5, "topic")
+            decks = [(0, slides, topic)]
+            reply = fake_deck(topic, slides)
+
+        latency = self.base_latency + self.per_slide * sum(slides for _, slides, _ in decks)
+        if self.slots:
+            with self.slots:
+                time.sleep(latency)
+        else:
+            time.sleep(latency)
+        self._send({
+            "id": "chatcmpl-loadtest",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4",
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": json.dumps(reply)},
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        })
+
+    def _send(self, payload: Dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 would become the bottleneck under load
+    request_queue_size = 1024
+    daemon_threads = True
+
+def serve_fake_openai(args) -> None:
+    FakeOpenAIHandler.base_latency = args.base_latency
+    FakeOpenAIHandler.per_slide = args.per_slide
+    if args.max_concurrent:
+        FakeOpenAIHandler.slots = threading.Semaphore(args.max_concurrent)
+    server = FakeOpenAIServer(("127.0.0.1", args.port), FakeOpenAIHandler)
+    print(
+        f"Fake OpenAI on http://127.0.0.1:{args.port}/v1 answering after "
+        f"{args.base_latency}s + {args.per_slide}s per slide"
+        + (f", {args.max_concurrent} at a time" if args.max_concurrent else ""),
+        flush=True,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="submit decks to a running API and time them to completion")
+    run_parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    run_parser.add_argument("--mode", choices=("single", "batch"), default="batch")
+    run_parser.add_argument("--topics", type=int, default=20)
+    run_parser.add_argument("--slides", type=int, default=8)
+    run_parser.add_argument("--topic", default="Renewable energy strategy")
+    run_parser.add_argument("--poll", type=float, default=0.5)
+    run_parser.add_argument("--timeout", type=float, default=900)
+    run_parser.add_argument("--fake-openai", help="base URL of the fake OpenAI server, to count LLM requests")
+    run_parser.add_argument("--output", help="write the result as JSON to this path")
+
+    fake_parser = commands.add_parser("fake-openai", help="serve deck completions with output-proportional latency")
+    fake_parser.add_argument("--port", type=int, default=9100)
+    fake_parser.add_argument("--base-latency", type=float, default=2.0)
+    fake_parser.add_argument("--per-slide", type=float, default=0.3)
+    fake_parser.add_argument("--max-concurrent", type=int, default=0, help="requests answered at once; 0 for no limit")
+
+    args = parser.parse_args()
+    if args.command == "fake-openai":
+        serve_fake_openai(args)
+        return 0
+
+    result = run(args)
+    print(
+        f"{result['mode']}: {result['completed']}/{result['topics']} decks in {result['seconds']}s  "
+        f"{result['decks_per_minute']} decks/min"
+        + (f"  llm requests {result['llm_requests']}" if "llm_requests" in result else ""),
+        flush=True,
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,572 @@
+"""
+End-to-end load test of the generation pipeline against local stand-ins for its upstreams.
+
+``fakes`` serves OpenAI chat completions (plain and streamed), the Pexels,
+Pixabay and Unsplash image APIs and Cloudinary's upload API from one local
+port. Each upstream answers after a latency drawn from a lognormal
+distribution around a median, and fails a share of requests with a 5xx, so
+LLM retries, provider hedging and circuit breakers and upload errors are
+exercised as they would be against the real services. Completions take a
+fixed part plus a part per slide, since their time grows with output tokens.
+Decks get image queries of their own unless ``--shared-images`` is given, so
+image fetches are not all answered from the image cache.
+
+``env`` prints the settings that point the API and workers at the fakes and
+lift the rate limits. ``run`` submits decks to POST /generate at a target
+rate for a while, polls GET /status for each until it finishes, and reports
+throughput plus p50/p95/p99 of admission, queue wait (queued_at to
+started_at on the record) and end to end latency (queued_at to
+finished_at). Given the workers' metrics exporters it also diffs their stage
+and image provider histograms over the run and reports the same percentiles
+per stage, interpolated within buckets as Prometheus' histogram_quantile
+does. Pass one exporter per PROMETHEUS_MULTIPROC_DIR so nothing is counted
+twice.
+
+    python loadtest/e2e_pipeline.py fakes --port 9300 --openai-latency 2 --openai-per-slide 0.3 \\
+        --pexels-latency 0.4 --pexels-error-rate 0.05 --cloudinary-latency 0.5
+    eval "$(python loadtest/e2e_pipeline.py env --fakes http://127.0.0.1:9300)"
+    uvicorn main:app --port 8000
+    python -m utils.celery_worker io
+    python -m utils.celery_worker render
+    python loadtest/e2e_pipeline.py run --rps 0.5 --duration 120 --slides 8 \\
+        --fakes http://127.0.0.1:9300 \\
+        --metrics http://127.0.0.1:9808/metrics --metrics http://127.0.0.1:9809/metrics
+
+All commands run from backend/.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from typing import Dict, List, Optional
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from batch_throughput import GROUPED_DECK, SINGLE_DECK, TERMINAL_STATUSES, fake_deck
+
+UPSTREAMS = ("openai", "pexels", "pixabay", "unsplash", "cloudinary")
+
+# Histograms reported per label value: (metric, label)
+HISTOGRAMS = (
+    ("presentation_stage_seconds", "stage"),
+    ("image_provider_request_seconds", "provider"),
+)
+
+class Upstream:
+    """Latency and error behaviour of one faked service"""
+
+    def __init__(self, name: str, latency: float, sigma: float, error_rate: float, max_concurrent: int = 0):
+        self.name = name
+        self.latency = latency
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.slots = threading.Semaphore(max_concurrent) if max_concurrent else None
+        self.requests = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def delay(self, extra: float = 0.0) -> float:
+        median = self.latency + extra
+        if median <= 0:
+            return 0.0
+        return random.lognormvariate(math.log(median), self.sigma) if self.sigma else median
+
+    def answer(self, extra: float = 0.0) -> bool:
+        """Wait out one request's latency; False if the request should fail"""
+        failed = random.random() < self.error_rate
+        with self.lock:
+            self.requests += 1
+            self.errors += failed
+        if self.slots:
+            with self.slots:
+                time.sleep(self.delay(extra))
+        else:
+            time.sleep(self.delay(extra))
+        return not failed
+
+    def stats(self) -> Dict:
+        return {"requests": self.requests, "errors": self.errors}
+
+def _fake_photo() -> bytes:
+    from PIL import Image
+
+    # Noise compresses like a photo, so downloads and normalization cost what real ones do
+    image = BytesIO()
+    Image.effect_noise((800, 600), 48).convert("RGB").save(image, "JPEG", quality=85)
+    return image.getvalue()
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    upstreams: Dict[str, Upstream] = {}
+    per_slide = 0.3
+    shared_images = False
+    photo = b""
+    uploads = 0
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/stats":
+            self._send_json({name: upstream.stats() for name, upstream in self.upstreams.items()})
+        elif path.startswith("/pexels/v1/search"):
+            if self._answer("pexels"):
+                self._send_json({"photos": [{"src": {"medium": f"{self._base()}/pexels/media/photo.jpg"}}]})
+        elif path.startswith("/pixabay/api"):
+            if self._answer("pixabay"):
+                self._send_json({"hits": [{"webformatURL": f"{self._base()}/pixabay/media/photo.jpg"}]})
+        elif path.startswith(("/pexels/media/", "/pixabay/media/", "/unsplash/")):
+            if self._answer(path.split("/")[1]):
+                self._send(self.photo, "image/jpeg")
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        length = int(self.headers.get("content-length") or 0)
+        body = self.rfile.read(length)
+        path = self.path.split("?", 1)[0]
+        if path.startswith("/openai/"):
+            self._complete(json.loads(body))
+        elif path.startswith("/cloudinary/") and path.endswith("/upload"):
+            if self._answer("cloudinary"):
+                with FakeUpstreamHandler.upstreams["cloudinary"].lock:
+                    FakeUpstreamHandler.uploads += 1
+                    public_id = f"presentations/loadtest-{FakeUpstreamHandler.uploads}"
+                self._send_json({
+                    "public_id": public_id,
+                    "resource_type": "raw",
+                    "bytes": length,
+                    "secure_url": f"{self._base()}/cloudinary/raw/upload/v1/{public_id}",
+                })
+        elif path.startswith("/cloudinary/") and path.endswith("/destroy"):
+            if self._answer("cloudinary"):
+                self._send_json({"result": "ok"})
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def _complete(self, request: Dict) -> None:
+        prompt = request["messages"][-1]["content"]
+        grouped = GROUPED_DECK.findall(prompt)
+        if grouped:
+            decks = [(int(index), int(slides), topic) for index, slides, topic in grouped]
+            reply = {"presentations": [dict(self._deck(topic, slides), index=index) for index, slides, topic in decks]}
+        else:
+            match = SINGLE_DECK.search(prompt)
+            slides, topic = (int(match.group(1)), match.group(2)) if match else (5, "topic")
+            decks = [(0, slides, topic)]
+            reply = self._deck(topic, slides)
+
+        upstream = self.upstreams["openai"]
+        latency = upstream.delay(self.per_slide * sum(slides for _, slides, _ in decks))
+        failed = random.random() < upstream.error_rate
+        with upstream.lock:
+            upstream.requests += 1
+            upstream.errors += failed
+        content = json.dumps(reply)
+
+        if upstream.slots:
+            upstream.slots.acquire()
+        try:
+            if failed:
+                time.sleep(latency)
+                self._send_json({"error": {"message": "Injected failure", "type": "server_error"}}, 500)
+            elif request.get("stream"):
+                self._stream(content, latency)
+            else:
+                time.sleep(latency)
+                self._send_json({
+                    "id": "chatcmpl-loadtest",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "gpt-4"),
+                    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+                })
+        finally:
+            if upstream.slots:
+                upstream.slots.release()
+
+    def _stream(self, content: str, latency: float) -> None:
+        """Send the reply as server-sent chunks spread over the latency, like tokens arriving"""
+        pieces = [content[start:start + 64] for start in range(0, len(content), 64)]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for index, piece in enumerate(pieces + [None]):
+            time.sleep(latency / (len(pieces) + 1))
+            chunk = {
+                "id": "chatcmpl-loadtest",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": "gpt-4",
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": piece} if piece is not None else {},
+                    "finish_reason": None if piece is not None else "stop",
+                }],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _deck(self, topic: str, slides: int) -> Dict:
+        deck = fake_deck(topic, slides)
+        if not self.shared_images:
+            for slide in deck["slides"]:
+                slide["image_query"] = f"{slide['image_query']} {topic}"
+        return deck
+
+    def _answer(self, name: str) -> bool:
+        if self.upstreams[name].answer():
+            return True
+        self._send_json({"error": {"message": "Injected failure"}}, 503 if name != "cloudinary" else 500)
+        return False
+
+    def _base(self) -> str:
+        return f"http://{self.headers.get('Host')}"
+
+    def _send_json(self, payload: Dict, status: int = 200) -> None:
+        self._send(json.dumps(payload).encode(), "application/json", status)
+
+    def _send(self, body: bytes, content_type: str, status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeUpstreamServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 would become the bottleneck under load
+    request_queue_size = 1024
+    daemon_threads = True
+
+def serve_fakes(args) -> None:
+    FakeUpstreamHandler.upstreams = {
+        name: Upstream(
+            name,
+            getattr(args, f"{name}_latency"),
+            getattr(args, f"{name}_sigma"),
+            getattr(args, f"{name}_error_rate"),
+            args.openai_max_concurrent if name == "openai" else 0,
+        )
+        for name in UPSTREAMS
+    }
+    FakeUpstreamHandler.per_slide = args.openai_per_slide
+    FakeUpstreamHandler.shared_images = args.shared_images
+    FakeUpstreamHandler.photo = _fake_photo()
+    server = FakeUpstreamServer(("127.0.0.1", args.port), FakeUpstreamHandler)
+    print(f"Fake upstreams on http://127.0.0.1:{args.port}", flush=True)
+    for name, upstream in FakeUpstreamHandler.upstreams.items():
+        extra = f" + {args.openai_per_slide}s per slide" if name == "openai" else ""
+        print(f"  {name:<10} median {upstream.latency}s{extra}, sigma {upstream.sigma}, errors {upstream.error_rate:.0%}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+def fake_env(fakes: str) -> Dict[str, str]:
+    fakes = fakes.rstrip("/")
+    return {
+        "OPENAI_BASE_URL": f"{fakes}/openai/v1",
+        "OPENAI_API_KEY": "loadtest",
+        "PEXELS_API_URL": f"{fakes}/pexels/v1",
+        "PEXELS_API_KEY": "loadtest",
+        "PIXABAY_API_URL": f"{fakes}/pixabay/api",
+        "PIXABAY_API_KEY": "loadtest",
+        "UNSPLASH_SOURCE_URL": f"{fakes}/unsplash",
+        "CLOUDINARY_UPLOAD_PREFIX": f"{fakes}/cloudinary",
+        "CLOUDINARY_CLOUD_NAME": "loadtest",
+        "CLOUDINARY_API_KEY": "loadtest",
+        "CLOUDINARY_API_SECRET": "loadtest",
+        # Every deck is submitted by its own user; the per-client bucket still needs room
+        "RATE_LIMIT_PER_MINUTE": "1000000",
+        "RATE_LIMIT_BURST": "1000000",
+        "MAX_PRESENTATIONS_PER_DAY": "1000000",
+    }
+
+def percentiles(values: List[float]) -> Optional[Dict]:
+    if not values:
+        return None
+    if len(values) == 1:
+        cuts = [values[0]] * 99
+    else:
+        cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "count": len(values),
+        "p50": round(cuts[49], 3),
+        "p95": round(cuts[94], 3),
+        "p99": round(cuts[98], 3),
+    }
+
+def scrape_histograms(urls: List[str]) -> Dict:
+    """Cumulative bucket counts by (metric, label value, upper bound), summed over the other labels"""
+    buckets = defaultdict(float)
+    for url in urls:
+        text = httpx.get(url, timeout=10).text
+        for family in text_string_to_metric_families(text):
+            for metric, label in HISTOGRAMS:
+                if family.name != metric:
+                    continue
+                for sample in family.samples:
+                    if sample.name == f"{metric}_bucket":
+                        buckets[(metric, sample.labels.get(label, ""), float(sample.labels["le"]))] += sample.value
+    return buckets
+
+def histogram_quantile(q: float, buckets: List[tuple]) -> Optional[float]:
+    """Estimate a quantile from sorted (upper bound, cumulative count) pairs"""
+    total = buckets[-1][1]
+    if not total:
+        return None
+    rank = q * total
+    lower, below = 0.0, 0.0
+    for upper, count in buckets:
+        if count >= rank:
+            if math.isinf(upper):
+                # Beyond the last finite bucket; all that is known is the bound
+                return lower
+            if count == below:
+                return upper
+            return lower + (upper - lower) * (rank - below) / (count - below)
+        lower, below = upper, count
+    return lower
+
+def histogram_percentiles(before: Dict, after: Dict) -> Dict:
+    series = defaultdict(list)
+    for (metric, value, upper), count in after.items():
+        series[(metric, value)].append((upper, count - before.get((metric, value, upper), 0.0)))
+
+    report = defaultdict(dict)
+    for (metric, value), buckets in sorted(series.items()):
+        buckets.sort()
+        if not buckets[-1][1]:
+            continue
+        report[metric][value] = {
+            "count": int(buckets[-1][1]),
+            **{f"p{int(q * 100)}": round(histogram_quantile(q, buckets), 3) for q in (0.5, 0.95, 0.99)},
+        }
+    return dict(report)
+
+def submit_deck(client: httpx.Client, topic: str, slides: int, user_id: str) -> Dict:
+    started = time.perf_counter()
+    try:
+        response = client.post("/api/v1/generate", json={
+            "selected_topic": topic,
+            "user_id": user_id,
+            "preferences": {"slide_count": slides},
+            "client_id": "loadtest",
+        })
+        status_code = response.status_code
+        presentation_id = response.json().get("presentation_id") if status_code == 200 else None
+    except httpx.HTTPError as e:
+        status_code, presentation_id = type(e).__name__, None
+    return {"presentation_id": presentation_id, "status_code": status_code, "seconds": time.perf_counter() - started}
+
+class StatusPoller(threading.Thread):
+    """Polls GET /status for every accepted deck until it completes or fails"""
+
+    def __init__(self, client: httpx.Client, poll: float):
+        super().__init__(daemon=True)
+        self.client = client
+        self.poll = poll
+        self.pending: List[str] = []
+        self.finished: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+
+    def add(self, presentation_id: str) -> None:
+        with self.lock:
+            self.pending.append(presentation_id)
+
+    def run(self) -> None:
+        while not self.stopping.is_set():
+            with self.lock:
+                pending = list(self.pending)
+            for presentation_id in pending:
+                try:
+                    record = self.client.get(f"/api/v1/status/{presentation_id}").json()
+                except (httpx.HTTPError, ValueError):
+                    continue
+                if record.get("status") in TERMINAL_STATUSES:
+                    with self.lock:
+                        self.pending.remove(presentation_id)
+                        self.finished[presentation_id] = record
+            self.stopping.wait(self.poll)
+
+    def outstanding(self) -> int:
+        with self.lock:
+            return len(self.pending)
+
+def fake_stats(fakes: Optional[str]) -> Optional[Dict]:
+    if not fakes:
+        return None
+    return httpx.get(f"{fakes.rstrip('/')}/stats", timeout=10).json()
+
+def run(args) -> Dict:
+    run_id = uuid.uuid4().hex[:8]
+    total = max(1, int(args.rps * args.duration))
+    metrics_before = scrape_histograms(args.metrics)
+    upstreams_before = fake_stats(args.fakes)
+
+    limits = httpx.Limits(max_connections=args.clients + 1, max_keepalive_connections=args.clients + 1)
+    with httpx.Client(base_url=args.base_url, timeout=60, limits=limits) as client, \
+            ThreadPoolExecutor(max_workers=args.clients) as pool:
+        poller = StatusPoller(client, args.poll)
+        poller.start()
+
+        def submit(index: int) -> Dict:
+            # Fresh topics and users so nothing comes from the deck cache or hits a per-user limit
+            result = submit_deck(client, f"{args.topic} {run_id} part {index}", args.slides, f"loadtest-{run_id}-{index}")
+            if result["presentation_id"]:
+                poller.add(result["presentation_id"])
+            return result
+
+        started = time.monotonic()
+        arrival = 0.0
+        futures = []
+        for index in range(total):
+            delay = started + arrival - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(submit, index))
+            arrival += random.expovariate(args.rps) if args.arrivals == "poisson" else 1 / args.rps
+        submissions = [future.result() for future in futures]
+        submitted = time.monotonic() - started
+
+        deadline = time.monotonic() + args.timeout
+        while poller.outstanding() and time.monotonic() < deadline:
+            time.sleep(args.poll)
+        poller.stopping.set()
+        poller.join()
+
+    records = list(poller.finished.values())
+    completed = [record for record in records if record["status"] == "completed"]
+    timed = [record for record in completed if record.get("queued_at") and record.get("finished_at")]
+    rejected = defaultdict(int)
+    for submission in submissions:
+        if not submission["presentation_id"]:
+            rejected[str(submission["status_code"])] += 1
+
+    result = {
+        "target_rps": args.rps,
+        "arrivals": args.arrivals,
+        "duration": args.duration,
+        "slides": args.slides,
+        "submitted": total,
+        "achieved_rps": round(total / submitted, 3) if submitted else None,
+        "accepted": total - sum(rejected.values()),
+        "rejected": dict(rejected),
+        "completed": len(completed),
+        "failed": sum(1 for record in records if record["status"] == "failed"),
+        "unfinished": poller.outstanding(),
+        "admission_seconds": percentiles([submission["seconds"] for submission in submissions]),
+        "queue_wait_seconds": percentiles([
+            record["started_at"] - record["queued_at"]
+            for record in completed if record.get("queued_at") and record.get("started_at")
+        ]),
+        "end_to_end_seconds": percentiles([record["finished_at"] - record["queued_at"] for record in timed]),
+    }
+    if timed:
+        # Server-side clock from the first admission to the last completion
+        span = max(record["finished_at"] for record in timed) - min(record["queued_at"] for record in timed)
+        result["decks_per_minute"] = round(len(timed) / span * 60, 2) if span else None
+
+    if args.metrics:
+        histograms = histogram_percentiles(metrics_before, scrape_histograms(args.metrics))
+        result["stage_seconds"] = histograms.get("presentation_stage_seconds", {})
+        result["image_provider_seconds"] = histograms.get("image_provider_request_seconds", {})
+
+    upstreams_after = fake_stats(args.fakes)
+    if upstreams_before and upstreams_after:
+        result["upstream_requests"] = {
+            name: {key: stats[key] - upstreams_before[name][key] for key in stats}
+            for name, stats in upstreams_after.items()
+        }
+    return result
+
+def _format_percentiles(name: str, values: Optional[Dict]) -> str:
+    if not values:
+        return f"  {name:<24} -"
+    return f"  {name:<24} n={values['count']:<5} p50 {values['p50']:>8}s  p95 {values['p95']:>8}s  p99 {values['p99']:>8}s"
+
+def print_report(result: Dict) -> None:
+    print(
+        f"{result['submitted']} decks at {result['achieved_rps']}/s (target {result['target_rps']}/s): "
+        f"{result['completed']} completed, {result['failed']} failed, {result['unfinished']} unfinished"
+        + (f", rejected {result['rejected']}" if result["rejected"] else ""),
+        flush=True,
+    )
+    if result.get("decks_per_minute"):
+        print(f"  throughput {result['decks_per_minute']} decks/min", flush=True)
+    print(_format_percentiles("admission", result["admission_seconds"]), flush=True)
+    print(_format_percentiles("queue wait", result["queue_wait_seconds"]), flush=True)
+    print(_format_percentiles("end to end", result["end_to_end_seconds"]), flush=True)
+    for stage, values in result.get("stage_seconds", {}).items():
+        print(_format_percentiles(f"stage {stage}", values), flush=True)
+    for provider, values in result.get("image_provider_seconds", {}).items():
+        print(_format_percentiles(f"provider {provider}", values), flush=True)
+    for name, stats in result.get("upstream_requests", {}).items():
+        print(f"  {name:<24} {stats['requests']} requests, {stats['errors']} injected errors", flush=True)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="submit decks at a target rate and report latency percentiles")
+    run_parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    run_parser.add_argument("--rps", type=float, default=0.5, help="decks submitted per second")
+    run_parser.add_argument("--duration", type=float, default=60, help="seconds to keep submitting")
+    run_parser.add_argument("--arrivals", choices=("uniform", "poisson"), default="poisson")
+    run_parser.add_argument("--slides", type=int, default=8)
+    run_parser.add_argument("--topic", default="Renewable energy strategy")
+    run_parser.add_argument("--clients", type=int, default=32, help="concurrent POST /generate requests at most")
+    run_parser.add_argument("--poll", type=float, default=0.5)
+    run_parser.add_argument("--timeout", type=float, default=900, help="seconds to wait for decks after the last submission")
+    run_parser.add_argument("--metrics", action="append", default=[], help="a worker's metrics URL; repeat for each exporter")
+    run_parser.add_argument("--fakes", help="base URL of the fake upstreams, to count the requests they served")
+    run_parser.add_argument("--output", help="write the result as JSON to this path")
+
+    fakes_parser = commands.add_parser("fakes", help="serve OpenAI, image provider and Cloudinary stand-ins")
+    fakes_parser.add_argument("--port", type=int, default=9300)
+    fakes_parser.add_argument("--shared-images", action="store_true", help="reuse four image queries across all decks")
+    fakes_parser.add_argument("--openai-per-slide", type=float, default=0.3, help="completion seconds added per slide")
+    fakes_parser.add_argument("--openai-max-concurrent", type=int, default=0, help="completions answered at once; 0 for no limit")
+    defaults = {"openai": 2.0, "pexels": 0.3, "pixabay": 0.4, "unsplash": 0.6, "cloudinary": 0.5}
+    for name in UPSTREAMS:
+        fakes_parser.add_argument(f"--{name}-latency", type=float, default=defaults[name], help=f"median seconds per {name} request")
+        fakes_parser.add_argument(f"--{name}-sigma", type=float, default=0.4, help="lognormal spread; 0 for a fixed latency")
+        fakes_parser.add_argument(f"--{name}-error-rate", type=float, default=0.0, help="share of requests answered with a 5xx")
+
+    env_parser = commands.add_parser("env", help="print exports pointing the API and workers at the fakes")
+    env_parser.add_argument("--fakes", default="http://127.0.0.1:9300")
+
+    args = parser.parse_args()
+    if args.command == "fakes":
+        serve_fakes(args)
+        return 0
+    if args.command == "env":
+        for name, value in fake_env(args.fakes).items():
+            print(f"export {name}={value}")
+        return 0
+
+    result = run(args)
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+Throughput test for the Celery worker profiles in utils/celery_worker.py.
+
+Queues a batch of probe tasks on one profile's queue and reports how many
+complete per second. Two probes stand in for the two kinds of pipeline work:
+
+  io      an HTTP GET through the shared requests session against an
+          upstream that answers after a fixed delay, like an image provider
+  render  build and save an N-slide deck with a fixed local image
+
+Start the probe upstream (for io), a worker with the probes included, then
+queue the batch. Extra worker options after the profile name override the
+profile, e.g. to compare pools:
+
+    python loadtest/worker_profiles.py upstream --port 9200 --latency 0.3
+    python -m utils.celery_worker io --include loadtest.worker_profiles
+    python -m utils.celery_worker io --include loadtest.worker_profiles --pool prefork --concurrency 4
+    python loadtest/worker_profiles.py run --profile io --tasks 500
+
+    python -m utils.celery_worker render --include loadtest.worker_profiles
+    python loadtest/worker_profiles.py run --profile render --tasks 50 --slides 20
+
+All commands run from backend/ with the same CELERY_BROKER_URL and
+CELERY_RESULT_BACKEND as the worker.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from celery import shared_task
+from celery.result import ResultSet
+
+# Importing the worker module also configures the Celery app, so the probes
+# publish with its broker and results come back through its backend
+from utils.celery_worker import WORKER_PROFILES
+
+@shared_task(name='loadtest.io_probe')
+def io_probe(url: str) -> float:
+    from utils.http import HTTP_TIMEOUT, get_http_session
+
+    started = time.perf_counter()
+    response = get_http_session().get(url, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+@shared_task(name='loadtest.render_probe')
+def render_probe(slide_count: int) -> float:
+    from PIL import Image
+    from services.presentation_generator import PreloadedImages, SlideContent, build_presentation
+
+    image = BytesIO()
+    Image.linear_gradient("L").resize((600, 450)).convert("RGB").save(image, "JPEG", quality=80)
+
+    slides = [SlideContent(title="Load test", content=[], slide_type="title")]
+    slides += [
+        SlideContent(
+            title=f"Slide {i}",
+            content=[f"Point {j} with a realistic amount of text" for j in range(5)],
+            image_query="probe",
+            layout="two_column" if i % 3 == 0 else "content",
+        )
+        for i in range(1, slide_count)
+    ]
+
+    started = time.perf_counter()
+    prs = build_presentation(slides, PreloadedImages({"probe": image.getvalue(), "thank you business meeting": image.getvalue()}))
+    prs.save(BytesIO())
+    return time.perf_counter() - started
+
+def run(args) -> dict:
+    profile = WORKER_PROFILES[args.profile]
+    queue = profile["queues"][0]
+    if args.profile == "render":
+        signature = render_probe.s(args.slides)
+    else:
+        signature = io_probe.s(args.upstream)
+
+    started = time.perf_counter()
+    results = ResultSet([signature.clone().apply_async(queue=queue) for _ in range(args.tasks)])
+    # One subscription for the whole batch; per-result get() would measure this script instead of the worker
+    task_seconds = results.join_native(timeout=args.timeout)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "profile": args.profile,
+        "queue": queue,
+        "tasks": args.tasks,
+        "seconds": round(elapsed, 3),
+        "throughput_tps": round(args.tasks / elapsed, 2),
+        "task_mean_ms": round(statistics.mean(task_seconds) * 1000, 1),
+    }
+
+class ProbeUpstreamHandler(BaseHTTPRequestHandler):
+    latency = 0.3
+    body = b""
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+class ProbeUpstreamServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 would become the bottleneck under load
+    request_queue_size = 1024
+    daemon_threads = True
+
+def serve_upstream(args) -> None:
+    ProbeUpstreamHandler.latency = args.latency
+    ProbeUpstreamHandler.body = os.urandom(args.bytes)
+    server = ProbeUpstreamServer(("127.0.0.1", args.port), ProbeUpstreamHandler)
+    print(f"Probe upstream on http://127.0.0.1:{args.port}/ answering after {args.latency}s", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="queue probe tasks for a running worker and time them")
+    run_parser.add_argument("--profile", choices=("io", "render"), default="io")
+    run_parser.add_argument("--tasks", type=int, default=500)
+    run_parser.add_argument("--upstream", default="http://127.0.0.1:9200/", help="URL the io probe fetches")
+    run_parser.add_argument("--slides", type=int, default=20, help="deck size for the render probe")
+    run_parser.add_argument("--timeout", type=float, default=600)
+    run_parser.add_argument("--output", help="write the result as JSON to this path")
+
+    upstream_parser = commands.add_parser("upstream", help="serve a fixed-latency HTTP endpoint for the io probe")
+    upstream_parser.add_argument("--port", type=int, default=9200)
+    upstream_parser.add_argument("--latency", type=float, default=0.3)
+    upstream_parser.add_argument("--bytes", type=int, default=100 * 1024, help="response size, roughly one image")
+
+    args = parser.parse_args()
+    if args.command == "upstream":
+        serve_upstream(args)
+        return 0
+
+    result = run(args)
+    print(
+        f"{result['profile']}: {result['tasks']} tasks in {result['seconds']}s  "
+        f"{result['throughput_tps']} tasks/s  mean task {result['task_mean_ms']}ms",
+        flush=True,
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
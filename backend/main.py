@@ -1,9 +1,13 @@
 # main.py
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 from api.presentation import router as presentation_router
+from utils.http import close_async_http_client
+from utils.metrics import render_metrics
+from utils.openai import async_openai_client
+from utils.redis import async_pubsub_client, async_redis_client
 
 # Logging setup
 logging.basicConfig(level=logging.INFO)
@@ -16,6 +20,10 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info("Shutting down...")
+    await close_async_http_client()
+    await async_openai_client.close()
+    await async_redis_client.aclose()
+    await async_pubsub_client.aclose()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -26,11 +34,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
 app.include_router(presentation_router, prefix="/api/v1")
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    content, content_type = render_metrics()
+    return Response(content=content, headers={"Content-Type": content_type})
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -34,3 +34,37 @@ class PresentationResponse(BaseModel):
     download_url: Optional[str] = None
     slides_preview: Optional[List[Dict]] = None
     error: Optional[str] = None
+
+class BatchItem(BaseModel):
+    selected_topic: str
+    preferences: Optional[Dict[str, Any]] = None
+
+class BatchPresentationRequest(BaseModel):
+    user_id: str
+    items: List[BatchItem]
+    # Defaults for every item; an item's own preferences win
+    preferences: Optional[Dict[str, Any]] = {}
+    client_id: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    batch_id: str
+    status: str
+    total: int
+    presentations: List[PresentationResponse]
+
+class SlideEdit(BaseModel):
+    # Fields left out keep their current value
+    title: Optional[str] = None
+    content: Optional[List[str]] = None
+    slide_type: Optional[str] = None
+    layout: Optional[str] = None
+    image_query: Optional[str] = None
+
+class SlideRegenerateRequest(BaseModel):
+    instructions: Optional[str] = None
+
+class SlideRevisionResponse(BaseModel):
+    presentation_id: str
+    index: int
+    revision: int
+    edit_status: str
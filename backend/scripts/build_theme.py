@@ -0,0 +1,115 @@
+"""
+Build assets/theme.pptx, the master the slide builders render onto.
+
+Fonts, sizes, colours, alignment and spacing live on the layout
+placeholders here, so the builders in services/presentation_generator.py
+only fill in text. Edit the LAYOUTS table and re-run after changing the
+look of a slide type:
+
+    python scripts/build_theme.py
+"""
+import os
+import sys
+
+from lxml import etree
+from pptx import Presentation
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+from pptx.util import Inches
+
+OUTPUT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "theme.pptx")
+
+TITLE_COLOR = "1F4E79"
+TEXT_COLOR = "404040"
+FONT = "Calibri"
+
+def title(x, y, w, h, size, align="l", ph_type="title", insets=None, anchor="t"):
+    return dict(ph_type=ph_type, idx=None, box=(x, y, w, h), size=size, bold=True,
+                color=TITLE_COLOR, align=align, space_after=0, insets=insets, anchor=anchor)
+
+def body(idx, x, y, w, h, size, space_after, align="l", ph_type="body", anchor="t"):
+    return dict(ph_type=ph_type, idx=idx, box=(x, y, w, h), size=size, bold=False,
+                color=TEXT_COLOR, align=align, space_after=space_after, insets=None, anchor=anchor)
+
+# Layout name -> placeholders, in the order python-pptx clones them onto a slide.
+# Geometry and styles reproduce the text boxes the builders used to draw by hand.
+LAYOUTS = [
+    ("Title Slide", [
+        title(0.75, 2.33, 8.5, 1.61, 54, align="ctr", ph_type="ctrTitle", insets=(0.5, 0.5), anchor=None),
+        body(1, 1.5, 4.25, 7, 1.92, 24, 0, align="ctr", ph_type="subTitle"),
+    ]),
+    ("Agenda", [
+        title(0.5, 0.5, 9, 1, 36),
+        body(1, 1.5, 2, 7, 4.5, 20, 12),
+    ]),
+    ("Content with Image", [
+        title(0.5, 0.5, 9, 1, 36),
+        body(1, 0.5, 2, 4.5, 4.5, 18, 8),
+    ]),
+    ("Two Column", [
+        title(0.5, 0.8, 9, 1, 36),
+        body(1, 0.5, 2, 4.5, 4.5, 16, 8),
+        body(2, 5, 2, 4.5, 4.5, 16, 8),
+    ]),
+    ("Section", [
+        title(1, 3, 8, 2, 48, align="ctr"),
+    ]),
+]
+
+def placeholder_xml(shape_id: int, spec: dict) -> str:
+    x, y, w, h = (Inches(value) for value in spec["box"])
+    idx = f' idx="{spec["idx"]}"' if spec["idx"] is not None else ""
+
+    body_attrs = ' wrap="square"'
+    if spec["insets"]:
+        left, right = spec["insets"]
+        body_attrs += f' lIns="{Inches(left)}" rIns="{Inches(right)}"'
+    if spec["anchor"]:
+        body_attrs += f' anchor="{spec["anchor"]}"'
+
+    bold = ' b="1"' if spec["bold"] else ' b="0"'
+    return (
+        f'<p:sp {nsdecls("p", "a")}>'
+        f'<p:nvSpPr><p:cNvPr id="{shape_id}" name="{spec["ph_type"].title()} {shape_id}"/>'
+        f'<p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr>'
+        f'<p:nvPr><p:ph type="{spec["ph_type"]}"{idx}/></p:nvPr></p:nvSpPr>'
+        f'<p:spPr><a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{w}" cy="{h}"/></a:xfrm></p:spPr>'
+        f'<p:txBody><a:bodyPr{body_attrs}><a:noAutofit/></a:bodyPr>'
+        f'<a:lstStyle><a:lvl1pPr marL="0" indent="0" algn="{spec["align"]}">'
+        f'<a:lnSpc><a:spcPct val="100000"/></a:lnSpc>'
+        f'<a:spcBef><a:spcPts val="0"/></a:spcBef>'
+        f'<a:spcAft><a:spcPts val="{spec["space_after"] * 100}"/></a:spcAft>'
+        f'<a:buNone/>'
+        f'<a:defRPr sz="{spec["size"] * 100}"{bold}>'
+        f'<a:solidFill><a:srgbClr val="{spec["color"]}"/></a:solidFill>'
+        f'<a:latin typeface="{FONT}"/></a:defRPr>'
+        f'</a:lvl1pPr></a:lstStyle>'
+        f'<a:p><a:r><a:rPr lang="en-US"/><a:t>{spec["ph_type"].title()}</a:t></a:r></a:p>'
+        f'</p:txBody></p:sp>'
+    )
+
+def rewrite_layout(layout, name: str, placeholders) -> None:
+    element = layout._element
+    element.attrib.pop("type", None)
+    element.cSld.set("name", name)
+    spTree = element.cSld.spTree
+    for shape in list(spTree.iterchildren()):
+        if etree.QName(shape).localname not in ("nvGrpSpPr", "grpSpPr"):
+            spTree.remove(shape)
+    for offset, spec in enumerate(placeholders):
+        spTree.append(parse_xml(placeholder_xml(offset + 2, spec)))
+
+def build(output: str = OUTPUT) -> str:
+    prs = Presentation()
+    layouts = list(prs.slide_layouts)
+    for layout, (name, placeholders) in zip(layouts, LAYOUTS):
+        rewrite_layout(layout, name, placeholders)
+    for layout in layouts[len(LAYOUTS):]:
+        prs.slide_layouts.remove(layout)
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    prs.save(output)
+    return output
+
+if __name__ == "__main__":
+    print(f"Wrote {build(*sys.argv[1:])}")
@@ -1,17 +1,35 @@
+import hashlib
 import json
 import os
-import requests
+import queue
 import tempfile
-from typing import List, Dict, Optional
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Iterator, List, Dict, Optional, Tuple
+from lxml import etree
 from pptx import Presentation
-from pptx.util import Inches, Pt
-from pptx.dml.color import RGBColor
-from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
-from pptx.enum.shapes import MSO_SHAPE
-from pptx.oxml.xmlchemy import OxmlElement
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import qn
+from pptx.util import Inches
 from io import BytesIO
 import logging
-from utils.cloudinary import upload_to_cloudinary, store_presentation_url
+from utils.cloudinary import store_presentation_url
+from utils.storage import hold_file, upload_file
+from utils.http import HTTP_TIMEOUT, get_http_session
+from utils.image_cache import get_cached_image, store_cached_image
+from utils.image_processing import normalize_image
+from utils.metrics import (
+    observe_stage,
+    record_image_fetch_failure,
+    record_provider_fallback,
+    record_provider_request,
+    stage_timer
+)
+from utils.provider_health import get_provider_health, record_provider_status
+from utils.slide_cache import get_slide_fragment, store_slide_fragment
+from utils.slide_store import save_slide_model, store_slide_images
 from utils.openai import openai_client
 from config import settings
 logger = logging.getLogger(__name__)    
@@ -24,367 +42,565 @@ class SlideContent:
         self.image_query = image_query or title     
         self.layout = layout
 
+    def to_dict(self) -> Dict:
+        return {
+            "title": self.title,
+            "content": self.content,
+            "slide_type": self.slide_type,
+            "image_query": self.image_query,
+            "layout": self.layout,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SlideContent":
+        return cls(**data)
+
 def download_image_from_pexels(query: str, width: int = 800, height: int = 600) -> BytesIO:
     try:
         api_key = settings.PEXELS_API_KEY
-        print("API Key:", api_key)
-        print("Query:", query)
-        url = f"https://api.pexels.com/v1/search?query={query.replace(' ', '%20')}&per_page=1"
+        logger.debug(f"Searching Pexels for: {query}")
+        url = f"{settings.PEXELS_API_URL}/search?query={query.replace(' ', '%20')}&per_page=1"
         headers = {"Authorization": api_key}
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_http_session().get(url, headers=headers, timeout=HTTP_TIMEOUT)
+        record_provider_status("pexels", response.status_code)
         if response.status_code == 200:
             photos = response.json().get("photos", [])
             if photos:
                 image_url = photos[0]["src"]["medium"]
-                image_response = requests.get(image_url, timeout=10)
+                image_response = get_http_session().get(image_url, timeout=HTTP_TIMEOUT)
+                record_provider_status("pexels", image_response.status_code)
                 if image_response.status_code == 200:
                     return BytesIO(image_response.content)
         logger.warning(f"Failed to download image for query: {query} (Status: {response.status_code})")
         return None
     except Exception as e:
+        get_provider_health("pexels").record_failure()
         logger.error(f"Error downloading image from Pexels: {e}")
         return None
 
 def download_image_from_pixabay(query: str, width: int = 800, height: int = 600) -> BytesIO:
     try:
         api_key = settings.PIXABAY_API_KEY
-        url = f"https://pixabay.com/api/?key={api_key}&q={query.replace(' ', '%20')}&image_type=photo&per_page=3"
-        response = requests.get(url, timeout=10)
+        url = f"{settings.PIXABAY_API_URL}/?key={api_key}&q={query.replace(' ', '%20')}&image_type=photo&per_page=3"
+        response = get_http_session().get(url, timeout=HTTP_TIMEOUT)
+        record_provider_status("pixabay", response.status_code)
         if response.status_code == 200:
             hits = response.json().get("hits", [])
             if hits:
                 image_url = hits[0]["webformatURL"]
-                image_response = requests.get(image_url, timeout=10)
+                image_response = get_http_session().get(image_url, timeout=HTTP_TIMEOUT)
+                record_provider_status("pixabay", image_response.status_code)
                 if image_response.status_code == 200:
                     return BytesIO(image_response.content)
         logger.warning(f"Failed to download image for query: {query} (Status: {response.status_code})")
         return None
     except Exception as e:
+        get_provider_health("pixabay").record_failure()
         logger.error(f"Error downloading image from Pixabay: {e}")
         return None
 
 def download_image_from_unsplash(query: str, width: int = 800, height: int = 600) -> BytesIO:
     try:
-        url = f"https://source.unsplash.com/{width}x{height}/?{query.replace(' ', '%20')}"
-        response = requests.get(url, timeout=10)
+        url = f"{settings.UNSPLASH_SOURCE_URL}/{width}x{height}/?{query.replace(' ', '%20')}"
+        response = get_http_session().get(url, timeout=HTTP_TIMEOUT)
+        record_provider_status("unsplash", response.status_code)
         if response.status_code == 200:
             return BytesIO(response.content)
         else:
             logger.warning(f"Failed to download image for query: {query}")
             return None
     except Exception as e:
+        get_provider_health("unsplash").record_failure()
         logger.error(f"Error downloading image: {e}")
         return None
 
+# Providers in order of preference
+IMAGE_PROVIDERS = [
+    ("pexels", download_image_from_pexels),
+    ("pixabay", download_image_from_pixabay),
+    ("unsplash", download_image_from_unsplash),
+]
+
+_hedge_executor = None
+_hedge_executor_pid = None
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    # Created lazily and per process: pool threads do not survive a Celery prefork
+    global _hedge_executor, _hedge_executor_pid
+    if _hedge_executor is None or _hedge_executor_pid != os.getpid():
+        _hedge_executor = ThreadPoolExecutor(max_workers=settings.IMAGE_HEDGE_WORKERS, thread_name_prefix="image-hedge")
+        _hedge_executor_pid = os.getpid()
+    return _hedge_executor
+
+def _race_image_providers(query: str, width: int, height: int) -> Optional[BytesIO]:
+    """
+    Ask providers in order of preference, hedging to the next one when the current
+    provider is slower than its usual latency percentile. The first image wins.
+    Providers with an open circuit are skipped.
+    """
+    executor = _get_hedge_executor()
+    candidates = iter(IMAGE_PROVIDERS)
+    pending: Dict[Future, tuple] = {}
+    deadline = time.monotonic() + settings.IMAGE_PROVIDER_TIMEOUT
+    hedge_at = None
+    
+    def launch_next(reason: Optional[str] = None) -> bool:
+        nonlocal hedge_at
+        for name, fetch in candidates:
+            health = get_provider_health(name)
+            if not health.allow_request():
+                logger.info(f"Skipping {name}: circuit open")
+                reason = reason or "circuit_open"
+                continue
+            if reason:
+                record_provider_fallback(name, reason)
+            started_at = time.monotonic()
+            pending[executor.submit(fetch, query, width, height)] = (name, started_at)
+            hedge_at = started_at + health.hedge_delay()
+            return True
+        hedge_at = None
+        return False
+    
+    launch_next()
+    while pending:
+        now = time.monotonic()
+        if now >= deadline:
+            break
+        wake_at = min(hedge_at, deadline) if hedge_at else deadline
+        done, _ = wait(pending, timeout=max(0.0, wake_at - now), return_when=FIRST_COMPLETED)
+        
+        if not done:
+            # Current provider is slow: fire a hedged request at the next one
+            if hedge_at and time.monotonic() >= hedge_at:
+                launch_next("slow")
+            continue
+        
+        for future in done:
+            name, started_at = pending.pop(future)
+            image_stream = future.result()
+            elapsed = time.monotonic() - started_at
+            record_provider_request(name, elapsed, bool(image_stream))
+            if image_stream:
+                get_provider_health(name).observe_latency(elapsed)
+                return image_stream
+        
+        # Providers that failed fast should not make us wait out the hedge delay
+        if not pending:
+            launch_next("failed")
+    
+    logger.warning(f"No provider returned an image for query: {query}")
+    record_image_fetch_failure()
+    return None
+
 def download_image(query: str, width: int = 800, height: int = 600) -> BytesIO:
-    image_stream = download_image_from_pexels(query, width, height)
+    image_stream = get_cached_image(query)
     if image_stream:
         return image_stream
     
-    image_stream = download_image_from_pixabay(query, width, height)
+    image_stream = _race_image_providers(query, width, height)
     if image_stream:
-        return image_stream
-    
-    return download_image_from_unsplash(query, width, height)
+        store_cached_image(query, image_stream)
+    return image_stream
 
-def style_text_box(text_frame, font_size=18, is_title=False):
-    for paragraph in text_frame.paragraphs:
-        paragraph.font.name = 'Calibri'
-        paragraph.font.size = Pt(font_size)
-        
-        if is_title:
-            paragraph.font.bold = True
-            paragraph.font.color.rgb = RGBColor(255, 255, 255)
-            paragraph.alignment = PP_ALIGN.CENTER
-        else:
-            paragraph.font.color.rgb = RGBColor(64, 64, 64)
-            paragraph.space_after = Pt(6)
+# Picture box used by create_content_slide_with_image
+SLIDE_IMAGE_WIDTH = 4
+SLIDE_IMAGE_HEIGHT = 3
 
-def create_title_slide(prs, title: str, subtitle: str = ""):
-    slide_layout = prs.slide_layouts[0]
-    slide = prs.slides.add_slide(slide_layout)
-    
-    title_shape = slide.shapes.title
-    title_shape.text = title
-    title_frame = title_shape.text_frame
-    title_frame.margin_left = Inches(0.5)
-    title_frame.margin_right = Inches(0.5)
-    
-    for paragraph in title_frame.paragraphs:
-        paragraph.font.name = 'Calibri'
-        paragraph.font.size = Pt(54)
-        paragraph.font.bold = True
-        paragraph.font.color.rgb = RGBColor(31, 78, 121)
-        paragraph.alignment = PP_ALIGN.CENTER
-    
-    if subtitle and len(slide.placeholders) > 1:
-        subtitle_shape = slide.placeholders[1]
-        subtitle_shape.text = subtitle
-        subtitle_frame = subtitle_shape.text_frame
-        
-        for paragraph in subtitle_frame.paragraphs:
-            paragraph.font.name = 'Calibri'
-            paragraph.font.size = Pt(24)
-            paragraph.font.color.rgb = RGBColor(64, 64, 64)
-            paragraph.alignment = PP_ALIGN.CENTER
+def fetch_slide_image(query: str) -> Optional[BytesIO]:
+    """Download an image and shrink it to what the slide's picture box can show"""
+    image_stream = download_image(query)
+    if not image_stream:
+        return None
+    return normalize_image(image_stream, SLIDE_IMAGE_WIDTH, SLIDE_IMAGE_HEIGHT)
+
+def _fetch_image_bytes(query: str) -> Optional[bytes]:
+    image_stream = fetch_slide_image(query)
+    return image_stream.getvalue() if image_stream else None
+
+class ImagePrefetcher:
+    """Download slide images concurrently ahead of rendering.
+
+    Queries are de-duplicated and fetched on a bounded thread pool. Each image
+    gets ``deadline`` seconds from the moment it is submitted, so queries
+    submitted together can hold up a deck by at most that long in total; slides
+    whose image misses it are rendered without a picture.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, deadline: Optional[float] = None):
+        self.max_workers = max_workers or settings.IMAGE_PREFETCH_CONCURRENCY
+        self.deadline = deadline if deadline is not None else settings.IMAGE_PREFETCH_DEADLINE
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="image-prefetch")
+        self._futures: Dict[str, Future] = {}
+        self._submitted_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        # Time the renderer spent blocked in get(), i.e. images that weren't ready yet
+        self.wait_seconds = 0.0
+
+    def submit(self, query: str) -> None:
+        if not query:
+            return
+        with self._lock:
+            if query not in self._futures:
+                self._submitted_at[query] = time.monotonic()
+                self._futures[query] = self._executor.submit(_fetch_image_bytes, query)
+
+    def submit_all(self, queries: Iterable[str]) -> None:
+        for query in queries:
+            self.submit(query)
+
+    def get(self, query: str) -> Optional[BytesIO]:
+        """Return a fresh stream for ``query``, waiting at most until the deadline"""
+        with self._lock:
+            future = self._futures.get(query)
+            submitted_at = self._submitted_at.get(query)
+        if future is None:
+            return None
+
+        waited_from = time.monotonic()
+        remaining = self.deadline - (waited_from - submitted_at)
+        try:
+            image_bytes = future.result(timeout=max(0.0, remaining))
+        except FutureTimeoutError:
+            logger.warning(f"Image prefetch deadline exceeded for query: {query}")
+            return None
+        except Exception as e:
+            logger.error(f"Error prefetching image for query {query}: {e}")
+            return None
+        finally:
+            self.wait_seconds += time.monotonic() - waited_from
+
+        return BytesIO(image_bytes) if image_bytes else None
+
+    def loaded(self) -> Dict[str, bytes]:
+        """Images that finished downloading, by query"""
+        with self._lock:
+            futures = dict(self._futures)
+        images = {}
+        for query, future in futures.items():
+            if future.done() and not future.cancelled() and future.exception() is None and future.result():
+                images[query] = future.result()
+        return images
+
+    def close(self) -> None:
+        # Downloads still in flight cannot be interrupted; let them finish in the
+        # background and drop anything that has not started yet.
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class PreloadedImages:
+    """Images fetched ahead of time (e.g. by pipeline subtasks), served with the ImagePrefetcher interface"""
+
+    def __init__(self, images: Dict[str, bytes]):
+        self._images = images
+        self.wait_seconds = 0.0
+
+    def get(self, query: str) -> Optional[BytesIO]:
+        image_bytes = self._images.get(query)
+        return BytesIO(image_bytes) if image_bytes else None
+
+    def loaded(self) -> Dict[str, bytes]:
+        return dict(self._images)
+
+def _add_slide(prs, layout_name: str):
+    """Add a slide on one of the theme's layouts; its placeholders carry all the styling"""
+    return prs.slides.add_slide(prs.slide_layouts.get_by_name(layout_name))
+
+def _fill_lines(placeholder, lines: List[str]):
+    """Write one paragraph per line, or drop the placeholder so no prompt text shows"""
+    if not lines:
+        sp = placeholder._element
+        sp.getparent().remove(sp)
+        return
     
+    text_frame = placeholder.text_frame
+    for i, line in enumerate(lines):
+        p = text_frame.paragraphs[0] if i == 0 else text_frame.add_paragraph()
+        p.text = line
+
+def create_title_slide(prs, title: str, subtitle: str = ""):
+    slide = _add_slide(prs, "Title Slide")
+    slide.shapes.title.text = title
+    _fill_lines(slide.placeholders[1], [subtitle] if subtitle else [])
     return slide
 
 def create_agenda_slide(prs, slide_data: SlideContent):
-    slide_layout = prs.slide_layouts[5]
-    slide = prs.slides.add_slide(slide_layout)
-    
-    title_left = Inches(0.5)
-    title_top = Inches(0.5)
-    title_width = Inches(9)
-    title_height = Inches(1)
-    
-    title_box = slide.shapes.add_textbox(title_left, title_top, title_width, title_height)
-    title_frame = title_box.text_frame
-    title_frame.text = slide_data.title
-    
-    title_paragraph = title_frame.paragraphs[0]
-    title_paragraph.font.name = 'Calibri'
-    title_paragraph.font.size = Pt(36)
-    title_paragraph.font.bold = True
-    title_paragraph.font.color.rgb = RGBColor(31, 78, 121)
-    
-    content_left = Inches(1.5)
-    content_top = Inches(2)
-    content_width = Inches(7)
-    content_height = Inches(4.5)
-    
-    content_box = slide.shapes.add_textbox(content_left, content_top, content_width, content_height)
-    content_frame = content_box.text_frame
-    content_frame.word_wrap = True
-    content_frame.clear()
-    
-    for i, point in enumerate(slide_data.content):
-        if i == 0:
-            p = content_frame.paragraphs[0]
-        else:
-            p = content_frame.add_paragraph()
-        
-        p.text = f"{i+1}. {point}"
-        p.font.name = 'Calibri'
-        p.font.size = Pt(20)
-        p.font.color.rgb = RGBColor(64, 64, 64)
-        p.space_after = Pt(12)
-        p.level = 0
-    
+    slide = _add_slide(prs, "Agenda")
+    slide.shapes.title.text = slide_data.title
+    _fill_lines(slide.placeholders[1], [f"{i+1}. {point}" for i, point in enumerate(slide_data.content)])
     return slide
 
-def create_content_slide_with_image(prs, slide_data: SlideContent):
-    slide_layout = prs.slide_layouts[5]
-    slide = prs.slides.add_slide(slide_layout)
+def create_content_slide_with_image(prs, slide_data: SlideContent, images: Optional[ImagePrefetcher] = None):
+    slide = _add_slide(prs, "Content with Image")
+    slide.shapes.title.text = slide_data.title
+    _fill_lines(slide.placeholders[1], [f"• {point}" for point in slide_data.content])
     
-    image_stream = download_image(slide_data.image_query)
+    if images is not None:
+        image_stream = images.get(slide_data.image_query)
+    else:
+        image_stream = fetch_slide_image(slide_data.image_query)
     
     if image_stream:
         try:
             img_left = Inches(5.5)
             img_top = Inches(1.5)
-            img_width = Inches(4)
-            img_height = Inches(3)
+            img_width = Inches(SLIDE_IMAGE_WIDTH)
+            img_height = Inches(SLIDE_IMAGE_HEIGHT)
             
             slide.shapes.add_picture(image_stream, img_left, img_top, img_width, img_height)
         except Exception as e:
             logger.warning(f"Could not add image: {e}")
     
-    title_left = Inches(0.5)
-    title_top = Inches(0.5)
-    title_width = Inches(9)
-    title_height = Inches(1)
-    
-    title_box = slide.shapes.add_textbox(title_left, title_top, title_width, title_height)
-    title_frame = title_box.text_frame
-    title_frame.text = slide_data.title
-    
-    title_paragraph = title_frame.paragraphs[0]
-    title_paragraph.font.name = 'Calibri'
-    title_paragraph.font.size = Pt(36)
-    title_paragraph.font.bold = True
-    title_paragraph.font.color.rgb = RGBColor(31, 78, 121)
-    
-    content_left = Inches(0.5)
-    content_top = Inches(2)
-    content_width = Inches(4.5)
-    content_height = Inches(4.5)
-    
-    content_box = slide.shapes.add_textbox(content_left, content_top, content_width, content_height)
-    content_frame = content_box.text_frame
-    content_frame.word_wrap = True
-    content_frame.clear()
-    
-    for i, point in enumerate(slide_data.content):
-        if i == 0:
-            p = content_frame.paragraphs[0]
-        else:
-            p = content_frame.add_paragraph()
-        
-        p.text = f"• {point}"
-        p.font.name = 'Calibri'
-        p.font.size = Pt(18)
-        p.font.color.rgb = RGBColor(64, 64, 64)
-        p.space_after = Pt(8)
-        p.level = 0
-    
     return slide
 
 def create_two_column_slide(prs, slide_data: SlideContent):
     """Create a two-column content slide"""
-    slide_layout = prs.slide_layouts[5]  # Blank layout
-    slide = prs.slides.add_slide(slide_layout)
-    
-    # Add title
-    title_left = Inches(0.5)
-    title_top = Inches(0.8)
-    title_width = Inches(9)
-    title_height = Inches(1)
-    
-    title_box = slide.shapes.add_textbox(title_left, title_top, title_width, title_height)
-    title_frame = title_box.text_frame
-    title_frame.text = slide_data.title
-    
-    title_paragraph = title_frame.paragraphs[0]
-    title_paragraph.font.name = 'Calibri'
-    title_paragraph.font.size = Pt(36)
-    title_paragraph.font.bold = True
-    title_paragraph.font.color.rgb = RGBColor(31, 78, 121)
+    slide = _add_slide(prs, "Two Column")
+    slide.shapes.title.text = slide_data.title
     
     # Split content into two columns
     mid_point = len(slide_data.content) // 2
-    left_content = slide_data.content[:mid_point]
-    right_content = slide_data.content[mid_point:]
-    
-    # Left column
-    left_box = slide.shapes.add_textbox(Inches(0.5), Inches(2), Inches(4.5), Inches(4.5))
-    left_frame = left_box.text_frame
-    left_frame.clear()
-    
-    for i, point in enumerate(left_content):
-        if i == 0:
-            p = left_frame.paragraphs[0]
-        else:
-            p = left_frame.add_paragraph()
-        p.text = f"• {point}"
-        p.font.name = 'Calibri'
-        p.font.size = Pt(16)
-        p.font.color.rgb = RGBColor(64, 64, 64)
-        p.space_after = Pt(8)
-    
-    # Right column
-    right_box = slide.shapes.add_textbox(Inches(5), Inches(2), Inches(4.5), Inches(4.5))
-    right_frame = right_box.text_frame
-    right_frame.clear()
-    
-    for i, point in enumerate(right_content):
-        if i == 0:
-            p = right_frame.paragraphs[0]
-        else:
-            p = right_frame.add_paragraph()
-        p.text = f"• {point}"
-        p.font.name = 'Calibri'
-        p.font.size = Pt(16)
-        p.font.color.rgb = RGBColor(64, 64, 64)
-        p.space_after = Pt(8)
+    _fill_lines(slide.placeholders[1], [f"• {point}" for point in slide_data.content[:mid_point]])
+    _fill_lines(slide.placeholders[2], [f"• {point}" for point in slide_data.content[mid_point:]])
     
     return slide
 
 def create_section_slide(prs, title: str):
     """Create a section divider slide"""
-    slide_layout = prs.slide_layouts[5]  # Blank layout
-    slide = prs.slides.add_slide(slide_layout)
-    
-    # Add centered title
-    title_left = Inches(1)
-    title_top = Inches(3)
-    title_width = Inches(8)
-    title_height = Inches(2)
-    
-    title_box = slide.shapes.add_textbox(title_left, title_top, title_width, title_height)
-    title_frame = title_box.text_frame
-    title_frame.text = title
-    
-    title_paragraph = title_frame.paragraphs[0]
-    title_paragraph.font.name = 'Calibri'
-    title_paragraph.font.size = Pt(48)
-    title_paragraph.font.bold = True
-    title_paragraph.font.color.rgb = RGBColor(31, 78, 121)
-    title_paragraph.alignment = PP_ALIGN.CENTER
+    slide = _add_slide(prs, "Section")
+    slide.shapes.title.text = title
+    return slide
+
+def _uses_slide_image(slide_data: SlideContent) -> bool:
+    """Mirror the dispatch in create_powerpoint: only plain content slides get a picture"""
+    return (
+        slide_data.slide_type not in ("title", "agenda", "section")
+        and slide_data.layout != "two_column"
+    )
+
+def _thank_you_slide() -> SlideContent:
+    return SlideContent(
+        title="Thank You",
+        content=["Questions & Discussion", "Contact for more information"],
+        slide_type="content",
+        image_query="thank you business meeting"
+    )
+
+@lru_cache(maxsize=1)
+def _theme_bytes() -> bytes:
+    with open(settings.THEME_PATH, "rb") as theme:
+        return theme.read()
+
+def _new_presentation():
+    # Parse the theme from memory; it is read from disk once per process
+    prs = Presentation(BytesIO(_theme_bytes()))
+    
+    # Remove default slide
+    if len(prs.slides) > 0:
+        rId = prs.slides._sldIdLst[0].rId
+        prs.part.drop_rel(rId)
+        del prs.slides._sldIdLst[0]
+    
+    return prs
+
+# Bump when a create_* function changes what it draws, so cached slides are rendered afresh
+SLIDE_FRAGMENT_VERSION = "1"
+
+@lru_cache(maxsize=1)
+def _theme_digest() -> str:
+    return hashlib.sha256(_theme_bytes()).hexdigest()
+
+def _fragment_key(kind: str, content: Dict, image: Optional[bytes]) -> str:
+    digest = hashlib.sha256(f"{SLIDE_FRAGMENT_VERSION}|{_theme_digest()}|{kind}|".encode())
+    digest.update(json.dumps(content, sort_keys=True).encode())
+    if image:
+        digest.update(image)
+    return digest.hexdigest()
+
+def _splice_slide(prs, layout_name: str, sp_tree_xml: bytes, image: Optional[bytes]):
+    """Add a slide whose shapes are a cached shape tree, with its pictures linked to ``image``"""
+    rId, slide = prs.part.add_slide(prs.slide_layouts.get_by_name(layout_name))
+    prs.slides._sldIdLst.add_sldId(rId)
+    
+    sp_tree = parse_xml(sp_tree_xml)
+    blips = list(sp_tree.iter(qn("a:blip")))
+    if blips:
+        # The cached rId pointed into another package; relate this slide to its own image part
+        _, image_rId = slide.part.get_or_add_image_part(BytesIO(image))
+        for blip in blips:
+            blip.set(qn("r:embed"), image_rId)
     
+    c_sld = slide._element.cSld
+    c_sld.replace(c_sld.spTree, sp_tree)
     return slide
 
-def create_powerpoint(slides: List[SlideContent], presentation_id: str, topic: str) -> str:
-    """Create PowerPoint presentation from slides with enhanced styling and images"""
-    try:
-        prs = Presentation()
-        
-        # Remove default slide
-        if len(prs.slides) > 0:
-            rId = prs.slides._sldIdLst[0].rId
-            prs.part.drop_rel(rId)
-            del prs.slides._sldIdLst[0]
-        
-        # Process slides
-        section_count = 0
+def _render_cached(prs, kind: str, content: Dict, render: Callable[[], Any], image: Optional[bytes] = None):
+    """
+    Splice in a copy of a slide already rendered from the same content, image
+    and theme; otherwise render it and keep a copy. ``render`` must draw only
+    from ``content`` and ``image``.
+    """
+    if not settings.SLIDE_CACHE_ENABLED:
+        return render()
+    
+    key = _fragment_key(kind, content, image)
+    fragment = get_slide_fragment(key)
+    if fragment:
+        layout_name, sp_tree_xml = fragment
+        return _splice_slide(prs, layout_name, sp_tree_xml, image)
+    
+    slide = render()
+    store_slide_fragment(key, slide.slide_layout.name, etree.tostring(slide.shapes._spTree))
+    return slide
+
+def _content_slide(prs, slide_data: SlideContent, images: Optional[ImagePrefetcher] = None):
+    """create_content_slide_with_image through the slide cache, which keys it by the image's bytes"""
+    if images is not None:
+        image_stream = images.get(slide_data.image_query)
+    else:
+        image_stream = fetch_slide_image(slide_data.image_query)
+    image = image_stream.getvalue() if image_stream else None
+    
+    return _render_cached(
+        prs,
+        "content",
+        {"title": slide_data.title, "content": slide_data.content},
+        lambda: create_content_slide_with_image(prs, slide_data, PreloadedImages({slide_data.image_query: image} if image else {})),
+        image
+    )
+
+def slide_image_queries(slides: List[SlideContent]) -> List[str]:
+    """Distinct image queries a deck will ask for, including the closing slide"""
+    queries = []
+    for slide_data in slides + [_thank_you_slide()]:
+        if _uses_slide_image(slide_data) and slide_data.image_query not in queries:
+            queries.append(slide_data.image_query)
+    return queries
+
+def render_slides(prs, slides: Iterable[SlideContent], images: ImagePrefetcher, slide_total: int):
+    """Add slides to the deck in order; ``slides`` may be a generator that is still producing"""
+    section_count = 0
+    
+    for i, slide_data in enumerate(slides):
         
-        for i, slide_data in enumerate(slides):
+        # Each builder goes through the slide cache, keyed by exactly what it draws
+        if slide_data.slide_type == "title":
+            # Create title slide
+            _render_cached(
+                prs, "title", {"title": slide_data.title, "subtitle": "Professional Presentation"},
+                lambda: create_title_slide(prs, slide_data.title, "Professional Presentation")
+            )
+            
+        elif slide_data.slide_type == "agenda":
+            # Create agenda slide
+            _render_cached(
+                prs, "agenda", {"title": slide_data.title, "content": slide_data.content},
+                lambda: create_agenda_slide(prs, slide_data)
+            )
+            
+        elif slide_data.slide_type == "section":
+            # Create section divider
+            _render_cached(prs, "section", {"title": slide_data.title}, lambda: create_section_slide(prs, slide_data.title))
+            section_count += 1
+            
+        elif slide_data.layout == "two_column":
+            # Create two-column slide
+            _render_cached(
+                prs, "two_column", {"title": slide_data.title, "content": slide_data.content},
+                lambda: create_two_column_slide(prs, slide_data)
+            )
+            
+        else:
+            # Create content slide with image
+            _content_slide(prs, slide_data, images)
             
-            if slide_data.slide_type == "title":
-                # Create title slide
-                create_title_slide(prs, slide_data.title, "Professional Presentation")
-                
-            elif slide_data.slide_type == "agenda":
-                # Create agenda slide
-                create_agenda_slide(prs, slide_data)
-                
-            elif slide_data.slide_type == "section":
-                # Create section divider
-                create_section_slide(prs, slide_data.title)
+            # Add section slides every 3-4 content slides for longer presentations
+            if (i > 0 and i % 5 == 0 and section_count < 2 and slide_total > 10):
+                section_title = f"Section {section_count + 1}"
+                _render_cached(prs, "section", {"title": section_title}, lambda: create_section_slide(prs, section_title))
                 section_count += 1
-                
-            elif slide_data.layout == "two_column":
-                # Create two-column slide
-                create_two_column_slide(prs, slide_data)
-                
-            else:
-                # Create content slide with image
-                create_content_slide_with_image(prs, slide_data)
-                
-                # Add section slides every 3-4 content slides for longer presentations
-                if (i > 0 and i % 5 == 0 and section_count < 2 and len(slides) > 10):
-                    section_title = f"Section {section_count + 1}"
-                    create_section_slide(prs, section_title)
-                    section_count += 1
+
+def _observe_render(slide_count: int, elapsed: float, images: ImagePrefetcher, content_wait: float = 0.0):
+    """Split the render loop's wall time into waiting on images, waiting on content and actual rendering"""
+    observe_stage("image_wait", slide_count, images.wait_seconds)
+    observe_stage("render", slide_count, max(0.0, elapsed - images.wait_seconds - content_wait))
+
+def build_presentation(slides: List[SlideContent], images) -> Presentation:
+    """Render every slide plus the closing slide; ``images`` must already hold or be fetching their images"""
+    prs = _new_presentation()
+    render_started = time.perf_counter()
+    render_slides(prs, slides, images, len(slides))
+    
+    # Add a thank you slide at the end
+    _content_slide(prs, _thank_you_slide(), images)
+    _observe_render(len(slides), time.perf_counter() - render_started, images)
+    return prs
+
+def upload_presentation(
+    file,
+    presentation_id: str,
+    topic: str,
+    slide_count: Optional[int] = None,
+    file_id: Optional[str] = None,
+    store_url: bool = True
+) -> str:
+    """
+    Upload a saved deck and remember where it is; ``file_id`` names the stored file when it isn't the presentation ID.
+    Without ``store_url`` the record is left alone and the caller saves the location.
+    """
+    # Upload to the configured storage backend
+    with stage_timer("upload", slide_count):
+        location = upload_file(file, file_id or presentation_id)
+    
+    if location:
+        hold_file(presentation_id, location)
+        if store_url:
+            # Store the location in Redis
+            with stage_timer("store_url", slide_count):
+                store_presentation_url(presentation_id, location)
+        return location
+    else:
+        raise Exception("Failed to upload presentation to storage")
+
+def save_and_upload(prs, presentation_id: str, topic: str, slide_count: Optional[int] = None) -> str:
+    """Upload the finished deck and remember its URL"""
+    slide_count = slide_count or len(prs.slides)
+    
+    # Save into memory; only unusually large decks spill to an anonymous
+    # temp file, which is removed when the buffer closes on every path
+    with tempfile.SpooledTemporaryFile(max_size=settings.PPTX_SPOOL_MAX_BYTES, suffix='.pptx') as buffer:
+        with stage_timer("save", slide_count):
+            prs.save(buffer)
+        buffer.seek(0)
+        return upload_presentation(buffer, presentation_id, topic, slide_count)
+
+def keep_slide_parts(presentation_id: str, slides: List[SlideContent], images) -> None:
+    """Store the slides and images a deck was built from, so one slide can be redone later"""
+    try:
+        wanted = set(slide_image_queries(slides))
+        loaded = {query: data for query, data in images.loaded().items() if query in wanted}
+        save_slide_model(presentation_id, [slide.to_dict() for slide in slides], store_slide_images(loaded))
+    except Exception as e:
+        # The deck is still good; it just can't be edited slide by slide
+        logger.warning(f"Could not store slide parts of {presentation_id}: {e}")
+
+def create_powerpoint(slides: List[SlideContent], presentation_id: str, topic: str) -> str:
+    """Create PowerPoint presentation from slides with enhanced styling and images"""
+    try:
+        # Start every image download up front so network waits overlap
+        images = ImagePrefetcher()
+        images.submit_all(slide_image_queries(slides))
         
-        # Add a thank you slide at the end
-        thank_you_slide = SlideContent(
-            title="Thank You",
-            content=["Questions & Discussion", "Contact for more information"],
-            slide_type="content",
-            image_query="thank you business meeting"
-        )
-        create_content_slide_with_image(prs, thank_you_slide)
+        with images:
+            prs = build_presentation(slides, images)
+        keep_slide_parts(presentation_id, slides, images)
         
-        # Save presentation to a temporary file
-        with tempfile.NamedTemporaryFile(suffix='.pptx', delete=False) as temp_file:
-            prs.save(temp_file.name)
-            
-            # Upload to Cloudinary
-            cloudinary_url = upload_to_cloudinary(temp_file.name, presentation_id, topic)
-            
-            if cloudinary_url:
-                # Store URL in Redis
-                store_presentation_url(presentation_id, cloudinary_url)
-                
-                # Clean up temporary file
-                os.unlink(temp_file.name)
-                
-                return cloudinary_url
-            else:
-                raise Exception("Failed to upload presentation to Cloudinary")
+        return save_and_upload(prs, presentation_id, topic, len(slides))
         
     except Exception as e:
         logger.error(f"Error creating PowerPoint: {e}")
@@ -511,6 +727,63 @@ def _generate_realistic_fallback_slides(topic: str, slide_count: int) -> List[Sl
     
     return slides[:slide_count]
 
+_CONTENT_GUIDELINES = """Guidelines for realistic PowerPoint content:
+    - Use concise, impactful bullet points (5-8 words max per point)
+    - Include relevant statistics, facts, or data points where appropriate
+    - Add actionable insights and recommendations
+    - Use professional business language
+    - Create compelling slide titles (6-10 words)
+    - Suggest appropriate slide layouts
+    
+    For each slide, provide:
+    - Compelling title that captures the key message
+    - 3-6 bullet points with substantial, realistic content
+    - Appropriate slide layout (content, two_column, agenda, etc.)
+    - Relevant image search query"""
+
+_SYSTEM_PROMPT = "You are an expert presentation designer with 10+ years creating executive-level PowerPoint presentations. Focus on clarity, impact, and professional appeal."
+
+def _build_content_messages(topic: str, slide_count: int, presentation_type: str) -> List[Dict]:
+    # Get structure based on slide count
+    structure = _get_presentation_structure(slide_count, presentation_type)
+    
+    prompt = f"""
+    Create a professional {presentation_type} presentation with {slide_count} slides about: {topic}
+    
+    Follow this structure: {structure}
+    
+    {_CONTENT_GUIDELINES}
+    
+    Return in JSON format:
+    {{
+        "presentation_title": "Professional Title",
+        "subtitle": "Engaging subtitle",
+        "slides": [
+            {{
+                "title": "Slide Title",
+                "content": ["Concise bullet point 1", "Impactful bullet point 2"],
+                "slide_type": "title|content|section|agenda",
+                "layout": "content|two_column|agenda",
+                "image_query": "professional search terms",
+            }}
+        ]
+    }}
+    """
+    
+    return [
+        {"role": "system", "content": _SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+def _slide_from_json(slide_info: Dict, topic: str) -> SlideContent:
+    return SlideContent(
+        title=slide_info.get("title", "Untitled Slide"),
+        content=slide_info.get("content", ["Content not available"]),
+        slide_type=slide_info.get("slide_type", "content"),
+        image_query=slide_info.get("image_query", f"{topic} professional"),
+        layout=slide_info.get("layout", "content")
+    )
+
 def generate_presentation_content(topic: str, slide_count: int, presentation_type: str = "business"):
     """Generate enhanced content with better structure"""
     print("Generating enhanced content for topic:", topic)
@@ -518,53 +791,9 @@ def generate_presentation_content(topic: str, slide_count: int, presentation_typ
     print("Presentation type:", presentation_type)
     
     try:
-        # Get structure based on slide count
-        structure = _get_presentation_structure(slide_count, presentation_type)
-        
-        prompt = f"""
-        Create a professional {presentation_type} presentation with {slide_count} slides about: {topic}
-        
-        Follow this structure: {structure}
-        
-        Guidelines for realistic PowerPoint content:
-        - Use concise, impactful bullet points (5-8 words max per point)
-        - Include relevant statistics, facts, or data points where appropriate
-        - Add actionable insights and recommendations
-        - Use professional business language
-        - Create compelling slide titles (6-10 words)
-        - Suggest appropriate slide layouts
-        
-        For each slide, provide:
-        - Compelling title that captures the key message
-        - 3-6 bullet points with substantial, realistic content
-        - Appropriate slide layout (content, two_column, agenda, etc.)
-        - Relevant image search query
-        
-        Return in JSON format:
-        {{
-            "presentation_title": "Professional Title",
-            "subtitle": "Engaging subtitle",
-            "slides": [
-                {{
-                    "title": "Slide Title",
-                    "content": ["Concise bullet point 1", "Impactful bullet point 2"],
-                    "slide_type": "title|content|section|agenda",
-                    "layout": "content|two_column|agenda",
-                    "image_query": "professional search terms",
-                }}
-            ]
-        }}
-        """
-        
         response = openai_client.chat.completions.create(
             model="gpt-4",  # Using GPT-4 for better quality
-            messages=[
-                {
-                    "role": "system", 
-                    "content": "You are an expert presentation designer with 10+ years creating executive-level PowerPoint presentations. Focus on clarity, impact, and professional appeal."
-                },
-                {"role": "user", "content": prompt}
-            ],
+            messages=_build_content_messages(topic, slide_count, presentation_type),
             max_tokens=4000,
             temperature=0.6
         )
@@ -574,19 +803,7 @@ def generate_presentation_content(topic: str, slide_count: int, presentation_typ
         try:
             # Parse the JSON response
             slides_data = json.loads(content)
-            slides = []
-            
-            for slide_info in slides_data.get("slides", []):
-                slide = SlideContent(
-                    title=slide_info.get("title", "Untitled Slide"),
-                    content=slide_info.get("content", ["Content not available"]),
-                    slide_type=slide_info.get("slide_type", "content"),
-                    image_query=slide_info.get("image_query", f"{topic} professional"),
-                    layout=slide_info.get("layout", "content")
-                )
-                slides.append(slide)
-            
-            return slides
+            return [_slide_from_json(slide_info, topic) for slide_info in slides_data.get("slides", [])]
             
         except json.JSONDecodeError as e:
             logger.warning(f"JSON parsing failed: {e}. Using realistic fallback content.")
@@ -594,4 +811,303 @@ def generate_presentation_content(topic: str, slide_count: int, presentation_typ
             
     except Exception as e:
         logger.error(f"Error generating enhanced content: {e}")
-        return _generate_realistic_fallback_slides(topic, slide_count)
\ No newline at end of file
+        return _generate_realistic_fallback_slides(topic, slide_count)
+
+def group_outline_requests(decks: List[Tuple[str, int]], max_slides: int) -> List[List[int]]:
+    """
+    Pack deck indices, in order, into groups whose combined slide count fits
+    one completion; a deck larger than ``max_slides`` gets a group of its own
+    """
+    groups = []
+    current, current_slides = [], 0
+    for index, (_, slide_count) in enumerate(decks):
+        if current and current_slides + slide_count > max_slides:
+            groups.append(current)
+            current, current_slides = [], 0
+        current.append(index)
+        current_slides += slide_count
+    if current:
+        groups.append(current)
+    return groups
+
+def _build_batch_content_messages(decks: List[Tuple[str, int]], presentation_type: str) -> List[Dict]:
+    requests = "\n".join(
+        f"    {index}. {slide_count} slides about: {topic}\n"
+        f"       Structure: {_get_presentation_structure(slide_count, presentation_type)}"
+        for index, (topic, slide_count) in enumerate(decks)
+    )
+    
+    prompt = f"""
+    Create {len(decks)} separate professional {presentation_type} presentations, one for each numbered request below.
+    Each presentation stands on its own; do not share slides between them.
+    
+{requests}
+    
+    {_CONTENT_GUIDELINES}
+    
+    Return in JSON format, with one entry per request and the request number as "index":
+    {{
+        "presentations": [
+            {{
+                "index": 0,
+                "presentation_title": "Professional Title",
+                "subtitle": "Engaging subtitle",
+                "slides": [
+                    {{
+                        "title": "Slide Title",
+                        "content": ["Concise bullet point 1", "Impactful bullet point 2"],
+                        "slide_type": "title|content|section|agenda",
+                        "layout": "content|two_column|agenda",
+                        "image_query": "professional search terms",
+                    }}
+                ]
+            }}
+        ]
+    }}
+    """
+    
+    return [
+        {"role": "system", "content": _SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+def generate_batch_content(decks: List[Tuple[str, int]], presentation_type: str = "business") -> List[List[SlideContent]]:
+    """
+    Outline several decks, given as (topic, slide_count), with one completion.
+    Decks the reply leaves out or garbles are generated on their own, so every
+    deck gets slides.
+    """
+    if len(decks) == 1:
+        return [generate_presentation_content(decks[0][0], decks[0][1], presentation_type)]
+    
+    outlines: Dict[int, List[SlideContent]] = {}
+    try:
+        response = openai_client.chat.completions.create(
+            model="gpt-4",
+            messages=_build_batch_content_messages(decks, presentation_type),
+            max_tokens=4000,
+            temperature=0.6
+        )
+        data = json.loads(response.choices[0].message.content)
+        for entry in data.get("presentations", []):
+            index = entry.get("index")
+            if isinstance(index, int) and 0 <= index < len(decks) and entry.get("slides"):
+                outlines[index] = [_slide_from_json(slide_info, decks[index][0]) for slide_info in entry["slides"]]
+    except json.JSONDecodeError as e:
+        logger.warning(f"Batch outline JSON parsing failed: {e}")
+    except Exception as e:
+        logger.error(f"Error generating batch outlines: {e}")
+    
+    missing = [index for index in range(len(decks)) if index not in outlines]
+    if missing:
+        logger.warning(f"Batch outline covered {len(decks) - len(missing)} of {len(decks)} decks; generating the rest one by one")
+    for index in missing:
+        outlines[index] = generate_presentation_content(decks[index][0], decks[index][1], presentation_type)
+    
+    return [outlines[index] for index in range(len(decks))]
+
+def _build_slide_messages(topic: str, slides: List[SlideContent], index: int, instructions: Optional[str], presentation_type: str) -> List[Dict]:
+    outline = "\n".join(
+        f"    {number + 1}. {slide.title}" + ("  <- rewrite this slide" if number == index else "")
+        for number, slide in enumerate(slides)
+    )
+    current = slides[index]
+    
+    prompt = f"""
+    Rewrite slide {index + 1} of a professional {presentation_type} presentation about: {topic}
+    
+    The deck's slides, in order:
+{outline}
+    
+    The slide currently reads:
+    {json.dumps(current.to_dict())}
+    
+    Keep it a {current.slide_type} slide that fits between its neighbours; do not repeat their points.
+    {f"Requested change: {instructions}" if instructions else "Make it clearer and more compelling."}
+    
+    {_CONTENT_GUIDELINES}
+    
+    Return only this slide, in JSON format:
+    {{
+        "title": "Slide Title",
+        "content": ["Concise bullet point 1", "Impactful bullet point 2"],
+        "slide_type": "{current.slide_type}",
+        "layout": "content|two_column|agenda",
+        "image_query": "professional search terms"
+    }}
+    """
+    
+    return [
+        {"role": "system", "content": _SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+def regenerate_slide(topic: str, slides: List[SlideContent], index: int, instructions: Optional[str] = None, presentation_type: str = "business") -> SlideContent:
+    """
+    Write a new version of one slide with its deck as context. Costs one
+    slide's worth of output; raises if the reply isn't a usable slide.
+    """
+    response = openai_client.chat.completions.create(
+        model="gpt-4",
+        messages=_build_slide_messages(topic, slides, index, instructions, presentation_type),
+        max_tokens=600,
+        temperature=0.7
+    )
+    slide_info = json.loads(response.choices[0].message.content)
+    if not isinstance(slide_info, dict) or not slide_info.get("content"):
+        raise ValueError("Model returned no slide content")
+    
+    slide = _slide_from_json(slide_info, topic)
+    # The deck's structure (title, agenda, sections) stays as it was
+    slide.slide_type = slides[index].slide_type
+    return slide
+
+class SlideStreamParser:
+    """Pull complete slide objects out of a streamed JSON reply as soon as each one closes.
+
+    Only objects directly inside the top-level ``"slides"`` array are returned;
+    anything around the JSON (such as a Markdown code fence) is ignored.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key = None
+        self._slides_depth = None
+        self._object_start = None
+
+    def feed(self, chunk: str) -> List[Dict]:
+        self.text += chunk
+        completed = []
+        
+        while self._pos < len(self.text):
+            char = self.text[self._pos]
+            
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = self.text[self._string_start + 1:self._pos]
+            
+            elif char == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            
+            elif char in "{[":
+                if char == "[" and self._depth == 1 and self._last_key == "slides":
+                    self._slides_depth = self._depth + 1
+                self._depth += 1
+                if char == "{" and self._slides_depth is not None and self._depth == self._slides_depth + 1:
+                    self._object_start = self._pos
+            
+            elif char in "}]":
+                if char == "}" and self._object_start is not None and self._depth == self._slides_depth + 1:
+                    try:
+                        completed.append(json.loads(self.text[self._object_start:self._pos + 1]))
+                    except json.JSONDecodeError as e:
+                        logger.warning(f"Skipping malformed slide in stream: {e}")
+                    self._object_start = None
+                elif char == "]" and self._depth == self._slides_depth:
+                    self._slides_depth = None
+                self._depth -= 1
+            
+            self._pos += 1
+        
+        return completed
+
+def iter_presentation_content(topic: str, slide_count: int, presentation_type: str = "business") -> Iterator[SlideContent]:
+    """Stream slides from the model, yielding each one as soon as its JSON object is complete"""
+    stream = openai_client.chat.completions.create(
+        model="gpt-4",
+        messages=_build_content_messages(topic, slide_count, presentation_type),
+        max_tokens=4000,
+        temperature=0.6,
+        stream=True
+    )
+    
+    parser = SlideStreamParser()
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            for slide_info in parser.feed(delta):
+                yield _slide_from_json(slide_info, topic)
+
+def generate_and_create_powerpoint(topic: str, slide_count: int, presentation_id: str) -> Tuple[str, List[SlideContent], Optional[float]]:
+    """
+    Stream content from the model straight into image prefetch and rendering, so
+    the deck is built while tokens are still arriving. Returns the deck URL, the
+    slides and the seconds until the first slide was parsed.
+    """
+    started_at = time.monotonic()
+    slide_queue: "queue.Queue[Optional[SlideContent]]" = queue.Queue()
+    slides: List[SlideContent] = []
+    first_slide_latency = None
+    thank_you_slide = _thank_you_slide()
+    
+    images = ImagePrefetcher()
+    images.submit(thank_you_slide.image_query)
+    
+    def produce():
+        try:
+            with stage_timer("content", slide_count):
+                for slide_data in iter_presentation_content(topic, slide_count):
+                    if _uses_slide_image(slide_data):
+                        images.submit(slide_data.image_query)
+                    slide_queue.put(slide_data)
+        except Exception as e:
+            logger.error(f"Error streaming presentation content: {e}")
+        finally:
+            slide_queue.put(None)
+    
+    content_wait = 0.0
+    
+    def received():
+        nonlocal first_slide_latency, content_wait
+        while True:
+            waited_from = time.perf_counter()
+            slide_data = slide_queue.get()
+            content_wait += time.perf_counter() - waited_from
+            if slide_data is None:
+                return
+            if first_slide_latency is None:
+                first_slide_latency = time.monotonic() - started_at
+                logger.info(f"First slide parsed after {first_slide_latency:.2f}s")
+            slides.append(slide_data)
+            yield slide_data
+    
+    try:
+        prs = _new_presentation()
+        producer = threading.Thread(target=produce, name="content-stream", daemon=True)
+        producer.start()
+        
+        with images:
+            # Rendering stays on this thread; python-pptx objects are not thread-safe
+            render_started = time.perf_counter()
+            render_slides(prs, received(), images, slide_count)
+            
+            if not slides:
+                logger.warning("No slides could be parsed from the stream. Using realistic fallback content.")
+                slides = _generate_realistic_fallback_slides(topic, slide_count)
+                images.submit_all(slide_data.image_query for slide_data in slides if _uses_slide_image(slide_data))
+                render_slides(prs, slides, images, slide_count)
+            
+            # Add a thank you slide at the end
+            _content_slide(prs, thank_you_slide, images)
+            _observe_render(slide_count, time.perf_counter() - render_started, images, content_wait)
+        keep_slide_parts(presentation_id, slides, images)
+        
+        return save_and_upload(prs, presentation_id, topic, slide_count), slides, first_slide_latency
+        
+    except Exception as e:
+        logger.error(f"Error creating PowerPoint: {e}")
+        raise Exception(f"Failed to create presentation: {str(e)}")
@@ -1,23 +1,67 @@
 # Business logic for presentation generation, suggestions, and file ops
 import os
-from fastapi.responses import FileResponse
+import datetime
+import email.utils
+import logging
+from fastapi.responses import FileResponse, RedirectResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 import redis
 import json
 import uuid
-from fastapi import HTTPException, Request, logger
-from utils.helpers import check_daily_limit, get_user_key
+import time
+from fastapi import HTTPException, Request
+from typing import Iterator, List, Optional, Tuple
+from utils.helpers import get_cache_key, get_user_presentations_key
+from utils.presentation_store import (
+    get_presentation_async,
+    get_presentation_channel,
+    get_presentations_async,
+    save_presentation_async,
+    store_completed_presentation_async
+)
+from utils.batch_store import get_batch_async, save_batch_async
+from utils.deck_cache import acquire_deck_lock_async, add_waiter_async, get_cached_deck_async, release_deck_lock_async
+from utils.rate_limit import get_daily_count_async
+from utils.slide_store import (
+    acquire_edit_lock_async,
+    copy_slide_model_async,
+    get_slide_model_async,
+    release_edit_lock_async
+)
 from config import settings
-from models.presentation import TopicInput, TopicSuggestion, PresentationRequest, PresentationResponse
-from tasks.presentation_tasks import generate_presentation_task
-from utils.openai import openai_client
-from utils.redis import redis_client
-import requests
-import tempfile
+from models.presentation import (
+    BatchPresentationRequest,
+    BatchResponse,
+    PresentationRequest,
+    PresentationResponse,
+    SlideRevisionResponse,
+    TopicInput,
+    TopicSuggestion
+)
+from tasks.presentation_tasks import generate_presentation_task, schedule_waiter_expiry
+from tasks.pipeline_tasks import start_batch_pipeline, start_presentation_pipeline, start_slide_revision
+from utils.openai import async_openai_client
+from utils.redis import async_pubsub_client, async_redis_client
+from utils.http import get_async_http_client
+from utils.storage import PPTX_MEDIA_TYPE, hold_file_async, resolve_download
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+# Tries at leading or joining an identical request before giving up; each lost
+# race means a leader took and released the lock in between
+ADMIT_ATTEMPTS = 3
+
+# Conditional and range headers forwarded to storage, and validators passed back
+FORWARDED_REQUEST_HEADERS = ("range", "if-range", "if-none-match", "if-modified-since")
+PASSTHROUGH_RESPONSE_HEADERS = ("content-length", "content-range", "etag", "last-modified")
 
 async def get_topic_suggestions(topic_input: TopicInput, request: Request):
     """Get topic suggestions based on user input"""
     try:
-        suggestions = openai_client.chat.completions.create(
+        suggestions = await async_openai_client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are a helpful assistant that generates topic suggestions based on user input."},
@@ -29,61 +73,298 @@ async def get_topic_suggestions(topic_input: TopicInput, request: Request):
         logger.error(f"Error getting suggestions: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate suggestions")
 
-async def download_presentation(presentation_id: str):
+async def download_presentation(presentation_id: str, request: Request):
     """Download generated presentation"""
     try:
         # Check if presentation exists and is completed
-        status = redis_client.get(f"presentation:{presentation_id}:status")
-        if status != "completed":
+        record = await get_presentation_async(presentation_id)
+        if not record or record.get("status") != "completed":
             raise HTTPException(status_code=404, detail="Presentation not ready or not found")
         
-        # Get presentation URL from Redis
-        download_url = redis_client.get(f"presentation:{presentation_id}")
-        if not download_url:
+        location = record.get("download_url")
+        if not location:
             raise HTTPException(status_code=404, detail="Presentation URL not found")
         
-        # Download the file from Cloudinary
-        response = requests.get(download_url, stream=True)
-        if not response.ok:
-            raise HTTPException(status_code=404, detail="Failed to download presentation from storage")
+        # Presigning an S3 URL may load credentials on first use
+        kind, download_url = await run_in_threadpool(resolve_download, location)
+        if kind == "file":
+            return _local_file_response(presentation_id, download_url, request)
         
-        # Create a temporary file to store the PPTX
-        with tempfile.NamedTemporaryFile(suffix='.pptx', delete=False) as temp_file:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    temp_file.write(chunk)
-            temp_file.flush()
-            
-            return FileResponse(
-                temp_file.name,
-                media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-                filename=f"presentation_{presentation_id}.pptx",
-                background=None
+        if settings.DOWNLOAD_MODE == "redirect":
+            # Let the client fetch straight from storage
+            return RedirectResponse(
+                download_url,
+                status_code=307,
+                headers={"Cache-Control": settings.DOWNLOAD_CACHE_CONTROL}
             )
         
+        # Proxy the file through as it arrives; storage handles ranges and revalidation
+        upstream_headers = {"Accept-Encoding": "identity"}
+        for header in FORWARDED_REQUEST_HEADERS:
+            if header in request.headers:
+                upstream_headers[header] = request.headers[header]
+        
+        client = get_async_http_client()
+        response = await client.send(
+            client.build_request("GET", download_url, headers=upstream_headers),
+            stream=True
+        )
+        
+        headers = {
+            name: response.headers[name]
+            for name in PASSTHROUGH_RESPONSE_HEADERS
+            if name in response.headers
+        }
+        headers["Accept-Ranges"] = "bytes"
+        headers["Cache-Control"] = settings.DOWNLOAD_CACHE_CONTROL
+        
+        if response.status_code in (304, 416):
+            await response.aclose()
+            return Response(status_code=response.status_code, headers=headers)
+        if response.status_code not in (200, 206):
+            await response.aclose()
+            raise HTTPException(status_code=404, detail="Failed to download presentation from storage")
+        
+        headers["Content-Disposition"] = f'attachment; filename="presentation_{presentation_id}.pptx"'
+        return StreamingResponse(
+            response.aiter_raw(chunk_size=settings.DOWNLOAD_CHUNK_SIZE),
+            status_code=response.status_code,
+            media_type=PPTX_MEDIA_TYPE,
+            headers=headers,
+            background=BackgroundTask(response.aclose)
+        )
+        
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error downloading presentation: {e}")
         raise HTTPException(status_code=500, detail="Failed to download presentation")
 
+def _local_file_response(presentation_id: str, path: str, request: Request) -> Response:
+    """
+    Serve a deck from local storage without a second network hop, answering
+    range and conditional requests the way storage does for proxied downloads
+    """
+    headers = {
+        "Cache-Control": settings.DOWNLOAD_CACHE_CONTROL,
+        "Content-Disposition": f'attachment; filename="presentation_{presentation_id}.pptx"'
+    }
+    if settings.LOCAL_STORAGE_ACCEL_PREFIX:
+        # nginx sends the file with sendfile() and handles ranges; the API never reads it
+        relative = os.path.relpath(path, os.path.abspath(settings.LOCAL_STORAGE_DIR))
+        headers["X-Accel-Redirect"] = f"{settings.LOCAL_STORAGE_ACCEL_PREFIX.rstrip('/')}/{relative}"
+        return Response(media_type=PPTX_MEDIA_TYPE, headers=headers)
+    
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Presentation file not found")
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+    headers.update({"Accept-Ranges": "bytes", "ETag": etag, "Last-Modified": last_modified})
+    
+    if _not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+    
+    # A Range is only honoured while If-Range still names this version of the file
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range in (etag, last_modified)):
+        try:
+            byte_range = _byte_range(range_header, size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+        if byte_range:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                _read_file_range(path, start, end - start + 1),
+                status_code=206,
+                media_type=PPTX_MEDIA_TYPE,
+                headers=headers
+            )
+    
+    return FileResponse(path, media_type=PPTX_MEDIA_TYPE, headers=headers)
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # If-None-Match wins over If-Modified-Since; weak comparison, as for GET
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def _byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    The inclusive bounds of a single ``bytes=`` range, or None to send the whole
+    file (malformed or multi-range headers). Raises ValueError when the range
+    can't be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash or not (first + last).isdigit():
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and start > end:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    return start, min(end, size - 1)
+
+def _read_file_range(path: str, start: int, length: int) -> Iterator[bytes]:
+    # Starlette iterates a sync generator in the threadpool
+    with open(path, "rb") as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(settings.DOWNLOAD_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+async def _complete_from_cache(presentation_id: str, user_id: str, cached: dict, batch_id: Optional[str] = None) -> PresentationResponse:
+    """Serve a new request with the deck an identical request already produced"""
+    presentation_data = {key: value for key, value in cached.items() if key not in ("slides", "source_id")}
+    # Decks cached before the v2 record layout carry the URL as "filepath"
+    if "filepath" in presentation_data:
+        presentation_data["download_url"] = presentation_data.pop("filepath")
+    presentation_data.update(
+        created_at=datetime.datetime.now().isoformat(),
+        user_id=user_id,
+        batch_id=batch_id
+    )
+    if cached.get("source_id"):
+        await copy_slide_model_async(cached["source_id"], presentation_id)
+    # The copy shares the source's file; deleting either must leave it for the other
+    await hold_file_async(presentation_id, presentation_data["download_url"])
+    await store_completed_presentation_async(presentation_id, user_id, presentation_data)
+    
+    return PresentationResponse(
+        presentation_id=presentation_id,
+        status="completed",
+        download_url=_download_path(presentation_id, presentation_data)
+    )
+
+async def _admit_presentation(
+    presentation_id: str,
+    topic: str,
+    preferences: dict,
+    user_id: str,
+    batch_id: Optional[str] = None,
+    quota_day: Optional[str] = None
+) -> Tuple[Optional[PresentationResponse], str]:
+    """
+    Answer a request from the deck cache, or attach it to an identical request
+    already in flight. Returns the response and the cache key; the response is
+    None when the caller now holds the deck lock and must generate the deck.
+    ``quota_day`` is the day its daily quota slot was charged to.
+    """
+    cache_key = get_cache_key(topic, preferences)
+    
+    # Same topic and preferences generated recently: reuse the finished deck
+    cached = await get_cached_deck_async(cache_key)
+    if cached:
+        return await _complete_from_cache(presentation_id, user_id, cached, batch_id), cache_key
+    
+    await save_presentation_async(
+        presentation_id,
+        status="queued",
+        topic=topic,
+        user_id=user_id,
+        batch_id=batch_id,
+        queued_at=time.time()
+    )
+    
+    for _ in range(ADMIT_ATTEMPTS):
+        if await acquire_deck_lock_async(cache_key, presentation_id):
+            return None, cache_key
+        
+        # Identical request in flight: wait on its task instead of starting another
+        waiter = {
+            "presentation_id": presentation_id,
+            "user_id": user_id,
+            "created_at": datetime.datetime.now().isoformat(),
+            "quota_day": quota_day
+        }
+        if await add_waiter_async(cache_key, waiter):
+            try:
+                await run_in_threadpool(schedule_waiter_expiry, cache_key, waiter)
+            except Exception as e:
+                logger.warning(f"Could not schedule the expiry check of {presentation_id}: {e}")
+            return PresentationResponse(presentation_id=presentation_id, status="queued"), cache_key
+        
+        # The leader finished or gave up between the lock attempt and joining
+        cached = await get_cached_deck_async(cache_key)
+        if cached:
+            return await _complete_from_cache(presentation_id, user_id, cached, batch_id), cache_key
+    
+    raise Exception(f"Identical requests kept taking and releasing the deck lock for {presentation_id}")
+
 async def start_presentation_generation(
     request_data: PresentationRequest, 
+    quota_day: Optional[str] = None
 ):
     """Generate a presentation asynchronously"""
     try:
         presentation_id = str(uuid.uuid4())
-        
-        task =  generate_presentation_task.delay(
+        preferences = request_data.preferences or {}
+        response, cache_key = await _admit_presentation(
             presentation_id,
             request_data.selected_topic,
-            request_data.preferences.get("slide_count", 10),
+            preferences,
             request_data.user_id,
-            request_data.client_id
+            quota_day=quota_day
         )
+        if response:
+            return response
         
-        redis_client.setex(f"presentation:{presentation_id}:status", 3600, "queued")
-        redis_client.setex(f"presentation:{presentation_id}:task_id", 3600, task.id)
+        try:
+            # Publishing to the broker is blocking I/O; keep it off the event loop
+            if settings.PIPELINE_MODE == "canvas":
+                task = await run_in_threadpool(
+                    start_presentation_pipeline,
+                    presentation_id,
+                    request_data.selected_topic,
+                    preferences.get("slide_count", 10),
+                    request_data.user_id,
+                    cache_key,
+                    quota_day
+                )
+            else:
+                task = await run_in_threadpool(
+                    generate_presentation_task.delay,
+                    presentation_id,
+                    request_data.selected_topic,
+                    preferences.get("slide_count", 10),
+                    request_data.user_id,
+                    request_data.client_id,
+                    cache_key,
+                    quota_day
+                )
+        except Exception:
+            await release_deck_lock_async(cache_key, presentation_id)
+            raise
+        
+        await save_presentation_async(presentation_id, task_id=task.id)
         
         return PresentationResponse(
             presentation_id=presentation_id,
@@ -96,31 +377,90 @@ async def start_presentation_generation(
         logger.error(f"Error generating presentation: {e}")
         raise HTTPException(status_code=500, detail="Failed to start presentation generation")
 
+async def start_batch_generation(request_data: BatchPresentationRequest, quota_day: Optional[str] = None) -> BatchResponse:
+    """
+    Queue many presentations as one batch. Decks that can't be answered from
+    the cache or an identical in-flight request share one pipeline run.
+    """
+    try:
+        batch_id = str(uuid.uuid4())
+        presentations = []
+        decks = []
+        
+        for item in request_data.items:
+            presentation_id = str(uuid.uuid4())
+            preferences = {**(request_data.preferences or {}), **(item.preferences or {})}
+            response, cache_key = await _admit_presentation(
+                presentation_id,
+                item.selected_topic,
+                preferences,
+                request_data.user_id,
+                batch_id,
+                quota_day
+            )
+            if response is None:
+                decks.append({
+                    "presentation_id": presentation_id,
+                    "topic": item.selected_topic,
+                    "slide_count": preferences.get("slide_count", 10),
+                    "user_id": request_data.user_id,
+                    "cache_key": cache_key,
+                    "quota_day": quota_day,
+                })
+                response = PresentationResponse(presentation_id=presentation_id, status="queued")
+            presentations.append(response)
+        
+        await save_batch_async(batch_id, request_data.user_id, [p.presentation_id for p in presentations])
+        
+        if decks:
+            try:
+                await run_in_threadpool(start_batch_pipeline, batch_id, decks)
+            except Exception:
+                for deck in decks:
+                    await release_deck_lock_async(deck["cache_key"], deck["presentation_id"])
+                raise
+        
+        return BatchResponse(
+            batch_id=batch_id,
+            status="completed" if all(p.status == "completed" for p in presentations) else "queued",
+            total=len(presentations),
+            presentations=presentations
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating presentation batch: {e}")
+        raise HTTPException(status_code=500, detail="Failed to start batch generation")
+
 async def get_presentation_status(presentation_id: str):
     """Get presentation generation status"""
     try:
-        status = redis_client.get(f"presentation:{presentation_id}:status")
-        if not status:
+        record = await get_presentation_async(presentation_id)
+        if not record or not record.get("status"):
             raise HTTPException(status_code=404, detail="Presentation not found")
         
+        status = record["status"]
         response = {"presentation_id": presentation_id, "status": status}
         
         if status == "completed":
-            data = redis_client.get(f"presentation:{presentation_id}:data")
-            if data:
-                presentation_data = json.loads(data)
-                # Use the Cloudinary URL if present
-                download_url = presentation_data.get("cloudinary_url") or f"/api/v1/download/{presentation_id}"
-                response.update({
-                    "download_url": download_url,
-                    "created_at": presentation_data["created_at"],
-                    "slide_count": presentation_data["slide_count"],
-                    "topic": presentation_data["topic"]
-                })
+            response.update({
+                "download_url": _download_path(presentation_id, record),
+                "created_at": record.get("created_at"),
+                "slide_count": record.get("slide_count"),
+                "topic": record.get("topic"),
+                "first_slide_latency": record.get("first_slide_latency")
+            })
+            if record.get("edit_status"):
+                response.update(_edit_state(record))
         elif status == "failed":
-            error = redis_client.get(f"presentation:{presentation_id}:error")
-            if error:
-                response["error"] = error
+            if record.get("error"):
+                response["error"] = record["error"]
+        
+        # Epoch seconds that split a deck's latency into waiting for a worker and working
+        for field in ("queued_at", "started_at", "finished_at"):
+            if record.get(field) is not None:
+                response[field] = record[field]
         
         return response
         
@@ -130,17 +470,270 @@ async def get_presentation_status(presentation_id: str):
         logger.error(f"Error getting status: {e}")
         raise HTTPException(status_code=500, detail="Failed to get presentation status")
 
+def _download_path(presentation_id: str, record: dict) -> str:
+    # Downloads are cacheable, so an edited deck needs a URL of its own
+    if record.get("revision"):
+        return f"/api/v1/download/{presentation_id}?v={record['revision']}"
+    return f"/api/v1/download/{presentation_id}"
+
+def _edit_state(record: dict) -> dict:
+    state = {
+        "revision": record.get("revision", 0),
+        "edit_status": record.get("edit_status"),
+        "edited_at": record.get("edited_at")
+    }
+    if record.get("edit_status") == "failed":
+        state["edit_error"] = record.get("edit_error")
+    return state
+
+async def get_presentation_slides(presentation_id: str):
+    """The slides a finished deck was built from, for picking one to edit"""
+    try:
+        record = await get_presentation_async(presentation_id)
+        if not record or record.get("status") != "completed":
+            raise HTTPException(status_code=404, detail="Presentation not ready or not found")
+        
+        model = await get_slide_model_async(presentation_id)
+        if not model:
+            raise HTTPException(status_code=404, detail="No editable slides stored for this presentation")
+        
+        return dict(
+            _edit_state(record),
+            presentation_id=presentation_id,
+            download_url=_download_path(presentation_id, record),
+            slides=[dict(slide, index=index) for index, slide in enumerate(model["slides"])]
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting slides: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get presentation slides")
+
+async def start_slide_edit(
+    presentation_id: str,
+    index: int,
+    edits: Optional[dict] = None,
+    instructions: Optional[str] = None
+) -> SlideRevisionResponse:
+    """
+    Queue a rebuild of a finished deck with one slide changed: ``edits`` are
+    applied to it as given, without them the model rewrites it. The deck
+    stays downloadable as it was until the new revision is uploaded.
+    """
+    try:
+        record = await get_presentation_async(presentation_id)
+        if not record or record.get("status") != "completed":
+            raise HTTPException(status_code=404, detail="Presentation not ready or not found")
+        
+        model = await get_slide_model_async(presentation_id)
+        if not model:
+            raise HTTPException(status_code=409, detail="This presentation has no stored slides to edit")
+        if not 0 <= index < len(model["slides"]):
+            raise HTTPException(status_code=404, detail=f"Slide {index} not found; the deck has {len(model['slides'])} slides")
+        
+        if not await acquire_edit_lock_async(presentation_id):
+            raise HTTPException(status_code=409, detail="Another edit of this presentation is in progress")
+        
+        revision = record.get("revision", 0) + 1
+        try:
+            await save_presentation_async(presentation_id, edit_status="queued", edit_error=None)
+            await run_in_threadpool(
+                start_slide_revision,
+                presentation_id,
+                record.get("topic"),
+                len(model["slides"]),
+                record.get("user_id"),
+                index,
+                revision,
+                edits,
+                instructions,
+                record.get("cache_key")
+            )
+        except Exception:
+            await save_presentation_async(presentation_id, edit_status=record.get("edit_status"), edit_error=record.get("edit_error"))
+            await release_edit_lock_async(presentation_id)
+            raise
+        
+        return SlideRevisionResponse(
+            presentation_id=presentation_id,
+            index=index,
+            revision=revision,
+            edit_status="queued"
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error starting slide edit: {e}")
+        raise HTTPException(status_code=500, detail="Failed to start slide edit")
+
+async def get_batch_status(batch_id: str):
+    """Aggregate progress of a batch from its presentations' records"""
+    try:
+        batch = await get_batch_async(batch_id)
+        if not batch:
+            raise HTTPException(status_code=404, detail="Batch not found")
+        
+        presentation_ids = batch["presentation_ids"]
+        records = await get_presentations_async(presentation_ids)
+        
+        counts = {"queued": 0, "processing": 0, "completed": 0, "failed": 0}
+        presentations = []
+        for presentation_id, record in zip(presentation_ids, records):
+            # Records expire with their decks; report what is left
+            status = (record or {}).get("status", "expired")
+            counts[status] = counts.get(status, 0) + 1
+            entry = {"presentation_id": presentation_id, "status": status, "topic": (record or {}).get("topic")}
+            if status == "completed":
+                entry["download_url"] = _download_path(presentation_id, record)
+            elif status == "failed" and record.get("error"):
+                entry["error"] = record["error"]
+            presentations.append(entry)
+        
+        total = len(presentation_ids)
+        done = total - counts["queued"] - counts["processing"]
+        if done == 0 and counts["processing"] == 0:
+            status = "queued"
+        elif done < total:
+            status = "processing"
+        elif counts["failed"] == 0:
+            status = "completed"
+        elif counts["completed"] == 0:
+            status = "failed"
+        else:
+            status = "completed_with_errors"
+        
+        return {
+            "batch_id": batch_id,
+            "status": status,
+            "created_at": batch.get("created_at"),
+            "total": total,
+            "done": done,
+            "progress": round(done / total, 4) if total else 1.0,
+            "counts": counts,
+            "presentations": presentations
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting batch status: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get batch status")
+
+def _format_status_event(status: dict) -> str:
+    return f"event: status\ndata: {json.dumps(status)}\n\n"
+
+async def stream_presentation_status(presentation_id: str):
+    """Push status changes to the client over server-sent events"""
+    pubsub = async_pubsub_client.pubsub()
+    # Subscribe before reading the current state so no transition slips in between
+    await pubsub.subscribe(get_presentation_channel(presentation_id))
+    try:
+        status = await get_presentation_status(presentation_id)
+    except Exception:
+        await pubsub.reset()
+        raise
+    
+    async def events():
+        current = status
+        try:
+            yield _format_status_event(current)
+            while current["status"] not in TERMINAL_STATUSES:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=settings.SSE_HEARTBEAT_INTERVAL
+                )
+                if message is None:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                current = await get_presentation_status(presentation_id)
+                yield _format_status_event(current)
+        finally:
+            await pubsub.reset()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 async def get_user_stats(user_id: str):
     """Get user usage statistics"""
     try:
-        daily_count = redis_client.get(get_user_key(user_id)) or 0
+        daily_count = await get_daily_count_async(user_id)
         return {
             "user_id": user_id,
-            "presentations_today": int(daily_count),
+            "presentations_today": daily_count,
             "daily_limit": settings.MAX_PRESENTATIONS_PER_DAY,
-            "remaining": settings.MAX_PRESENTATIONS_PER_DAY - int(daily_count)
+            "remaining": max(0, settings.MAX_PRESENTATIONS_PER_DAY - daily_count)
         }
     except Exception as e:
         logger.error(f"Error getting user stats: {e}")
         raise HTTPException(status_code=500, detail="Failed to get user statistics")
 
+
+def _parse_cursor(cursor: str) -> Tuple[float, Optional[str]]:
+    score, _, last_id = cursor.partition(":")
+    try:
+        return float(score), last_id or None
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+
+async def list_user_presentations(user_id: str, cursor: Optional[str] = None, limit: int = 20) -> Tuple[List[dict], Optional[str]]:
+    """List a user's presentations newest first, one page at a time.
+
+    ``cursor`` is ``<created_at timestamp>:<presentation id>`` of the last item
+    of the previous page. Returns the page and the cursor for the next one
+    (None when exhausted).
+    """
+    try:
+        user_index = get_user_presentations_key(user_id)
+        if cursor is None:
+            entries = await async_redis_client.zrevrangebyscore(user_index, "+inf", "-inf", start=0, num=limit, withscores=True)
+        else:
+            score, last_id = _parse_cursor(cursor)
+            if last_id is None:
+                # A bare timestamp, as handed out before ties were broken by ID
+                entries = await async_redis_client.zrevrangebyscore(user_index, f"({score!r}", "-inf", start=0, num=limit, withscores=True)
+            else:
+                # Decks created in the same instant share a score and come in descending
+                # ID order; fetch the cursor's score inclusively and skip the ones already sent
+                ties = await async_redis_client.zcount(user_index, score, score)
+                entries = await async_redis_client.zrevrangebyscore(user_index, repr(score), "-inf", start=0, num=limit + ties, withscores=True)
+                entries = [
+                    (presentation_id, entry_score) for presentation_id, entry_score in entries
+                    if entry_score != score or presentation_id < last_id
+                ][:limit]
+        if not entries:
+            return [], None
+        
+        records = await get_presentations_async([presentation_id for presentation_id, _ in entries])
+        
+        presentations = []
+        expired = []
+        for (presentation_id, _), record in zip(entries, records):
+            if not record or not record.get("status"):
+                expired.append(presentation_id)
+                continue
+            presentations.append({
+                "id": presentation_id,
+                "topic": record.get("topic"),
+                "status": record["status"],
+                "created_at": record.get("created_at"),
+                "slide_count": record.get("slide_count")
+            })
+        
+        # Records expire independently of the index; prune them as we find them
+        if expired:
+            await async_redis_client.zrem(user_index, *expired)
+        
+        next_cursor = f"{entries[-1][1]!r}:{entries[-1][0]}" if len(entries) == limit else None
+        return presentations, next_cursor
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting user presentations: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get user presentations")
@@ -0,0 +1,414 @@
+import datetime
+import hashlib
+import logging
+import time
+from io import BytesIO
+from typing import List, Optional
+
+from celery import chord, group, shared_task
+from utils.artifacts import (
+    delete_artifacts,
+    get_artifact,
+    get_json_artifact,
+    put_artifact,
+    put_json_artifact,
+    release_shared_artifacts,
+    share_artifacts
+)
+from utils.deck_cache import invalidate_deck
+from utils.metrics import observe_stage, stage_timer
+from utils.presentation_store import save_presentation, set_presentation_status
+from utils.rate_limit import release_daily_quota
+from utils.slide_store import (
+    get_slide_model,
+    load_slide_images,
+    release_edit_lock,
+    revision_file_id,
+    save_slide_model,
+    store_slide_images
+)
+from utils.storage import release_held_files
+from services.presentation_generator import (
+    PreloadedImages,
+    SlideContent,
+    build_presentation,
+    fetch_slide_image,
+    generate_batch_content,
+    generate_presentation_content,
+    group_outline_requests,
+    keep_slide_parts,
+    regenerate_slide,
+    slide_image_queries,
+    upload_presentation
+)
+from tasks.presentation_tasks import fail_identical_requests, finish_presentation
+from config import settings
+
+# Generation as a Celery canvas:
+#
+#   generate_content -> chord(group(fetch_image, ...), render_deck) -> upload_deck -> finalize_presentation
+#
+# Each stage is its own task so LLM calls, image downloads, rendering and
+# uploads can be routed to separate queues and scaled separately. Stages pass
+# a small JSON ``job`` dict along; slides, images and the .pptx travel as
+# references to short-lived Redis artifacts, never through the broker.
+#
+# A batch is split into groups of decks that are outlined by one completion
+# each. Every group then carries on by itself, so rendering of early groups
+# overlaps with outlining of later ones:
+#
+#   generate_outlines -> chord(group(fetch_image, ...), render_group)
+#     -> render_deck -> upload_deck -> finalize_presentation, per deck
+#
+# An image query shared by decks of a group is fetched once; across groups
+# the image cache does the same.
+#
+# Editing one slide of a finished deck reuses the stored slides and images
+# (utils/slide_store.py) for everything else:
+#
+#   revise_slide -> render_revision -> upload_deck -> finalize_revision
+
+logger = logging.getLogger(__name__)
+
+def _new_job(
+    presentation_id: str,
+    topic: str,
+    slide_count: int,
+    user_id: str,
+    cache_key: Optional[str] = None,
+    batch_id: Optional[str] = None,
+    quota_day: Optional[str] = None
+) -> dict:
+    return {
+        "presentation_id": presentation_id,
+        "topic": topic,
+        "slide_count": slide_count,
+        "user_id": user_id,
+        "cache_key": cache_key,
+        "batch_id": batch_id,
+        # The day the user's quota slot was charged to, for the refund on failure
+        "quota_day": quota_day,
+        "queued_at": time.time(),
+    }
+
+def _job_failed(job: dict):
+    return pipeline_failed.s(job["presentation_id"], job["cache_key"], job["user_id"], job.get("quota_day"))
+
+def start_presentation_pipeline(
+    presentation_id: str,
+    topic: str,
+    slide_count: int,
+    user_id: str,
+    cache_key: Optional[str] = None,
+    quota_day: Optional[str] = None
+):
+    """Queue the first stage; the rest of the canvas is built once the slides are known"""
+    job = _new_job(presentation_id, topic, slide_count, user_id, cache_key, quota_day=quota_day)
+    # Errbacks follow the task through replace(), so this covers every stage
+    return generate_content.apply_async((job,), link_error=_job_failed(job))
+
+def start_batch_pipeline(batch_id: str, decks: List[dict]):
+    """
+    Queue a batch of decks, each given as the keyword arguments of
+    start_presentation_pipeline
+    """
+    jobs = [_new_job(batch_id=batch_id, **deck) for deck in decks]
+    groups = group_outline_requests(
+        [(job["topic"], job["slide_count"]) for job in jobs],
+        settings.BATCH_OUTLINE_MAX_SLIDES
+    )
+    # Each group's errback follows it through replace(), up to render_group;
+    # from there every deck's chain carries its own
+    outlines = []
+    for number, indices in enumerate(groups):
+        group_jobs = [jobs[index] for index in indices]
+        outlines.append(generate_outlines.s(group_jobs, f"{batch_id}-{number}").on_error(batch_failed.s(group_jobs)))
+    return group(outlines).apply_async()
+
+def _load_slides(job: dict) -> List[SlideContent]:
+    slides = get_json_artifact(job["slides_ref"])
+    if slides is None:
+        raise Exception("Slide content expired before the deck was finished")
+    return [SlideContent.from_dict(slide) for slide in slides]
+
+@shared_task(name='tasks.pipeline_tasks.generate_content', bind=True, max_retries=3)
+def generate_content(self, job: dict):
+    presentation_id = job["presentation_id"]
+    try:
+        set_presentation_status(presentation_id, "processing")
+        with stage_timer("content", job["slide_count"]):
+            slides = generate_presentation_content(job["topic"], job["slide_count"])
+        slides_ref = put_json_artifact(presentation_id, "slides", [slide.to_dict() for slide in slides])
+    except Exception as e:
+        logger.error(f"Error generating content for {presentation_id}: {e}")
+        raise self.retry(exc=e, countdown=60)
+    
+    job = dict(job, slides_ref=slides_ref)
+    fetches = group(fetch_image.s(presentation_id, query) for query in slide_image_queries(slides))
+    raise self.replace(chord(fetches, render_deck.s(job) | upload_deck.s() | finalize_presentation.s()))
+
+@shared_task(name='tasks.pipeline_tasks.fetch_image')
+def fetch_image(presentation_id: str, query: str) -> list:
+    """Returns ``[query, ref]``; ref is None when no image could be had, which only costs the slide its picture"""
+    try:
+        image_stream = fetch_slide_image(query)
+        if not image_stream:
+            return [query, None]
+        name = f"image:{hashlib.sha256(query.encode()).hexdigest()[:16]}"
+        return [query, put_artifact(presentation_id, name, image_stream.getvalue())]
+    except Exception as e:
+        logger.error(f"Error fetching image for query {query}: {e}")
+        return [query, None]
+
+@shared_task(name='tasks.pipeline_tasks.generate_outlines', bind=True, max_retries=3)
+def generate_outlines(self, jobs: List[dict], group_id: str):
+    """Outline a group of batch decks with one completion, then fetch their images together"""
+    try:
+        for job in jobs:
+            set_presentation_status(job["presentation_id"], "processing")
+        
+        started = time.perf_counter()
+        outlines = generate_batch_content([(job["topic"], job["slide_count"]) for job in jobs])
+        elapsed = time.perf_counter() - started
+        
+        queries = []
+        outlined = []
+        for job, slides in zip(jobs, outlines):
+            # Every deck in the group waited for the whole completion
+            observe_stage("content", job["slide_count"], elapsed)
+            slides_ref = put_json_artifact(job["presentation_id"], "slides", [slide.to_dict() for slide in slides])
+            outlined.append(dict(job, slides_ref=slides_ref, images_owner=group_id))
+            queries.extend(slide_image_queries(slides))
+    except Exception as e:
+        logger.error(f"Error generating outlines for {[job['presentation_id'] for job in jobs]}: {e}")
+        raise self.retry(exc=e, countdown=60)
+    
+    fetches = group(fetch_image.s(group_id, query) for query in dict.fromkeys(queries))
+    raise self.replace(chord(fetches, render_group.s(outlined)))
+
+@shared_task(name='tasks.pipeline_tasks.render_group')
+def render_group(image_refs: list, jobs: List[dict]) -> None:
+    """Give every deck of an outline group its own render/upload/finalize chain"""
+    share_artifacts(jobs[0]["images_owner"], len(jobs))
+    for job in jobs:
+        deck = render_deck.s(image_refs, job) | upload_deck.s() | finalize_presentation.s()
+        deck.apply_async(link_error=_job_failed(job))
+
+@shared_task(name='tasks.pipeline_tasks.render_deck')
+def render_deck(image_refs: list, job: dict) -> dict:
+    slides = _load_slides(job)
+    
+    # Batch decks get their whole group's images; load only this deck's
+    wanted = set(slide_image_queries(slides))
+    images = {}
+    for query, ref in image_refs:
+        image_bytes = get_artifact(ref) if ref and query in wanted else None
+        if image_bytes:
+            images[query] = image_bytes
+    
+    images = PreloadedImages(images)
+    prs = build_presentation(slides, images)
+    keep_slide_parts(job["presentation_id"], slides, images)
+    pptx_ref = _save_deck(prs, job)
+    
+    if job.get("images_owner"):
+        # The last deck to render frees them; if one fails first, they expire instead
+        release_shared_artifacts(job["images_owner"], [ref for _, ref in image_refs])
+    else:
+        delete_artifacts(ref for _, ref in image_refs)
+    return dict(job, pptx_ref=pptx_ref)
+
+def _save_deck(prs, job: dict) -> str:
+    buffer = BytesIO()
+    with stage_timer("save", job["slide_count"]):
+        prs.save(buffer)
+    return put_artifact(job["presentation_id"], "pptx", buffer.getvalue())
+
+@shared_task(name='tasks.pipeline_tasks.upload_deck', bind=True, max_retries=3)
+def upload_deck(self, job: dict) -> dict:
+    pptx = get_artifact(job["pptx_ref"])
+    if pptx is None:
+        raise Exception("Rendered deck expired before it was uploaded")
+    
+    try:
+        download_url = upload_presentation(
+            BytesIO(pptx),
+            job["presentation_id"],
+            job["topic"],
+            job["slide_count"],
+            file_id=job.get("file_id"),
+            # A revision becomes the deck's download only once finalize_revision bumps its number
+            store_url="file_id" not in job
+        )
+    except Exception as e:
+        logger.error(f"Error uploading {job['presentation_id']}: {e}")
+        raise self.retry(exc=e, countdown=60)
+    
+    delete_artifacts([job["pptx_ref"]])
+    return dict(job, download_url=download_url)
+
+@shared_task(name='tasks.pipeline_tasks.finalize_presentation')
+def finalize_presentation(job: dict) -> dict:
+    slides = _load_slides(job)
+    presentation_data = finish_presentation(
+        job["presentation_id"],
+        job["topic"],
+        job["user_id"],
+        job["cache_key"],
+        job["download_url"],
+        slides
+    )
+    delete_artifacts([job["slides_ref"]])
+    
+    # No single task spans the pipeline, so measure from when it was queued
+    observe_stage("total", job["slide_count"], time.time() - job["queued_at"])
+    return presentation_data
+
+@shared_task(name='tasks.pipeline_tasks.pipeline_failed')
+def pipeline_failed(
+    request,
+    exc,
+    traceback,
+    presentation_id: str,
+    cache_key: Optional[str] = None,
+    user_id: Optional[str] = None,
+    quota_day: Optional[str] = None
+):
+    """Error callback for every stage; runs once the failing stage has no retries left"""
+    logger.error(f"Presentation pipeline failed in {request.task} for {presentation_id}: {exc}")
+    _fail_presentation(presentation_id, cache_key, user_id, str(exc), quota_day)
+
+@shared_task(name='tasks.pipeline_tasks.batch_failed')
+def batch_failed(request, exc, traceback, jobs: List[dict]):
+    """Error callback for the stages an outline group shares; fails every deck in it"""
+    logger.error(f"Batch pipeline failed in {request.task} for batch {jobs[0]['batch_id']}: {exc}")
+    for job in jobs:
+        _fail_presentation(job["presentation_id"], job["cache_key"], job["user_id"], str(exc), job.get("quota_day"))
+
+def start_slide_revision(
+    presentation_id: str,
+    topic: str,
+    slide_count: int,
+    user_id: str,
+    index: int,
+    revision: int,
+    edits: Optional[dict] = None,
+    instructions: Optional[str] = None,
+    cache_key: Optional[str] = None
+):
+    """Queue a rebuild of a finished deck with slide ``index`` edited, or rewritten when there are no edits"""
+    job = dict(
+        _new_job(presentation_id, topic, slide_count, user_id, cache_key),
+        index=index,
+        revision=revision,
+        file_id=revision_file_id(presentation_id, revision)
+    )
+    revision_chain = revise_slide.s(job, edits, instructions) | render_revision.s() | upload_deck.s() | finalize_revision.s()
+    return revision_chain.apply_async(link_error=revision_failed.s(presentation_id))
+
+@shared_task(name='tasks.pipeline_tasks.revise_slide', bind=True, max_retries=3)
+def revise_slide(self, job: dict, edits: Optional[dict] = None, instructions: Optional[str] = None) -> dict:
+    presentation_id = job["presentation_id"]
+    index = job["index"]
+    save_presentation(presentation_id, edit_status="processing")
+    
+    model = get_slide_model(presentation_id)
+    if model is None:
+        raise Exception("The slides of this presentation have expired")
+    slides = [SlideContent.from_dict(slide) for slide in model["slides"]]
+    if not 0 <= index < len(slides):
+        raise Exception(f"Slide {index} is out of range")
+    
+    if edits:
+        slides[index] = SlideContent.from_dict(dict(slides[index].to_dict(), **edits))
+    else:
+        try:
+            with stage_timer("revise_content", len(slides)):
+                slides[index] = regenerate_slide(job["topic"], slides, index, instructions)
+        except Exception as e:
+            logger.error(f"Error rewriting slide {index} of {presentation_id}: {e}")
+            raise self.retry(exc=e, countdown=10)
+    
+    # Every other picture is already stored; only the revised slide can need a new one
+    wanted = slide_image_queries(slides)
+    images = {query: digest for query, digest in model["images"].items() if query in wanted}
+    query = slides[index].image_query
+    if query in wanted and query not in images:
+        with stage_timer("revise_image", len(slides)):
+            image_stream = fetch_slide_image(query)
+        if image_stream:
+            images.update(store_slide_images({query: image_stream.getvalue()}))
+    
+    slides_ref = put_json_artifact(
+        presentation_id,
+        f"revision:{job['revision']}",
+        {"slides": [slide.to_dict() for slide in slides], "images": images}
+    )
+    return dict(job, slides_ref=slides_ref)
+
+def _load_revision(job: dict) -> dict:
+    revision = get_json_artifact(job["slides_ref"])
+    if revision is None:
+        raise Exception("Revised slides expired before the deck was finished")
+    return revision
+
+@shared_task(name='tasks.pipeline_tasks.render_revision')
+def render_revision(job: dict) -> dict:
+    """Reassemble the deck from its stored slides and images"""
+    revision = _load_revision(job)
+    slides = [SlideContent.from_dict(slide) for slide in revision["slides"]]
+    
+    images = load_slide_images(revision["images"])
+    if len(images) < len(revision["images"]):
+        logger.warning(f"{len(revision['images']) - len(images)} stored images of {job['presentation_id']} have expired")
+    
+    prs = build_presentation(slides, PreloadedImages(images))
+    return dict(job, pptx_ref=_save_deck(prs, job))
+
+@shared_task(name='tasks.pipeline_tasks.finalize_revision')
+def finalize_revision(job: dict) -> None:
+    presentation_id = job["presentation_id"]
+    revision = _load_revision(job)
+    save_slide_model(presentation_id, revision["slides"], revision["images"])
+    save_presentation(
+        presentation_id,
+        download_url=job["download_url"],
+        revision=job["revision"],
+        edited_at=datetime.datetime.now().isoformat(),
+        edit_status="completed",
+        edit_error=None,
+        # The deck no longer matches what the cache hands out for its topic
+        cache_key=None
+    )
+    if job.get("cache_key"):
+        invalidate_deck(job["cache_key"])
+    
+    release_edit_lock(presentation_id)
+    delete_artifacts([job["slides_ref"]])
+    # Let go of the replaced deck and of revisions from edits that failed after
+    # their upload. The original may still be served to copies from the deck
+    # cache; it goes once none of them holds it.
+    release_held_files(presentation_id, keep=job["download_url"])
+    
+    observe_stage("revision_total", job["slide_count"], time.time() - job["queued_at"])
+
+@shared_task(name='tasks.pipeline_tasks.revision_failed')
+def revision_failed(request, exc, traceback, presentation_id: str):
+    """Error callback for a slide edit; the deck as it was stays available"""
+    logger.error(f"Slide revision failed in {request.task} for {presentation_id}: {exc}")
+    save_presentation(presentation_id, edit_status="failed", edit_error=str(exc))
+    release_edit_lock(presentation_id)
+
+def _fail_presentation(
+    presentation_id: str,
+    cache_key: Optional[str],
+    user_id: Optional[str],
+    error: str,
+    quota_day: Optional[str] = None
+) -> None:
+    set_presentation_status(presentation_id, "failed", error)
+    if user_id:
+        release_daily_quota(user_id, quota_day=quota_day)
+    
+    if cache_key:
+        fail_identical_requests(cache_key, presentation_id, error, final=True)
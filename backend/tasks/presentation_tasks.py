@@ -1,58 +1,149 @@
-import asyncio
 import datetime
-import json
 import logging
-from typing import Optional
+from typing import List, Optional
 
 from celery import shared_task
-from utils.redis import redis_client
-from utils.helpers import increment_user_count
-from services.presentation_generator import create_powerpoint, generate_presentation_content
+# Make the configured app the default in processes that only send tasks (the
+# API), so shared tasks publish with its broker, queues and routes
+from utils.celery import QUEUE_DEFAULT, QUEUE_IO, celery_app
+from utils.presentation_store import set_presentation_status, store_completed_presentation
+from utils.deck_cache import cache_deck, drain_waiters, get_waiters, remove_orphaned_waiter
+from utils.metrics import stage_timer
+from utils.rate_limit import release_daily_quota
+from utils.slide_store import copy_slide_model
+from utils.storage import hold_file
+from config import settings
+from services.presentation_generator import (
+    SlideContent,
+    create_powerpoint,
+    generate_and_create_powerpoint,
+    generate_presentation_content
+)
 
 # Set up proper logging
 logger = logging.getLogger(__name__)
 
+def _complete_identical_requests(cache_key: str, presentation_id: str, presentation_data: dict, slides):
+    """Cache the result, then hand it to every request that was coalesced onto this one"""
+    cache_deck(cache_key, dict(presentation_data, slides=[slide.to_dict() for slide in slides], source_id=presentation_id))
+    
+    for waiter in drain_waiters(cache_key, presentation_id, completed=True):
+        # Each copy can be edited on its own from here on, but shares the stored file
+        copy_slide_model(presentation_id, waiter["presentation_id"])
+        hold_file(waiter["presentation_id"], presentation_data["download_url"])
+        # Listed by when it was asked for, not when the leader finished
+        store_completed_presentation(
+            waiter["presentation_id"],
+            waiter["user_id"],
+            dict(
+                presentation_data,
+                user_id=waiter["user_id"],
+                created_at=waiter.get("created_at") or datetime.datetime.now().isoformat()
+            )
+        )
+
+def fail_identical_requests(cache_key: str, presentation_id: str, error: str, final: bool):
+    """
+    Mirror the leader's failure onto coalesced requests; give up on them after
+    the last retry. Shared with the canvas pipeline.
+    """
+    waiters = drain_waiters(cache_key, presentation_id, completed=False) if final else get_waiters(cache_key)
+    for waiter in waiters:
+        set_presentation_status(waiter["presentation_id"], "failed", error)
+        if final:
+            release_daily_quota(waiter["user_id"], quota_day=waiter.get("quota_day"))
+
+def schedule_waiter_expiry(cache_key: str, waiter: dict) -> None:
+    """Check on a coalesced request once its leader's lock must have run out"""
+    # Whichever worker profile the pipeline mode runs also takes the check
+    queue = QUEUE_IO if settings.PIPELINE_MODE == "canvas" else QUEUE_DEFAULT
+    expire_waiter.apply_async((cache_key, waiter), countdown=settings.DECK_LOCK_TTL, queue=queue)
+
+@shared_task(name='tasks.presentation_tasks.expire_waiter', bind=True, max_retries=None)
+def expire_waiter(self, cache_key: str, waiter: dict):
+    """Fail a coalesced request whose leader died or timed out without draining it"""
+    orphaned = remove_orphaned_waiter(cache_key, waiter)
+    if orphaned is None:
+        # A newer leader holds the lock and drains the list, this request included
+        raise self.retry(countdown=settings.DECK_LOCK_TTL)
+    if orphaned:
+        logger.warning(f"Coalesced request {waiter['presentation_id']} was never completed; failing it")
+        set_presentation_status(waiter["presentation_id"], "failed", "The identical request this one was waiting on did not finish")
+        release_daily_quota(waiter["user_id"], quota_day=waiter.get("quota_day"))
+
 @shared_task(name='tasks.presentation_tasks.generate_presentation_task', bind=True, max_retries=3)
-def generate_presentation_task(self, presentation_id: str, topic: str, slide_count: int, user_id: str, client_id: Optional[str] = None):
+def generate_presentation_task(
+    self,
+    presentation_id: str,
+    topic: str,
+    slide_count: int,
+    user_id: str,
+    client_id: Optional[str] = None,
+    cache_key: Optional[str] = None,
+    quota_day: Optional[str] = None
+):
     try:
-        # Update status to processing
-        redis_client.setex(f"presentation:{presentation_id}:status", 3600, "processing")
+        with stage_timer("total", slide_count):
+            return _generate_presentation(presentation_id, topic, slide_count, user_id, cache_key)
         
-        # Generate content - Check if the function is async or sync
-        # Option 1: If generate_presentation_content is async
-        try:
-            slides = asyncio.run(generate_presentation_content(topic, slide_count))
-        except ValueError:
-            # Option 2: If generate_presentation_content is sync (not a coroutine)
+    except Exception as e:
+        logger.error(f"Error in background task: {e}")
+        set_presentation_status(presentation_id, "failed", str(e))
+        
+        final = self.request.retries >= self.max_retries
+        if final:
+            # Don't charge the user for a deck they never got, on the day they were charged
+            release_daily_quota(user_id, quota_day=quota_day)
+        if cache_key:
+            fail_identical_requests(cache_key, presentation_id, str(e), final=final)
+        
+        raise self.retry(exc=e, countdown=60)
+
+def _generate_presentation(presentation_id: str, topic: str, slide_count: int, user_id: str, cache_key: Optional[str]) -> dict:
+    # Update status to processing
+    set_presentation_status(presentation_id, "processing")
+    
+    first_slide_latency = None
+    if settings.LLM_STREAMING:
+        # Render slides as they stream in from the model
+        filepath, slides, first_slide_latency = generate_and_create_powerpoint(topic, slide_count, presentation_id)
+    else:
+        # Generate content
+        with stage_timer("content", slide_count):
             slides = generate_presentation_content(topic, slide_count)
         
         # Create PowerPoint file
         filepath = create_powerpoint(slides, presentation_id, topic)
-        
-        # Update status to completed
-        presentation_data = {
-            "status": "completed",
-            "filepath": filepath,
-            "created_at": datetime.datetime.now().isoformat(),
-            "topic": topic,
-            "slide_count": len(slides)
-        }
-        
-        redis_client.setex(
-            f"presentation:{presentation_id}:data", 
-            3600, 
-            json.dumps(presentation_data)
-        )
-        redis_client.setex(f"presentation:{presentation_id}:status", 3600, "completed")
-        
-        # Increment user count
-        increment_user_count(user_id)
-        
-        return presentation_data
-        
-    except Exception as e:
-        logger.error(f"Error in background task: {e}")
-        redis_client.setex(f"presentation:{presentation_id}:status", 3600, "failed")
-        redis_client.setex(f"presentation:{presentation_id}:error", 3600, str(e))
-        
-        raise self.retry(exc=e, countdown=60)
\ No newline at end of file
+    
+    return finish_presentation(presentation_id, topic, user_id, cache_key, filepath, slides, first_slide_latency)
+
+def finish_presentation(
+    presentation_id: str,
+    topic: str,
+    user_id: str,
+    cache_key: Optional[str],
+    download_url: str,
+    slides: List[SlideContent],
+    first_slide_latency: Optional[float] = None
+) -> dict:
+    """Record the finished deck and release coalesced requests; shared with the canvas pipeline"""
+    slide_count = len(slides)
+    
+    # Update status to completed
+    presentation_data = {
+        "status": "completed",
+        "download_url": download_url,
+        "created_at": datetime.datetime.now().isoformat(),
+        "topic": topic,
+        "slide_count": slide_count,
+        "user_id": user_id,
+        "cache_key": cache_key,
+        "first_slide_latency": first_slide_latency
+    }
+    with stage_timer("store", slide_count):
+        store_completed_presentation(presentation_id, user_id, presentation_data)
+    
+    if cache_key:
+        _complete_identical_requests(cache_key, presentation_id, presentation_data, slides)
+    
+    return presentation_data
\ No newline at end of file
@@ -0,0 +1,38 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# The app reads its settings at import time; the clients built from them are
+# swapped for fakes below before they connect
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa", reason="the Lua scripts need fakeredis[lua]")
+import fakeredis.aioredis
+
+import utils.redis
+
+# Modules register their scripts on these clients when first imported, so the
+# fakes must be in place before anything else from the app is
+server = fakeredis.FakeServer()
+utils.redis.redis_client = fakeredis.FakeRedis(server=server, decode_responses=True)
+utils.redis.binary_redis_client = fakeredis.FakeRedis(server=server)
+utils.redis.async_redis_client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+utils.redis.async_pubsub_client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+
+# The async fake binds to the loop it first runs on
+_loop = asyncio.new_event_loop()
+
+@pytest.fixture(autouse=True)
+def redis():
+    utils.redis.redis_client.flushall()
+    yield utils.redis.redis_client
+
+@pytest.fixture
+def run():
+    """Run a coroutine on the loop the async fake is bound to"""
+    return _loop.run_until_complete
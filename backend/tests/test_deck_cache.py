@@ -0,0 +1,98 @@
+import pytest
+from celery.exceptions import Retry
+
+import services.presentation_service as presentation_service
+from tasks.presentation_tasks import expire_waiter, fail_identical_requests
+from utils.deck_cache import acquire_deck_lock, add_waiter, drain_waiters, get_waiters, remove_orphaned_waiter
+from utils.presentation_store import get_presentation, save_presentation
+from utils.rate_limit import daily_quota_key
+
+CACHE_KEY = "topic"
+
+def _waiter(presentation_id: str, user_id: str = "user") -> dict:
+    return {"presentation_id": presentation_id, "user_id": user_id}
+
+def test_join_needs_a_leader(redis):
+    assert not add_waiter(CACHE_KEY, _waiter("early"))
+    assert acquire_deck_lock(CACHE_KEY, "leader")
+    assert add_waiter(CACHE_KEY, _waiter("waiter"))
+    assert get_waiters(CACHE_KEY) == [_waiter("waiter")]
+
+def test_drain_releases_the_lock_with_the_list(redis):
+    acquire_deck_lock(CACHE_KEY, "leader")
+    add_waiter(CACHE_KEY, _waiter("waiter"))
+
+    assert drain_waiters(CACHE_KEY, "leader", completed=False) == [_waiter("waiter")]
+    # Too late to join; the request must lead instead of waiting on nobody
+    assert not add_waiter(CACHE_KEY, _waiter("late"))
+    assert acquire_deck_lock(CACHE_KEY, "late")
+
+def test_failed_leader_leaves_a_newer_leaders_waiters(redis):
+    acquire_deck_lock(CACHE_KEY, "newer")
+    add_waiter(CACHE_KEY, _waiter("waiter"))
+
+    assert drain_waiters(CACHE_KEY, "stale", completed=False) == []
+    assert redis.get("deck_cache:topic:lock") == "newer"
+    # A finished deck is good for anyone waiting on the topic
+    assert drain_waiters(CACHE_KEY, "stale", completed=True) == [_waiter("waiter")]
+    assert redis.get("deck_cache:topic:lock") == "newer"
+
+def test_waiter_joining_during_drain_leads(redis, run, monkeypatch):
+    """The leader drains and releases between a request's lock attempt and its join"""
+    acquire_deck_lock(CACHE_KEY, "leader")
+    real_acquire = presentation_service.acquire_deck_lock_async
+    attempts = []
+
+    async def leader_fails_in_between(cache_key, presentation_id):
+        acquired = await real_acquire(cache_key, presentation_id)
+        if not attempts:
+            fail_identical_requests(cache_key, "leader", "failed", final=True)
+        attempts.append(acquired)
+        return acquired
+
+    monkeypatch.setattr(presentation_service, "get_cache_key", lambda topic, preferences: CACHE_KEY)
+    monkeypatch.setattr(presentation_service, "acquire_deck_lock_async", leader_fails_in_between)
+    monkeypatch.setattr(presentation_service, "schedule_waiter_expiry", lambda *args: pytest.fail("joined a drained list"))
+
+    response, _ = run(presentation_service._admit_presentation("request", "AI", {}, "user"))
+
+    assert response is None
+    assert attempts == [False, True]
+    assert redis.get("deck_cache:topic:lock") == "request"
+    assert get_waiters(CACHE_KEY) == []
+
+def test_orphaned_waiter_is_failed_and_refunded(redis):
+    waiter = dict(_waiter("waiter"), quota_day="2026-10-17")
+    acquire_deck_lock(CACHE_KEY, "leader")
+    add_waiter(CACHE_KEY, waiter)
+    save_presentation("waiter", status="queued")
+    redis.set("user:user:daily:2026-10-17", 1)
+
+    # The leader's worker died: its lock runs out and nobody drains the list
+    redis.delete("deck_cache:topic:lock")
+    expire_waiter.run(CACHE_KEY, waiter)
+
+    assert get_presentation("waiter")["status"] == "failed"
+    assert redis.get("user:user:daily:2026-10-17") == "0"
+    assert get_waiters(CACHE_KEY) == []
+
+def test_waiter_under_a_newer_leader_is_left_to_it(redis):
+    acquire_deck_lock(CACHE_KEY, "leader")
+    add_waiter(CACHE_KEY, _waiter("waiter"))
+
+    assert remove_orphaned_waiter(CACHE_KEY, _waiter("waiter")) is None
+    with pytest.raises(Retry):
+        expire_waiter.run(CACHE_KEY, _waiter("waiter"))
+    assert get_waiters(CACHE_KEY) == [_waiter("waiter")]
+
+def test_drained_waiter_is_left_alone(redis):
+    acquire_deck_lock(CACHE_KEY, "leader")
+    add_waiter(CACHE_KEY, _waiter("waiter"))
+    drain_waiters(CACHE_KEY, "leader", completed=True)
+    save_presentation("waiter", status="completed")
+    redis.set(daily_quota_key("user"), 1)
+
+    expire_waiter.run(CACHE_KEY, _waiter("waiter"))
+
+    assert get_presentation("waiter")["status"] == "completed"
+    assert redis.get(daily_quota_key("user")) == "1"
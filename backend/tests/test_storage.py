@@ -0,0 +1,107 @@
+import io
+import os
+import time
+
+import pytest
+
+import utils.storage as storage
+from config import settings
+from services.presentation_generator import upload_presentation
+from tasks.pipeline_tasks import finalize_revision
+from utils.artifacts import put_json_artifact
+from utils.presentation_store import get_presentation, save_presentation
+from utils.storage import hold_file, release_file, release_held_files, upload_file
+
+@pytest.fixture(autouse=True)
+def local_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "local")
+    monkeypatch.setattr(settings, "LOCAL_STORAGE_DIR", str(tmp_path))
+    # Backends are built once per process, with the directory of the time
+    monkeypatch.setattr(storage, "_backends", {})
+    return tmp_path
+
+def _stored(location: str) -> bool:
+    return os.path.exists(storage.storage_for(location).path(location))
+
+def _upload(file_id: str) -> str:
+    return upload_file(io.BytesIO(b"PK deck"), file_id)
+
+def test_last_holder_deletes_the_file(redis):
+    location = _upload("source")
+    hold_file("source", location)
+    hold_file("copy", location)
+
+    assert not release_file("source", location)
+    assert _stored(location)
+    assert release_file("copy", location)
+    assert not _stored(location)
+    assert not redis.exists(f"stored_file:{location}:holders")
+
+def test_release_is_idempotent(redis):
+    location = _upload("source")
+    hold_file("source", location)
+    hold_file("copy", location)
+
+    # A retried delete must not count as the other holder letting go
+    release_file("source", location)
+    assert not release_file("source", location)
+    assert _stored(location)
+
+def test_file_without_holders_is_kept(redis):
+    """Decks stored before tracking may be shared; nothing proves they are not"""
+    location = _upload("legacy")
+
+    assert not release_file("legacy", location)
+    assert _stored(location)
+
+def test_release_held_files_keeps_the_current_deck(redis):
+    original = _upload("deck")
+    revision = _upload("deck-r1")
+    hold_file("deck", original)
+    hold_file("deck", revision)
+
+    release_held_files("deck", keep=revision)
+
+    assert not _stored(original)
+    assert _stored(revision)
+    assert redis.smembers("presentation:deck:files") == {revision}
+
+def _finalize(presentation_id: str, revision: int, location: str) -> None:
+    slides_ref = put_json_artifact(presentation_id, f"revision:{revision}", {"slides": [], "images": {}})
+    finalize_revision.run({
+        "presentation_id": presentation_id,
+        "revision": revision,
+        "download_url": location,
+        "slides_ref": slides_ref,
+        "cache_key": None,
+        "slide_count": 1,
+        "queued_at": time.time(),
+    })
+
+def test_finalize_revision_releases_what_it_replaces(redis):
+    original = upload_presentation(io.BytesIO(b"PK original"), "deck", "AI")
+    save_presentation("deck", status="completed")
+    # An edit whose finalize failed after its upload
+    abandoned = upload_presentation(io.BytesIO(b"PK r1"), "deck", "AI", file_id="deck-r1", store_url=False)
+    revision = upload_presentation(io.BytesIO(b"PK r2"), "deck", "AI", file_id="deck-r2", store_url=False)
+    # The revision upload alone does not move the deck
+    assert get_presentation("deck")["download_url"] == original
+
+    _finalize("deck", 2, revision)
+
+    record = get_presentation("deck")
+    assert (record["download_url"], record["revision"]) == (revision, 2)
+    assert not _stored(original)
+    assert not _stored(abandoned)
+    assert _stored(revision)
+
+def test_finalize_revision_keeps_an_original_a_copy_holds(redis):
+    original = upload_presentation(io.BytesIO(b"PK original"), "deck", "AI")
+    hold_file("copy", original)
+    revision = upload_presentation(io.BytesIO(b"PK r1"), "deck", "AI", file_id="deck-r1", store_url=False)
+
+    _finalize("deck", 1, revision)
+
+    assert _stored(original)
+    assert release_file("copy", original)
+    assert not _stored(original)
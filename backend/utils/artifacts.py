@@ -0,0 +1,56 @@
+import json
+import logging
+from typing import Any, Iterable, Optional
+
+from config import settings
+from .redis import binary_redis_client
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_PREFIX = "artifact:"
+
+def artifact_ref(owner: str, name: str) -> str:
+    return f"{ARTIFACT_PREFIX}{owner}:{name}"
+
+def put_artifact(owner: str, name: str, data: bytes) -> str:
+    """
+    Store an intermediate result and return the reference to pass between
+    pipeline stages instead of the payload itself
+    """
+    ref = artifact_ref(owner, name)
+    binary_redis_client.setex(ref, settings.ARTIFACT_TTL, data)
+    return ref
+
+def get_artifact(ref: str) -> Optional[bytes]:
+    return binary_redis_client.get(ref)
+
+def put_json_artifact(owner: str, name: str, value: Any) -> str:
+    return put_artifact(owner, name, json.dumps(value).encode())
+
+def get_json_artifact(ref: str) -> Optional[Any]:
+    data = get_artifact(ref)
+    return json.loads(data) if data is not None else None
+
+def delete_artifacts(refs: Iterable[Optional[str]]) -> None:
+    refs = [ref for ref in refs if ref]
+    if not refs:
+        return
+    try:
+        binary_redis_client.delete(*refs)
+    except Exception as e:
+        # They expire on their own; this only frees memory early
+        logger.warning(f"Could not delete pipeline artifacts: {e}")
+
+def share_artifacts(owner: str, holders: int) -> None:
+    """Record that ``holders`` stages read ``owner``'s artifacts; see release_shared_artifacts"""
+    binary_redis_client.setex(artifact_ref(owner, "holders"), settings.ARTIFACT_TTL, holders)
+
+def release_shared_artifacts(owner: str, refs: Iterable[Optional[str]]) -> None:
+    """Drop one holder; the last one out deletes the artifacts"""
+    try:
+        holders = binary_redis_client.decr(artifact_ref(owner, "holders"))
+    except Exception as e:
+        logger.warning(f"Could not release shared artifacts of {owner}: {e}")
+        return
+    if holders <= 0:
+        delete_artifacts(list(refs) + [artifact_ref(owner, "holders")])
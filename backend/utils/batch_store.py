@@ -0,0 +1,29 @@
+import datetime
+import json
+from typing import Dict, List, Optional
+
+from config import settings
+from .redis import async_redis_client
+
+def get_batch_key(batch_id: str) -> str:
+    return f"batch:{batch_id}"
+
+async def save_batch_async(batch_id: str, user_id: str, presentation_ids: List[str]) -> None:
+    """
+    Record which presentations make up a batch; their own records carry the progress
+    """
+    key = get_batch_key(batch_id)
+    pipe = async_redis_client.pipeline()
+    pipe.hset(key, mapping={
+        "user_id": user_id,
+        "created_at": datetime.datetime.now().isoformat(),
+        "presentation_ids": json.dumps(presentation_ids),
+    })
+    pipe.expire(key, settings.PRESENTATION_TTL)
+    await pipe.execute()
+
+async def get_batch_async(batch_id: str) -> Optional[Dict]:
+    raw = await async_redis_client.hgetall(get_batch_key(batch_id))
+    if not raw:
+        return None
+    return dict(raw, presentation_ids=json.loads(raw["presentation_ids"]))
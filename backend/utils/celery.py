@@ -1,11 +1,42 @@
+import logging
+import os
+
 from celery import Celery
+from celery.signals import worker_init, worker_process_shutdown
+from kombu import Queue
 from config import settings
+from utils.metrics import mark_process_dead, start_metrics_server
+
+logger = logging.getLogger(__name__)
+
+# Network-bound stages (LLM, image providers, uploads) and CPU-bound rendering
+# get separate queues so each can be served by a suitably sized pool; see the
+# worker profiles in utils/celery_worker.py. The default keeps Celery's stock
+# name so messages queued before the split are still consumed.
+QUEUE_DEFAULT = 'celery'
+QUEUE_IO = 'io'
+QUEUE_RENDER = 'render'
+
+TASK_ROUTES = {
+    'tasks.pipeline_tasks.generate_content': {'queue': QUEUE_IO},
+    'tasks.pipeline_tasks.generate_outlines': {'queue': QUEUE_IO},
+    # Only dispatches the per-deck chains
+    'tasks.pipeline_tasks.render_group': {'queue': QUEUE_IO},
+    'tasks.pipeline_tasks.fetch_image': {'queue': QUEUE_IO},
+    'tasks.pipeline_tasks.upload_deck': {'queue': QUEUE_IO},
+    'tasks.pipeline_tasks.finalize_presentation': {'queue': QUEUE_IO},
+    'tasks.pipeline_tasks.revise_slide': {'queue': QUEUE_IO},
+    'tasks.pipeline_tasks.finalize_revision': {'queue': QUEUE_IO},
+    'tasks.pipeline_tasks.render_deck': {'queue': QUEUE_RENDER},
+    'tasks.pipeline_tasks.render_revision': {'queue': QUEUE_RENDER},
+    # The single-task path does both kinds of work and stays on the default queue
+}
 
 celery_app = Celery(
     'presentation_tasks',
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
-    include=['tasks.presentation_tasks']
+    include=['tasks.presentation_tasks', 'tasks.pipeline_tasks']
 )
 
 celery_app.conf.update(
@@ -14,4 +45,36 @@ celery_app.conf.update(
     result_serializer='json',
     timezone='UTC',
     enable_utc=True,
-) 
\ No newline at end of file
+    task_default_queue=QUEUE_DEFAULT,
+    task_queues=[Queue(name, routing_key=name) for name in (QUEUE_DEFAULT, QUEUE_IO, QUEUE_RENDER)],
+    task_routes=TASK_ROUTES,
+    # Tasks run for seconds to minutes, so reserving extra messages only
+    # strands them behind a busy worker while another sits idle
+    worker_prefetch_multiplier=settings.CELERY_PREFETCH_MULTIPLIER,
+    # Ack after the task finishes so a crashed worker's task is redelivered.
+    # Stages overwrite their artifacts and uploads, and the daily quota is
+    # charged when the API accepts the request, so a rerun is harmless
+    task_acks_late=settings.CELERY_ACKS_LATE,
+    # Status lives in the presentation store; results only carry chord
+    # headers and stage hand-offs, which are consumed within minutes
+    result_expires=settings.CELERY_RESULT_EXPIRES,
+    broker_transport_options={'visibility_timeout': settings.CELERY_VISIBILITY_TIMEOUT},
+)
+
+# The current app is thread-local; the API sends tasks from threadpool threads
+celery_app.set_default()
+
+@worker_init.connect
+def start_worker_metrics(**kwargs):
+    # Runs once in the worker's main process; prefork children report through PROMETHEUS_MULTIPROC_DIR
+    if not settings.CELERY_METRICS_PORT:
+        return
+    try:
+        start_metrics_server(settings.CELERY_METRICS_PORT)
+    except OSError as e:
+        # e.g. another worker on this host already owns the port; keep working without an exporter
+        logger.warning(f"Could not start metrics exporter on :{settings.CELERY_METRICS_PORT}: {e}")
+
+@worker_process_shutdown.connect
+def forget_worker_process(pid=None, **kwargs):
+    mark_process_dead(pid or os.getpid())
@@ -1,7 +1,84 @@
-from utils.celery  import celery_app
+import os
+import sys
+from typing import List
+
+from utils.celery import QUEUE_DEFAULT, QUEUE_IO, QUEUE_RENDER, celery_app
+from config import settings
 
 # Import all your task modules here to register them
 from tasks.presentation_tasks import generate_presentation_task
+from tasks import pipeline_tasks
+
+CPU_CONCURRENCY = settings.CELERY_CPU_CONCURRENCY or os.cpu_count() or 1
+
+# Launch profiles: python -m utils.celery_worker <profile> [extra celery worker options]
+# ``env`` entries are defaults; anything already set in the environment wins.
+WORKER_PROFILES = {
+    # LLM calls, image downloads and uploads spend nearly all their time waiting
+    # on the network, so many greenlets share one process
+    "io": {
+        "queues": [QUEUE_IO],
+        "pool": "gevent",
+        "concurrency": settings.CELERY_IO_CONCURRENCY,
+        # Tasks are short and the pool is wide; a buffer keeps greenlets fed between broker polls
+        "prefetch_multiplier": 4,
+        "env": {
+            # Per-process pools that would otherwise cap concurrent downloads below the greenlet count
+            "IMAGE_HEDGE_WORKERS": str(2 * settings.CELERY_IO_CONCURRENCY),
+            "HTTP_POOL_MAXSIZE": str(settings.CELERY_IO_CONCURRENCY),
+            "CELERY_METRICS_PORT": "9808",
+        },
+    },
+    # Rendering is pure Python and holds the GIL: one process per core
+    "render": {
+        "queues": [QUEUE_RENDER],
+        "pool": "prefork",
+        "concurrency": CPU_CONCURRENCY,
+        "env": {"CELERY_METRICS_PORT": "9809"},
+    },
+    # PIPELINE_MODE=single, where one task streams, downloads and renders
+    "default": {
+        "queues": [QUEUE_DEFAULT],
+        "pool": "prefork",
+        "concurrency": CPU_CONCURRENCY,
+        "env": {"CELERY_METRICS_PORT": "9810"},
+    },
+    # Every queue in one worker, for development
+    "all": {
+        "queues": [QUEUE_DEFAULT, QUEUE_IO, QUEUE_RENDER],
+        "pool": "prefork",
+        "concurrency": CPU_CONCURRENCY,
+        "env": {},
+    },
+}
+
+def _overrides_pool(extra: List[str]) -> bool:
+    return any(arg in ("-P", "--pool") or arg.startswith(("-P", "--pool=")) for arg in extra)
+
+def worker_argv(profile_name: str, extra: List[str] = ()) -> List[str]:
+    profile = WORKER_PROFILES[profile_name]
+    # Later options win for everything else, but celery decides whether to
+    # monkey-patch for gevent from the first --pool, so the profile's must go
+    pool = [] if _overrides_pool(extra) else ["--pool", profile["pool"]]
+    return [
+        "-A", "utils.celery_worker:celery_app",
+        "worker",
+        "--queues", ",".join(profile["queues"]),
+        *pool,
+        "--concurrency", str(profile["concurrency"]),
+        "--prefetch-multiplier", str(profile.get("prefetch_multiplier", settings.CELERY_PREFETCH_MULTIPLIER)),
+        "--hostname", f"{profile_name}@%h",
+        "--loglevel", "info",
+        *extra,
+    ]
 
 if __name__ == '__main__':
-    celery_app.start()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] in WORKER_PROFILES:
+        profile_name = sys.argv[1]
+        for key, value in WORKER_PROFILES[profile_name]["env"].items():
+            os.environ.setdefault(key, value)
+        # Hand over to the celery command in a fresh process: the gevent pool must
+        # monkey-patch sockets before anything (redis, requests) is imported
+        os.execv(sys.executable, [sys.executable, "-m", "celery", *worker_argv(profile_name, sys.argv[2:])])
+    else:
+        celery_app.start()
@@ -1,43 +1,54 @@
 import os
 import cloudinary
 import cloudinary.uploader
-from typing import Optional
+from typing import BinaryIO, Optional, Union
 from config import settings
-from .redis import redis_client
+from .presentation_store import get_presentation, save_presentation
 
 # Initialize Cloudinary
 cloudinary.config(
     cloud_name=settings.CLOUDINARY_CLOUD_NAME,
     api_key=settings.CLOUDINARY_API_KEY,
-    api_secret=settings.CLOUDINARY_API_SECRET
+    api_secret=settings.CLOUDINARY_API_SECRET,
+    upload_prefix=settings.CLOUDINARY_UPLOAD_PREFIX
 )
 
-def upload_to_cloudinary(file_path: str, presentation_id: str, topic: str) -> Optional[str]:
+def upload_to_cloudinary(file: Union[str, BinaryIO], presentation_id: str, topic: str) -> Optional[str]:
     """
-    Upload a PPTX file to Cloudinary and return the URL
+    Upload a PPTX file (a path or an open binary stream) to Cloudinary and return the URL.
+    Files larger than STORAGE_CHUNK_SIZE are sent in parts.
     """
     try:
-        result = cloudinary.uploader.upload(
-            file_path,
+        result = cloudinary.uploader.upload_large(
+            file,
             resource_type="raw",
-            public_id=f"presentations/{topic}",
-            overwrite=True
+            filename=f"{presentation_id}.pptx",
+            public_id=f"presentations/{presentation_id}",
+            overwrite=True,
+            chunk_size=settings.STORAGE_CHUNK_SIZE
         )
         return result.get('secure_url')
     except Exception as e:
         print(f"Error uploading to Cloudinary: {e}")
         return None
 
-def store_presentation_url(presentation_id: str, url: str, expiry_days: int = 7) -> bool:
+def delete_from_cloudinary(public_id: str) -> bool:
     """
-    Store the presentation URL in Redis with an expiry time
+    Remove an uploaded PPTX file by its public ID
     """
     try:
-        redis_client.setex(
-            f"presentation:{presentation_id}",
-            expiry_days * 24 * 60 * 60,  # Convert days to seconds
-            url
-        )
+        cloudinary.uploader.destroy(public_id, resource_type="raw")
+        return True
+    except Exception as e:
+        print(f"Error deleting from Cloudinary: {e}")
+        return False
+
+def store_presentation_url(presentation_id: str, url: str) -> bool:
+    """
+    Store the presentation URL on its Redis record
+    """
+    try:
+        save_presentation(presentation_id, download_url=url)
         return True
     except Exception as e:
         print(f"Error storing URL in Redis: {e}")
@@ -48,7 +59,8 @@ def get_presentation_url(presentation_id: str) -> Optional[str]:
     Retrieve the presentation URL from Redis
     """
     try:
-        return redis_client.get(f"presentation:{presentation_id}")
+        record = get_presentation(presentation_id)
+        return record.get("download_url") if record else None
     except Exception as e:
         print(f"Error retrieving URL from Redis: {e}")
         return None 
\ No newline at end of file
@@ -0,0 +1,157 @@
+import json
+import logging
+from typing import Dict, List, Optional
+
+from config import settings
+from .metrics import record_cache_lookup
+from .redis import async_redis_client, redis_client
+
+logger = logging.getLogger(__name__)
+
+# Only the owner may release a lock; a stale leader must not free its successor's
+_RELEASE_LOCK_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+_RELEASE_LOCK_SCRIPT = redis_client.register_script(_RELEASE_LOCK_LUA)
+_RELEASE_LOCK_SCRIPT_ASYNC = async_redis_client.register_script(_RELEASE_LOCK_LUA)
+
+# Join only while a leader holds the lock. Once the lock is gone nobody is left
+# to drain the list, so the caller must try to lead (or find the result) instead.
+# The list outlives the lock so orphans are still there for expire_waiter.
+_JOIN_LUA = """
+if redis.call('exists', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('rpush', KEYS[2], ARGV[1])
+redis.call('expire', KEYS[2], ARGV[2])
+return 1
+"""
+_JOIN_SCRIPT = redis_client.register_script(_JOIN_LUA)
+_JOIN_SCRIPT_ASYNC = async_redis_client.register_script(_JOIN_LUA)
+
+# Take every waiter and release the leader's lock in one step, so a request
+# either joins before the drain or finds the lock gone. A leader that failed
+# leaves the list to whoever leads now; a result is good for any waiter.
+_DRAIN_LUA = """
+local holder = redis.call('get', KEYS[1])
+if holder and holder ~= ARGV[1] and ARGV[2] == '0' then
+    return {}
+end
+local waiters = redis.call('lrange', KEYS[2], 0, -1)
+redis.call('del', KEYS[2])
+if holder == ARGV[1] then
+    redis.call('del', KEYS[1])
+end
+return waiters
+"""
+_DRAIN_SCRIPT = redis_client.register_script(_DRAIN_LUA)
+
+# A waiter still listed once no leader holds the lock was never drained
+_EXPIRE_WAITER_LUA = """
+if redis.call('exists', KEYS[1]) == 1 then
+    return -1
+end
+return redis.call('lrem', KEYS[2], 1, ARGV[1])
+"""
+_EXPIRE_WAITER_SCRIPT = redis_client.register_script(_EXPIRE_WAITER_LUA)
+
+def _result_key(cache_key: str) -> str:
+    return f"deck_cache:{cache_key}:result"
+
+def _lock_key(cache_key: str) -> str:
+    return f"deck_cache:{cache_key}:lock"
+
+def _waiters_key(cache_key: str) -> str:
+    return f"deck_cache:{cache_key}:waiters"
+
+def get_cached_deck(cache_key: str) -> Optional[Dict]:
+    """
+    Return the finished result for an identical earlier request, if still cached
+    """
+    try:
+        data = redis_client.get(_result_key(cache_key))
+        record_cache_lookup("deck", bool(data))
+        return json.loads(data) if data else None
+    except Exception as e:
+        logger.warning(f"Deck cache unavailable: {e}")
+        return None
+
+def cache_deck(cache_key: str, result: Dict) -> None:
+    redis_client.setex(_result_key(cache_key), settings.CACHE_TTL, json.dumps(result))
+
+def invalidate_deck(cache_key: str) -> None:
+    redis_client.delete(_result_key(cache_key))
+
+def acquire_deck_lock(cache_key: str, presentation_id: str) -> bool:
+    """
+    Claim generation of this deck. Returns False if an identical request is already in flight
+    """
+    return bool(redis_client.set(_lock_key(cache_key), presentation_id, nx=True, ex=settings.DECK_LOCK_TTL))
+
+def release_deck_lock(cache_key: str, presentation_id: str) -> None:
+    _RELEASE_LOCK_SCRIPT(keys=[_lock_key(cache_key)], args=[presentation_id])
+
+def add_waiter(cache_key: str, waiter: Dict) -> bool:
+    """
+    Attach a request (its presentation_id, user_id and created_at) to the
+    in-flight generation; it is completed with the leader's result. Returns
+    False when no request holds the lock any more.
+    """
+    return bool(_JOIN_SCRIPT(
+        keys=[_lock_key(cache_key), _waiters_key(cache_key)],
+        args=[json.dumps(waiter), 2 * settings.DECK_LOCK_TTL]
+    ))
+
+def get_waiters(cache_key: str) -> List[Dict]:
+    return [json.loads(waiter) for waiter in redis_client.lrange(_waiters_key(cache_key), 0, -1)]
+
+def drain_waiters(cache_key: str, presentation_id: str, completed: bool) -> List[Dict]:
+    """
+    Atomically take every waiter off the list and release the leader's lock.
+    After a failure, waiters that joined a newer leader are left to it.
+    """
+    waiters = _DRAIN_SCRIPT(
+        keys=[_lock_key(cache_key), _waiters_key(cache_key)],
+        args=[presentation_id, "1" if completed else "0"]
+    )
+    return [json.loads(waiter) for waiter in waiters]
+
+def remove_orphaned_waiter(cache_key: str, waiter: Dict) -> Optional[bool]:
+    """
+    Take a waiter, as passed to add_waiter, off the list if no request holds the deck lock.
+    True if it was still there, False if it was already drained, None while a leader holds the lock.
+    """
+    removed = _EXPIRE_WAITER_SCRIPT(
+        keys=[_lock_key(cache_key), _waiters_key(cache_key)],
+        args=[json.dumps(waiter)]
+    )
+    return None if removed < 0 else bool(removed)
+
+# Async variants used by the API tier
+
+async def get_cached_deck_async(cache_key: str) -> Optional[Dict]:
+    try:
+        data = await async_redis_client.get(_result_key(cache_key))
+        record_cache_lookup("deck", bool(data))
+        return json.loads(data) if data else None
+    except Exception as e:
+        logger.warning(f"Deck cache unavailable: {e}")
+        return None
+
+async def invalidate_deck_async(cache_key: str) -> None:
+    await async_redis_client.delete(_result_key(cache_key))
+
+async def acquire_deck_lock_async(cache_key: str, presentation_id: str) -> bool:
+    return bool(await async_redis_client.set(_lock_key(cache_key), presentation_id, nx=True, ex=settings.DECK_LOCK_TTL))
+
+async def release_deck_lock_async(cache_key: str, presentation_id: str) -> None:
+    await _RELEASE_LOCK_SCRIPT_ASYNC(keys=[_lock_key(cache_key)], args=[presentation_id])
+
+async def add_waiter_async(cache_key: str, waiter: Dict) -> bool:
+    return bool(await _JOIN_SCRIPT_ASYNC(
+        keys=[_lock_key(cache_key), _waiters_key(cache_key)],
+        args=[json.dumps(waiter), 2 * settings.DECK_LOCK_TTL]
+    ))
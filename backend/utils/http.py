@@ -0,0 +1,90 @@
+import os
+import threading
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import settings
+
+# (connect, read) timeout applied to every outbound request
+HTTP_TIMEOUT = (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT)
+
+# Same budget for the API tier's async client, whose pool lives on the event loop
+ASYNC_HTTP_TIMEOUT = httpx.Timeout(settings.HTTP_READ_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT)
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=settings.HTTP_MAX_RETRIES,
+        backoff_factor=settings.HTTP_BACKOFF_FACTOR,
+        # 429 is left to the provider circuit breakers rather than retried here
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_http_session() -> requests.Session:
+    """
+    Return this process's shared session, which keeps a keep-alive connection
+    pool per host. A forked child (e.g. a Celery prefork worker) gets its own
+    session instead of reusing sockets inherited from the parent.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = _build_session()
+                _session_pid = pid
+    return _session
+
+def _reset_after_fork() -> None:
+    global _session, _session_pid, _session_lock
+    # The parent's lock may have been held mid-fork; never close the parent's sockets from here
+    _session_lock = threading.Lock()
+    _session = None
+    _session_pid = None
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+_async_client = None
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Return the API process's shared async client. Must be used from the event
+    loop; it is closed by close_async_http_client() on shutdown.
+    """
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=settings.ASYNC_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.ASYNC_HTTP_MAX_KEEPALIVE,
+            ),
+            # httpx only retries failed connects; reads are not replayed
+            retries=settings.HTTP_MAX_RETRIES,
+        )
+        _async_client = httpx.AsyncClient(timeout=ASYNC_HTTP_TIMEOUT, transport=transport)
+    return _async_client
+
+async def close_async_http_client() -> None:
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
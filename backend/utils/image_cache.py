@@ -0,0 +1,180 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from io import BytesIO
+from typing import Dict, Optional
+
+from config import settings
+from .metrics import record_cache_lookup
+from .redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+QUERY_KEY_PREFIX = "image_cache:query:"
+STATS_KEY = "image_cache:stats"
+
+_sweep_lock = threading.Lock()
+_last_sweep = 0.0
+
+def normalize_query(query: str) -> str:
+    """Reduce a search query to a canonical form so near-identical queries share an entry"""
+    tokens = re.findall(r"[a-z0-9]+", (query or "").lower())
+    return " ".join(sorted(set(tokens)))
+
+def _query_key(normalized: str) -> str:
+    return f"{QUERY_KEY_PREFIX}{normalized}"
+
+def _blob_path(digest: str) -> str:
+    return os.path.join(settings.IMAGE_CACHE_DIR, digest)
+
+def _record(outcome: str) -> None:
+    record_cache_lookup("image", outcome == "hits")
+    try:
+        redis_client.hincrby(STATS_KEY, outcome, 1)
+    except Exception as e:
+        logger.debug(f"Could not record image cache {outcome}: {e}")
+
+def _read_blob(digest: str) -> Optional[bytes]:
+    path = _blob_path(digest)
+    try:
+        with open(path, "rb") as blob:
+            data = blob.read()
+        # mtime doubles as the last-access time used for LRU eviction
+        os.utime(path)
+        return data
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning(f"Could not read cached image {digest}: {e}")
+        return None
+
+def _write_blob(digest: str, data: bytes) -> None:
+    path = _blob_path(digest)
+    if os.path.exists(path):
+        os.utime(path)
+        return
+
+    os.makedirs(settings.IMAGE_CACHE_DIR, exist_ok=True)
+    # Write then rename so concurrent readers never see a partial blob
+    fd, tmp_path = tempfile.mkstemp(dir=settings.IMAGE_CACHE_DIR, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def evict_expired_and_lru() -> int:
+    """Drop blobs idle for longer than the TTL, then the least recently used ones until under budget"""
+    entries = []
+    now = time.time()
+    removed = 0
+
+    try:
+        scanner = os.scandir(settings.IMAGE_CACHE_DIR)
+    except FileNotFoundError:
+        return 0
+
+    with scanner:
+        for entry in scanner:
+            if not entry.is_file() or entry.name.startswith(".tmp-"):
+                continue
+            stat = entry.stat()
+            if now - stat.st_mtime > settings.IMAGE_CACHE_TTL:
+                removed += _remove_blob(entry.path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    if total > settings.IMAGE_CACHE_MAX_BYTES:
+        # Evict down to a low-water mark so we don't sweep again on the next write
+        target = int(settings.IMAGE_CACHE_MAX_BYTES * 0.9)
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            removed += _remove_blob(path)
+            total -= size
+
+    if removed:
+        logger.info(f"Evicted {removed} cached images")
+    return removed
+
+def _remove_blob(path: str) -> int:
+    try:
+        os.unlink(path)
+        return 1
+    except FileNotFoundError:
+        return 0
+
+def _maybe_sweep() -> None:
+    global _last_sweep
+    now = time.monotonic()
+    if now - _last_sweep < settings.IMAGE_CACHE_SWEEP_INTERVAL:
+        return
+    if not _sweep_lock.acquire(blocking=False):
+        return
+    try:
+        _last_sweep = now
+        evict_expired_and_lru()
+    finally:
+        _sweep_lock.release()
+
+def get_cached_image(query: str) -> Optional[BytesIO]:
+    """
+    Look up an image by query, returning None on a miss
+    """
+    normalized = normalize_query(query)
+    if not settings.IMAGE_CACHE_ENABLED or not normalized:
+        return None
+
+    try:
+        digest = redis_client.get(_query_key(normalized))
+    except Exception as e:
+        logger.warning(f"Image cache index unavailable: {e}")
+        return None
+
+    if digest:
+        data = _read_blob(digest)
+        if data is not None:
+            _record("hits")
+            return BytesIO(data)
+
+    _record("misses")
+    return None
+
+def store_cached_image(query: str, image_stream: BytesIO) -> None:
+    """
+    Store downloaded image bytes under their content hash and point the query at them
+    """
+    normalized = normalize_query(query)
+    if not settings.IMAGE_CACHE_ENABLED or not normalized:
+        return
+
+    try:
+        data = image_stream.getvalue()
+        digest = hashlib.sha256(data).hexdigest()
+        _write_blob(digest, data)
+        redis_client.setex(_query_key(normalized), settings.IMAGE_CACHE_TTL, digest)
+        _maybe_sweep()
+    except Exception as e:
+        logger.warning(f"Could not cache image for query {query}: {e}")
+
+def get_cache_stats() -> Dict[str, int]:
+    """
+    Return hit/miss counters shared by every worker
+    """
+    try:
+        stats = redis_client.hgetall(STATS_KEY)
+    except Exception as e:
+        logger.warning(f"Could not read image cache stats: {e}")
+        stats = {}
+    return {
+        "hits": int(stats.get("hits", 0)),
+        "misses": int(stats.get("misses", 0)),
+    }
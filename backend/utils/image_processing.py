@@ -0,0 +1,63 @@
+import logging
+from io import BytesIO
+from typing import Optional
+
+from PIL import Image, ImageOps
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+def _crop_box(width: int, height: int, aspect: float):
+    """Largest centered box with the target aspect ratio"""
+    if width / height > aspect:
+        crop_width = round(height * aspect)
+        left = (width - crop_width) // 2
+        return (left, 0, left + crop_width, height)
+    crop_height = round(width / aspect)
+    top = (height - crop_height) // 2
+    return (0, top, width, top + crop_height)
+
+def normalize_image(
+    image_stream: BytesIO,
+    width_inches: float,
+    height_inches: float,
+    dpi: Optional[int] = None,
+    quality: Optional[int] = None,
+) -> BytesIO:
+    """
+    Center-crop an image to the aspect ratio of its slide box, downsample it to
+    the pixels the box needs at ``dpi`` and re-encode it as a progressive JPEG
+    without metadata. Returns the original stream if the image can't be decoded.
+    """
+    dpi = dpi or settings.IMAGE_DPI
+    quality = quality or settings.IMAGE_JPEG_QUALITY
+    target_size = (round(width_inches * dpi), round(height_inches * dpi))
+
+    try:
+        with Image.open(image_stream) as source:
+            # Let the JPEG decoder skip resolution we are going to throw away
+            source.draft("RGB", target_size)
+            image = ImageOps.exif_transpose(source)
+
+            if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+                image = image.convert("RGBA")
+                background = Image.new("RGB", image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel("A"))
+                image = background
+            elif image.mode != "RGB":
+                image = image.convert("RGB")
+
+            image = image.crop(_crop_box(image.width, image.height, target_size[0] / target_size[1]))
+            # Never upscale: a small source just keeps its cropped size
+            if image.width > target_size[0]:
+                image = image.resize(target_size, Image.LANCZOS)
+
+            output = BytesIO()
+            image.save(output, "JPEG", quality=quality, optimize=True, progressive=True)
+            output.seek(0)
+            return output
+    except Exception as e:
+        logger.warning(f"Could not normalize image, using original bytes: {e}")
+        image_stream.seek(0)
+        return image_stream
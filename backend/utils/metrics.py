@@ -0,0 +1,130 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+logger = logging.getLogger(__name__)
+
+# With PROMETHEUS_MULTIPROC_DIR set (before this module is imported), every
+# process writes its samples there and the exporters aggregate them. That is
+# required for uvicorn --workers and Celery's prefork pool.
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+REQUEST_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20)
+
+STAGE_SECONDS = Histogram(
+    "presentation_stage_seconds",
+    "Time spent in each stage of building a presentation",
+    ["stage", "slide_count"],
+    buckets=STAGE_BUCKETS,
+)
+STAGE_FAILURES = Counter(
+    "presentation_stage_failures_total",
+    "Stages that raised",
+    ["stage", "slide_count"],
+)
+PROVIDER_REQUEST_SECONDS = Histogram(
+    "image_provider_request_seconds",
+    "Image provider requests that finished before the race was decided",
+    ["provider", "outcome"],
+    buckets=REQUEST_BUCKETS,
+)
+PROVIDER_FALLBACKS = Counter(
+    "image_provider_fallbacks_total",
+    "Requests sent to a provider because the previous one was slow, failed or had its circuit open",
+    ["provider", "reason"],
+)
+IMAGE_FETCH_FAILURES = Counter(
+    "image_fetch_failures_total",
+    "Image queries no provider could answer",
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"],
+)
+SUGGESTION_SECONDS = Histogram(
+    "suggestion_lookup_seconds",
+    "Topic suggestion latency by where the answer came from",
+    ["source"],
+    buckets=REQUEST_BUCKETS,
+)
+
+def slide_count_label(slide_count: Optional[int]) -> str:
+    """Bucket slide counts so the label stays low-cardinality"""
+    if not slide_count:
+        return "unknown"
+    for upper in (5, 10, 15, 20):
+        if slide_count <= upper:
+            return f"<={upper}"
+    return ">20"
+
+def observe_stage(stage: str, slide_count: Optional[int], seconds: float) -> None:
+    STAGE_SECONDS.labels(stage, slide_count_label(slide_count)).observe(seconds)
+
+@contextmanager
+def stage_timer(stage: str, slide_count: Optional[int] = None):
+    """Record how long the block took, and count it as a failure if it raised"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_FAILURES.labels(stage, slide_count_label(slide_count)).inc()
+        raise
+    finally:
+        observe_stage(stage, slide_count, time.perf_counter() - started)
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+def record_provider_request(provider: str, seconds: float, success: bool) -> None:
+    PROVIDER_REQUEST_SECONDS.labels(provider, "success" if success else "failure").observe(seconds)
+
+def record_provider_fallback(provider: str, reason: str) -> None:
+    PROVIDER_FALLBACKS.labels(provider, reason).inc()
+
+def record_image_fetch_failure() -> None:
+    IMAGE_FETCH_FAILURES.inc()
+
+def record_suggestion_lookup(source: str, seconds: float) -> None:
+    SUGGESTION_SECONDS.labels(source).observe(seconds)
+    record_cache_lookup("suggestions", source != "llm")
+
+def _collecting_registry() -> CollectorRegistry:
+    if not MULTIPROCESS:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition-format payload and its content type, for the API's /metrics route"""
+    return generate_latest(_collecting_registry()), CONTENT_TYPE_LATEST
+
+def start_metrics_server(port: int) -> None:
+    """Serve /metrics from a background thread, e.g. in a Celery worker's main process"""
+    if not MULTIPROCESS:
+        logger.warning(
+            "PROMETHEUS_MULTIPROC_DIR is not set; only metrics recorded in this process are exported. "
+            "Set it for prefork workers."
+        )
+    start_http_server(port, registry=_collecting_registry())
+    logger.info(f"Metrics exporter listening on :{port}")
+
+def mark_process_dead(pid: int) -> None:
+    """Drop a finished child's live gauges from the shared metrics directory"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
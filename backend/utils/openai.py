@@ -2,4 +2,7 @@ import openai
 from config import settings
 
 # Fix: Use OpenAI() constructor, not Model()
-openai_client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
\ No newline at end of file
+openai_client = openai.OpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL)
+
+# Non-blocking client for the API tier; Celery workers keep the sync one
+async_openai_client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL)
\ No newline at end of file
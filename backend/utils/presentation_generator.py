@@ -1,5 +1,4 @@
 import os
-import requests
 import tempfile
 from typing import List, Dict, Optional
 from pptx import Presentation
@@ -10,6 +9,7 @@ from pptx.enum.shapes import MSO_SHAPE
 from pptx.oxml.xmlchemy import OxmlElement
 from io import BytesIO
 import logging
+from .http import HTTP_TIMEOUT, get_http_session
 from .storage import upload_to_cloudinary, store_presentation_url
 from .helper import create_presentation_content
 
@@ -26,9 +26,9 @@ def add_gradient_background(slide, start_color, end_color):
 def download_image_from_unsplash(query: str) -> Optional[BytesIO]:
     """Download a relevant image from Unsplash"""
     try:
-        response = requests.get(
+        response = get_http_session().get(
             f"https://source.unsplash.com/featured/?{query}",
-            timeout=10
+            timeout=HTTP_TIMEOUT
         )
         if response.status_code == 200:
             return BytesIO(response.content)
@@ -0,0 +1,214 @@
+import datetime
+import json
+import logging
+import time
+from typing import Dict, List, Optional
+
+from config import settings
+from .helpers import get_user_presentations_key
+from .redis import async_redis_client, redis_client
+
+logger = logging.getLogger(__name__)
+
+# Bump when the field layout changes; older layouts are read through _read_legacy
+SCHEMA_VERSION = "2"
+
+INT_FIELDS = ("slide_count", "revision")
+# queued_at, started_at and finished_at are epoch seconds: admission, the last
+# time a worker picked the deck up, and completion or failure
+FLOAT_FIELDS = ("first_slide_latency", "queued_at", "started_at", "finished_at")
+
+# Pre-v2 layout: one string key per attribute, each with its own TTL
+LEGACY_KEYS = {
+    "status": "presentation:{id}:status",
+    "task_id": "presentation:{id}:task_id",
+    "data": "presentation:{id}:data",
+    "error": "presentation:{id}:error",
+    "download_url": "presentation:{id}",
+}
+
+def get_presentation_key(presentation_id: str) -> str:
+    return f"presentation:v{SCHEMA_VERSION}:{presentation_id}"
+
+def get_presentation_channel(presentation_id: str) -> str:
+    return f"presentation:{presentation_id}:events"
+
+def _decode(raw: Dict[str, str]) -> Dict:
+    record = dict(raw)
+    for field in INT_FIELDS:
+        if field in record:
+            record[field] = int(record[field])
+    for field in FLOAT_FIELDS:
+        if field in record:
+            record[field] = float(record[field])
+    return record
+
+def _queue_write(pipe, presentation_id: str, fields: Dict) -> None:
+    """Queue an update of the record; fields set to None are removed"""
+    key = get_presentation_key(presentation_id)
+    mapping = {name: value for name, value in fields.items() if value is not None}
+    removed = [name for name, value in fields.items() if value is None]
+
+    mapping["v"] = SCHEMA_VERSION
+    pipe.hset(key, mapping=mapping)
+    if removed:
+        pipe.hdel(key, *removed)
+    pipe.expire(key, settings.PRESENTATION_TTL)
+
+def _queue_save(pipe, presentation_id: str, fields: Dict) -> None:
+    _queue_write(pipe, presentation_id, fields)
+    if fields.get("status"):
+        pipe.publish(get_presentation_channel(presentation_id), fields["status"])
+
+def _queue_completed(pipe, presentation_id: str, user_id: str, presentation_data: Dict) -> None:
+    created_at = datetime.datetime.fromisoformat(presentation_data["created_at"])
+    fields = dict(presentation_data, status="completed", user_id=user_id, error=None, finished_at=time.time())
+    _queue_write(pipe, presentation_id, fields)
+
+    # Per-user index, newest first by created_at, so listing never scans the keyspace
+    user_index = get_user_presentations_key(user_id)
+    pipe.zadd(user_index, {presentation_id: created_at.timestamp()})
+    pipe.zremrangebyscore(user_index, "-inf", created_at.timestamp() - settings.PRESENTATION_TTL)
+    pipe.expire(user_index, settings.PRESENTATION_TTL)
+    pipe.publish(get_presentation_channel(presentation_id), "completed")
+
+def _all_keys(presentation_id: str) -> List[str]:
+    keys = [get_presentation_key(presentation_id)]
+    return keys + [template.format(id=presentation_id) for template in LEGACY_KEYS.values()]
+
+def save_presentation(presentation_id: str, **fields) -> None:
+    """
+    Update fields of a presentation in one MULTI/EXEC, notifying status subscribers
+    """
+    pipe = redis_client.pipeline()
+    _queue_save(pipe, presentation_id, fields)
+    pipe.execute()
+
+def set_presentation_status(presentation_id: str, status: str, error: str = None) -> None:
+    """
+    Update a presentation's status and notify clients streaming it
+    """
+    fields = {"status": status, "error": error}
+    if status == "processing":
+        # A retry after a failure is running again
+        fields.update(started_at=time.time(), finished_at=None)
+    elif status == "failed":
+        fields["finished_at"] = time.time()
+    save_presentation(presentation_id, **fields)
+
+def store_completed_presentation(presentation_id: str, user_id: str, presentation_data: Dict) -> None:
+    """
+    Write a completed presentation and add it to the owner's index atomically
+    """
+    pipe = redis_client.pipeline()
+    _queue_completed(pipe, presentation_id, user_id, presentation_data)
+    pipe.execute()
+
+def get_presentation(presentation_id: str) -> Optional[Dict]:
+    """
+    Read a presentation with a single HGETALL, falling back to the legacy layout
+    """
+    raw = redis_client.hgetall(get_presentation_key(presentation_id))
+    if raw:
+        return _decode(raw)
+    return _read_legacy(presentation_id)
+
+def get_presentations(presentation_ids: List[str]) -> List[Optional[Dict]]:
+    """
+    Read many presentations in one pipelined round trip; missing ones come back as None
+    """
+    pipe = redis_client.pipeline(transaction=False)
+    for presentation_id in presentation_ids:
+        pipe.hgetall(get_presentation_key(presentation_id))
+    return [
+        _decode(raw) if raw else _read_legacy(presentation_id)
+        for presentation_id, raw in zip(presentation_ids, pipe.execute())
+    ]
+
+def delete_presentation(presentation_id: str) -> None:
+    redis_client.delete(*_all_keys(presentation_id))
+
+def _legacy_record(values: Dict) -> Optional[Dict]:
+    """Assemble a record from the values of the pre-v2 keys"""
+    if not values["status"]:
+        return None
+
+    record = {}
+    if values["data"]:
+        data = json.loads(values["data"])
+        record.update({
+            name: data.get(name)
+            for name in ("created_at", "topic", "slide_count", "user_id", "cache_key", "first_slide_latency")
+        })
+        record["download_url"] = data.get("filepath")
+    record.update(
+        status=values["status"],
+        task_id=values["task_id"],
+        error=values["error"],
+    )
+    if values["download_url"]:
+        record["download_url"] = values["download_url"]
+    return {name: value for name, value in record.items() if value is not None}
+
+def _read_legacy(presentation_id: str) -> Optional[Dict]:
+    """Read a record from pre-v2 keys and migrate it into the hash"""
+    pipe = redis_client.pipeline(transaction=False)
+    for template in LEGACY_KEYS.values():
+        pipe.get(template.format(id=presentation_id))
+    record = _legacy_record(dict(zip(LEGACY_KEYS, pipe.execute())))
+    if not record:
+        return None
+
+    try:
+        pipe = redis_client.pipeline()
+        _queue_write(pipe, presentation_id, record)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not migrate legacy presentation {presentation_id}: {e}")
+    return record
+
+# Async variants for the API tier; same layout, commands go through the asyncio pool
+
+async def save_presentation_async(presentation_id: str, **fields) -> None:
+    pipe = async_redis_client.pipeline()
+    _queue_save(pipe, presentation_id, fields)
+    await pipe.execute()
+
+async def store_completed_presentation_async(presentation_id: str, user_id: str, presentation_data: Dict) -> None:
+    pipe = async_redis_client.pipeline()
+    _queue_completed(pipe, presentation_id, user_id, presentation_data)
+    await pipe.execute()
+
+async def get_presentation_async(presentation_id: str) -> Optional[Dict]:
+    raw = await async_redis_client.hgetall(get_presentation_key(presentation_id))
+    if raw:
+        return _decode(raw)
+    return await _read_legacy_async(presentation_id)
+
+async def get_presentations_async(presentation_ids: List[str]) -> List[Optional[Dict]]:
+    pipe = async_redis_client.pipeline(transaction=False)
+    for presentation_id in presentation_ids:
+        pipe.hgetall(get_presentation_key(presentation_id))
+    return [
+        _decode(raw) if raw else await _read_legacy_async(presentation_id)
+        for presentation_id, raw in zip(presentation_ids, await pipe.execute())
+    ]
+
+async def delete_presentation_async(presentation_id: str) -> None:
+    await async_redis_client.delete(*_all_keys(presentation_id))
+
+async def _read_legacy_async(presentation_id: str) -> Optional[Dict]:
+    pipe = async_redis_client.pipeline(transaction=False)
+    for template in LEGACY_KEYS.values():
+        pipe.get(template.format(id=presentation_id))
+    record = _legacy_record(dict(zip(LEGACY_KEYS, await pipe.execute())))
+    if not record:
+        return None
+
+    try:
+        pipe = async_redis_client.pipeline()
+        _queue_write(pipe, presentation_id, record)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not migrate legacy presentation {presentation_id}: {e}")
+    return record
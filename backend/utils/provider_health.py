@@ -0,0 +1,99 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class ProviderHealth:
+    """
+    Circuit breaker and latency window for one upstream image provider.
+
+    The breaker opens after ``failure_threshold`` consecutive failures and
+    rejects requests for ``cooldown`` seconds. After that a single trial request
+    is let through; its outcome closes the breaker again or restarts the
+    cool-down. State is kept per worker process.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, cooldown: float, window: int):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self.state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning(f"Circuit for {self.name} opened for {self.cooldown}s")
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def observe_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def hedge_delay(self) -> float:
+        """How long to wait on this provider before hedging to the next one"""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < settings.IMAGE_HEDGE_MIN_SAMPLES:
+            return settings.IMAGE_HEDGE_DELAY
+        index = min(len(samples) - 1, int(len(samples) * settings.IMAGE_HEDGE_PERCENTILE / 100))
+        return samples[index]
+
+_providers: Dict[str, ProviderHealth] = {}
+_providers_lock = threading.Lock()
+
+def get_provider_health(name: str) -> ProviderHealth:
+    with _providers_lock:
+        if name not in _providers:
+            _providers[name] = ProviderHealth(
+                name,
+                failure_threshold=settings.PROVIDER_FAILURE_THRESHOLD,
+                cooldown=settings.PROVIDER_COOLDOWN,
+                window=settings.PROVIDER_LATENCY_WINDOW,
+            )
+        return _providers[name]
+
+def record_provider_status(name: str, status_code: int) -> None:
+    """Treat throttling and server errors as breaker failures; anything else means the provider is up"""
+    health = get_provider_health(name)
+    if status_code == 429 or status_code >= 500:
+        health.record_failure()
+    else:
+        health.record_success()
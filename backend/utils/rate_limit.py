@@ -0,0 +1,171 @@
+import datetime
+import logging
+import math
+from typing import NamedTuple, Optional
+
+from fastapi import HTTPException
+
+from config import settings
+from .redis import async_redis_client, redis_client
+
+logger = logging.getLogger(__name__)
+
+# Token bucket plus an optional daily quota, checked and charged in one round
+# trip so concurrent requests can't both see the last token or quota slot.
+# Time comes from the Redis server, so API processes need not agree on clocks.
+#
+# KEYS[1]  bucket hash (tokens, ts)
+# KEYS[2]  daily counter, optional
+# ARGV     capacity, refill per second, daily limit, daily reset (unix seconds),
+#          presentations to charge
+#
+# Returns {allowed, tokens left, retry after ms, daily count}
+_HIT_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('time')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local bucket = redis.call('hmget', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+if tokens < 1 then
+    return {0, 0, math.ceil((1 - tokens) / rate * 1000), -1}
+end
+
+local used = -1
+if KEYS[2] then
+    local cost = tonumber(ARGV[5])
+    used = tonumber(redis.call('get', KEYS[2]) or '0')
+    if used + cost > tonumber(ARGV[3]) then
+        return {0, math.floor(tokens), math.max(redis.call('pttl', KEYS[2]), 1000), used}
+    end
+    used = redis.call('incrby', KEYS[2], cost)
+    if used == cost then
+        redis.call('expireat', KEYS[2], ARGV[4])
+    end
+end
+
+tokens = tokens - 1
+redis.call('hset', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('pexpire', KEYS[1], math.ceil(capacity / rate * 1000))
+return {1, math.floor(tokens), 0, used}
+"""
+_HIT_SCRIPT_ASYNC = async_redis_client.register_script(_HIT_LUA)
+
+# Give back quota slots without ever going below zero
+_RELEASE_LUA = """
+local used = tonumber(redis.call('get', KEYS[1])) or 0
+if used > 0 then
+    return redis.call('decrby', KEYS[1], math.min(used, tonumber(ARGV[1])))
+end
+return 0
+"""
+_RELEASE_SCRIPT = redis_client.register_script(_RELEASE_LUA)
+_RELEASE_SCRIPT_ASYNC = async_redis_client.register_script(_RELEASE_LUA)
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: int
+    daily_count: Optional[int] = None
+    denied_by_quota: bool = False
+    # ISO date of the UTC day the presentations were charged to; refunds go back to it
+    quota_day: Optional[str] = None
+
+def _bucket_key(scope: str, identity: str) -> str:
+    return f"rate_limit:{scope}:{identity}"
+
+def _today() -> datetime.date:
+    return datetime.datetime.now(datetime.timezone.utc).date()
+
+def daily_quota_key(user_id: str, day: Optional[datetime.date] = None) -> str:
+    """Per-user presentation counter for one UTC day"""
+    return f"user:{user_id}:daily:{(day or _today()).isoformat()}"
+
+def _next_reset(day: datetime.date) -> int:
+    tomorrow = day + datetime.timedelta(days=1)
+    return int(datetime.datetime.combine(tomorrow, datetime.time(), datetime.timezone.utc).timestamp())
+
+async def hit_rate_limit(
+    scope: str,
+    identity: str,
+    per_minute: int,
+    burst: int,
+    daily_user: Optional[str] = None,
+    daily_cost: int = 1
+) -> RateLimitResult:
+    """
+    Take one token from ``identity``'s bucket for ``scope`` and, with
+    ``daily_user``, reserve ``daily_cost`` of their presentations for today
+    """
+    day = _today()
+    keys = [_bucket_key(scope, identity)]
+    if daily_user is not None:
+        keys.append(daily_quota_key(daily_user, day))
+
+    try:
+        allowed, remaining, retry_after_ms, daily_count = await _HIT_SCRIPT_ASYNC(
+            keys=keys,
+            args=[max(burst, 1), per_minute / 60, settings.MAX_PRESENTATIONS_PER_DAY, _next_reset(day), daily_cost]
+        )
+    except Exception as e:
+        # Limiting is a guard, not a dependency; let requests through rather than fail them
+        logger.warning(f"Rate limiter unavailable: {e}")
+        return RateLimitResult(True, burst, 0)
+
+    daily_count = int(daily_count) if int(daily_count) >= 0 else None
+    return RateLimitResult(
+        bool(allowed),
+        int(remaining),
+        math.ceil(int(retry_after_ms) / 1000),
+        daily_count,
+        not allowed and daily_count is not None,
+        day.isoformat() if daily_count is not None else None
+    )
+
+async def enforce_rate_limit(
+    scope: str,
+    identity: str,
+    per_minute: int,
+    burst: int,
+    daily_user: Optional[str] = None,
+    daily_cost: int = 1
+) -> RateLimitResult:
+    """Like hit_rate_limit, but raise a 429 carrying Retry-After when the request is refused"""
+    result = await hit_rate_limit(scope, identity, per_minute, burst, daily_user, daily_cost)
+    if result.allowed:
+        return result
+
+    if result.denied_by_quota:
+        remaining = max(0, settings.MAX_PRESENTATIONS_PER_DAY - result.daily_count)
+        detail = f"Daily limit of {settings.MAX_PRESENTATIONS_PER_DAY} presentations reached ({remaining} left today)"
+    else:
+        detail = "Too many requests"
+    raise HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(max(result.retry_after, 1))})
+
+def _reserved_key(user_id: str, quota_day: Optional[str]) -> str:
+    # Work queued before the day was carried along is refunded to today
+    return daily_quota_key(user_id, datetime.date.fromisoformat(quota_day) if quota_day else None)
+
+def release_daily_quota(user_id: str, count: int = 1, quota_day: Optional[str] = None) -> None:
+    """
+    Return reserved presentations to the user, e.g. when generation failed for
+    good. ``quota_day`` is the RateLimitResult.quota_day they were charged to.
+    """
+    try:
+        _RELEASE_SCRIPT(keys=[_reserved_key(user_id, quota_day)], args=[count])
+    except Exception as e:
+        logger.warning(f"Could not release daily quota for {user_id}: {e}")
+
+async def release_daily_quota_async(user_id: str, count: int = 1, quota_day: Optional[str] = None) -> None:
+    try:
+        await _RELEASE_SCRIPT_ASYNC(keys=[_reserved_key(user_id, quota_day)], args=[count])
+    except Exception as e:
+        logger.warning(f"Could not release daily quota for {user_id}: {e}")
+
+async def get_daily_count_async(user_id: str) -> int:
+    """Presentations the user has been charged for today"""
+    return int(await async_redis_client.get(daily_quota_key(user_id)) or 0)
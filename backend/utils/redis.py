@@ -1,5 +1,23 @@
 import redis
+import redis.asyncio
 from config import settings
 
 # singleton Redis instance
-redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
\ No newline at end of file
+redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+# Raw bytes in and out, for pipeline artifacts (images, .pptx files)
+binary_redis_client = redis.from_url(settings.REDIS_URL, decode_responses=False)
+
+# asyncio client for the API tier. One bounded pool is shared by every request on
+# the process; when it is exhausted callers wait for a free connection instead of erroring
+async_redis_pool = redis.asyncio.BlockingConnectionPool.from_url(
+    settings.REDIS_URL,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    timeout=settings.REDIS_POOL_TIMEOUT,
+    decode_responses=True
+)
+async_redis_client = redis.asyncio.Redis(connection_pool=async_redis_pool)
+
+# Each subscription pins its connection for the life of an event stream, so they
+# get their own pool rather than starving ordinary commands
+async_pubsub_client = redis.asyncio.from_url(settings.REDIS_URL, decode_responses=True)
@@ -0,0 +1,87 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from config import settings
+from .metrics import record_cache_lookup
+from .redis import binary_redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "slide_fragment:"
+
+# A fragment is a rendered slide's shape tree (``p:spTree`` XML) plus the name
+# of the layout it sits on. Media are not part of it: the renderer already
+# holds the image bytes it keys a slide by, and relinks them when splicing.
+Fragment = Tuple[str, bytes]
+
+def _encode(layout_name: str, sp_tree: bytes) -> bytes:
+    return layout_name.encode() + b"\n" + sp_tree
+
+def _decode(data: bytes) -> Fragment:
+    layout_name, sp_tree = data.split(b"\n", 1)
+    return layout_name.decode(), sp_tree
+
+class SlideFragmentLRU:
+    """
+    In-process LRU of encoded fragments, bounded by their total size.
+    Render threads of one worker process share it.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+_local = SlideFragmentLRU(settings.SLIDE_CACHE_MAX_BYTES)
+
+def get_slide_fragment(key: str) -> Optional[Fragment]:
+    """
+    Look a rendered slide up in this process, then in Redis (shared by every
+    render process)
+    """
+    data = _local.get(key)
+    if data is None and settings.SLIDE_CACHE_SHARED:
+        try:
+            data = binary_redis_client.get(f"{KEY_PREFIX}{key}")
+        except Exception as e:
+            logger.warning(f"Slide cache unavailable: {e}")
+        if data is not None:
+            _local.put(key, data)
+
+    record_cache_lookup("slide", data is not None)
+    return _decode(data) if data is not None else None
+
+def store_slide_fragment(key: str, layout_name: str, sp_tree: bytes) -> None:
+    data = _encode(layout_name, sp_tree)
+    _local.put(key, data)
+    if settings.SLIDE_CACHE_SHARED:
+        try:
+            binary_redis_client.setex(f"{KEY_PREFIX}{key}", settings.SLIDE_CACHE_TTL, data)
+        except Exception as e:
+            logger.warning(f"Could not cache slide fragment: {e}")
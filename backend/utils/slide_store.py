@@ -0,0 +1,113 @@
+import hashlib
+import json
+import logging
+from typing import Dict, List, Optional
+
+from config import settings
+from .redis import async_redis_client, binary_redis_client, redis_client
+
+logger = logging.getLogger(__name__)
+
+# What a finished deck was built from, kept so one slide can be redone and the
+# deck reassembled without asking the model or image providers for the rest.
+#
+#   presentation:{id}:slides   JSON {"slides": [...], "images": {query: digest}}
+#   slide_image:{digest}       normalized image bytes, shared by every deck using them
+#
+# Images are addressed by content, so decks served from the deck cache and
+# revisions that keep a picture point at the same blob instead of copying it.
+
+def get_slide_model_key(presentation_id: str) -> str:
+    return f"presentation:{presentation_id}:slides"
+
+def _image_key(digest: str) -> str:
+    return f"slide_image:{digest}"
+
+def _edit_lock_key(presentation_id: str) -> str:
+    return f"presentation:{presentation_id}:edit_lock"
+
+def revision_file_id(presentation_id: str, revision: int) -> str:
+    """
+    Edited decks are uploaded under a new name; the original file may also be
+    the download of requests that were served the same deck from the cache
+    """
+    return f"{presentation_id}-r{revision}"
+
+def store_slide_images(images: Dict[str, bytes]) -> Dict[str, str]:
+    """Store images by content and return their digests by query"""
+    digests = {query: hashlib.sha256(data).hexdigest() for query, data in images.items()}
+    pipe = binary_redis_client.pipeline(transaction=False)
+    for query, digest in digests.items():
+        pipe.setex(_image_key(digest), settings.PRESENTATION_TTL, images[query])
+    pipe.execute()
+    return digests
+
+def _queue_slide_model(pipe, presentation_id: str, model: Dict) -> None:
+    # The images live as long as the newest deck that uses them
+    pipe.setex(get_slide_model_key(presentation_id), settings.PRESENTATION_TTL, json.dumps(model))
+    for digest in set(model["images"].values()):
+        pipe.expire(_image_key(digest), settings.PRESENTATION_TTL)
+
+def save_slide_model(presentation_id: str, slides: List[Dict], image_digests: Dict[str, str]) -> None:
+    """Record a deck's slides and the stored images they use"""
+    pipe = redis_client.pipeline()
+    _queue_slide_model(pipe, presentation_id, {"slides": slides, "images": image_digests})
+    pipe.execute()
+
+def get_slide_model(presentation_id: str) -> Optional[Dict]:
+    data = redis_client.get(get_slide_model_key(presentation_id))
+    return json.loads(data) if data else None
+
+def load_slide_images(image_digests: Dict[str, str]) -> Dict[str, bytes]:
+    """Fetch stored images in one round trip; expired ones are left out"""
+    if not image_digests:
+        return {}
+    queries = list(image_digests)
+    blobs = binary_redis_client.mget([_image_key(image_digests[query]) for query in queries])
+    return {query: blob for query, blob in zip(queries, blobs) if blob}
+
+def copy_slide_model(source_id: str, presentation_id: str) -> None:
+    """Give a deck completed with another request's result that request's slides"""
+    try:
+        model = get_slide_model(source_id)
+        if model:
+            pipe = redis_client.pipeline()
+            _queue_slide_model(pipe, presentation_id, model)
+            pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not copy slides of {source_id} to {presentation_id}: {e}")
+
+def release_edit_lock(presentation_id: str) -> None:
+    redis_client.delete(_edit_lock_key(presentation_id))
+
+# Async variants used by the API tier
+
+async def get_slide_model_async(presentation_id: str) -> Optional[Dict]:
+    data = await async_redis_client.get(get_slide_model_key(presentation_id))
+    return json.loads(data) if data else None
+
+async def copy_slide_model_async(source_id: str, presentation_id: str) -> None:
+    try:
+        model = await get_slide_model_async(source_id)
+        if model:
+            pipe = async_redis_client.pipeline()
+            _queue_slide_model(pipe, presentation_id, model)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not copy slides of {source_id} to {presentation_id}: {e}")
+
+async def delete_slide_model_async(presentation_id: str) -> None:
+    # Images may be shared with other decks; they expire on their own
+    await async_redis_client.delete(get_slide_model_key(presentation_id))
+
+async def acquire_edit_lock_async(presentation_id: str) -> bool:
+    """
+    Allow one slide edit per deck at a time, so concurrent edits can't each
+    start from the same slides and drop one another's change
+    """
+    return bool(await async_redis_client.set(
+        _edit_lock_key(presentation_id), "1", nx=True, ex=settings.SLIDE_EDIT_LOCK_TTL
+    ))
+
+async def release_edit_lock_async(presentation_id: str) -> None:
+    await async_redis_client.delete(_edit_lock_key(presentation_id))
@@ -0,0 +1,316 @@
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from typing import BinaryIO, Dict, Optional, Set, Tuple
+
+from config import settings
+from .cloudinary import delete_from_cloudinary, upload_to_cloudinary
+from .redis import async_redis_client, redis_client
+
+logger = logging.getLogger(__name__)
+
+PPTX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+# Where finished decks are kept. Uploads go to the backend named by
+# STORAGE_BACKEND and return a location, which is what a record's
+# download_url holds:
+#
+#   cloudinary   https://res.cloudinary.com/.../presentations/{file_id}
+#   local        local:presentations/{file_id}.pptx  (relative to LOCAL_STORAGE_DIR)
+#   s3           s3://{bucket}/presentations/{file_id}.pptx
+#
+# Downloads and deletes go by the location's scheme, so decks stored before a
+# switch of backend stay downloadable and are removed from where they are.
+#
+# Requests served from the deck cache or coalesced onto one generation share
+# the leader's file. Each stored file keeps the set of presentations holding
+# it, and is deleted when the last one lets go. Each presentation keeps the set
+# of files it holds, so revisions whose edit failed after upload are found too.
+
+def file_key(file_id: str) -> str:
+    return f"presentations/{file_id}.pptx"
+
+# The public ID is what follows /upload/ in a delivery URL, less the version
+_CLOUDINARY_PUBLIC_ID = re.compile(r"/upload/(?:v\d+/)?(.+)$")
+
+class CloudinaryStorage:
+    name = "cloudinary"
+
+    def upload(self, file: BinaryIO, file_id: str) -> Optional[str]:
+        return upload_to_cloudinary(file, file_id, None)
+
+    def delete(self, location: str) -> bool:
+        match = _CLOUDINARY_PUBLIC_ID.search(location.split("?", 1)[0])
+        if not match:
+            logger.error(f"No Cloudinary public ID in {location}")
+            return False
+        return delete_from_cloudinary(match.group(1))
+
+    def owns(self, location: str) -> bool:
+        return location.startswith(("https://", "http://"))
+
+    def url(self, location: str) -> str:
+        return location
+
+class LocalStorage:
+    """
+    Decks on a filesystem shared by the API and the workers. The API serves
+    them itself, or hands them to nginx when LOCAL_STORAGE_ACCEL_PREFIX is set
+    """
+    name = "local"
+    scheme = "local:"
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def upload(self, file: BinaryIO, file_id: str) -> Optional[str]:
+        key = file_key(file_id)
+        path = self.path(self.scheme + key)
+        part = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write next to the target and rename, so a download never sees half a deck
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix=".part", delete=False) as part:
+                shutil.copyfileobj(file, part, settings.STORAGE_CHUNK_SIZE)
+            os.replace(part.name, path)
+            return self.scheme + key
+        except Exception as e:
+            logger.error(f"Error storing {key} in {self.root}: {e}")
+            if part is not None and os.path.exists(part.name):
+                os.unlink(part.name)
+            return None
+
+    def delete(self, location: str) -> bool:
+        try:
+            os.unlink(self.path(location))
+            return True
+        except FileNotFoundError:
+            return True
+        except Exception as e:
+            logger.error(f"Error deleting {location} from {self.root}: {e}")
+            return False
+
+    def owns(self, location: str) -> bool:
+        return location.startswith(self.scheme)
+
+    def key(self, location: str) -> str:
+        return location[len(self.scheme):]
+
+    def path(self, location: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, self.key(location)))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"{location} is outside {self.root}")
+        return path
+
+class S3Storage:
+    """Decks in an S3 bucket or an S3-compatible store such as MinIO, downloaded through presigned URLs"""
+    name = "s3"
+    scheme = "s3://"
+
+    def __init__(self, bucket: str):
+        self.bucket = bucket
+        self._client = None
+        self._client_pid = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        # boto3 is only needed with this backend. A forked worker builds its own client.
+        if self._client is None or self._client_pid != os.getpid():
+            with self._lock:
+                if self._client is None or self._client_pid != os.getpid():
+                    import boto3
+                    from botocore.config import Config
+
+                    self._client = boto3.client(
+                        "s3",
+                        endpoint_url=settings.S3_ENDPOINT_URL,
+                        region_name=settings.S3_REGION,
+                        config=Config(
+                            connect_timeout=settings.HTTP_CONNECT_TIMEOUT,
+                            read_timeout=settings.HTTP_READ_TIMEOUT,
+                            max_pool_connections=settings.HTTP_POOL_MAXSIZE,
+                            # MinIO and most other stand-ins don't serve bucket subdomains
+                            s3={"addressing_style": "path" if settings.S3_ENDPOINT_URL else "auto"},
+                        ),
+                    )
+                    self._client_pid = os.getpid()
+        return self._client
+
+    def upload(self, file: BinaryIO, file_id: str) -> Optional[str]:
+        from boto3.s3.transfer import TransferConfig
+
+        key = file_key(file_id)
+        try:
+            # Multipart above the threshold, with the parts sent in parallel
+            self._get_client().upload_fileobj(
+                file,
+                self.bucket,
+                key,
+                ExtraArgs={"ContentType": PPTX_MEDIA_TYPE},
+                Config=TransferConfig(
+                    multipart_threshold=settings.STORAGE_CHUNK_SIZE,
+                    multipart_chunksize=settings.STORAGE_CHUNK_SIZE,
+                ),
+            )
+            return f"{self.scheme}{self.bucket}/{key}"
+        except Exception as e:
+            logger.error(f"Error uploading {key} to bucket {self.bucket}: {e}")
+            return None
+
+    def delete(self, location: str) -> bool:
+        bucket, key = self._split(location)
+        try:
+            self._get_client().delete_object(Bucket=bucket, Key=key)
+            return True
+        except Exception as e:
+            logger.error(f"Error deleting {key} from bucket {bucket}: {e}")
+            return False
+
+    def owns(self, location: str) -> bool:
+        return location.startswith(self.scheme)
+
+    def _split(self, location: str) -> Tuple[str, str]:
+        # The bucket is the one the deck went to, which may not be S3_BUCKET today
+        bucket, key = location[len(self.scheme):].split("/", 1)
+        return bucket, key
+
+    def url(self, location: str) -> str:
+        """A presigned GET URL; signing is local, no request is made"""
+        bucket, key = self._split(location)
+        return self._get_client().generate_presigned_url(
+            "get_object",
+            Params={"Bucket": bucket, "Key": key},
+            ExpiresIn=settings.S3_PRESIGN_TTL,
+        )
+
+_backends: Dict[str, object] = {}
+_backends_lock = threading.Lock()
+
+def _get_backend(name: str):
+    with _backends_lock:
+        if name not in _backends:
+            if name == "cloudinary":
+                _backends[name] = CloudinaryStorage()
+            elif name == "local":
+                _backends[name] = LocalStorage(settings.LOCAL_STORAGE_DIR)
+            elif name == "s3":
+                _backends[name] = S3Storage(settings.S3_BUCKET)
+            else:
+                raise ValueError(f"Unknown STORAGE_BACKEND: {name}")
+        return _backends[name]
+
+def get_storage():
+    """The backend new decks are uploaded to"""
+    return _get_backend(settings.STORAGE_BACKEND)
+
+def storage_for(location: str):
+    """The backend a stored deck's location belongs to"""
+    for name in ("local", "s3", "cloudinary"):
+        backend = _get_backend(name)
+        if backend.owns(location):
+            return backend
+    raise ValueError(f"No storage backend for {location}")
+
+def upload_file(file: BinaryIO, file_id: str) -> Optional[str]:
+    """Store a deck under ``file_id`` and return its location, or None if the upload failed"""
+    return get_storage().upload(file, file_id)
+
+def delete_location(location: str) -> bool:
+    """Remove a stored deck from the backend its location belongs to"""
+    try:
+        return storage_for(location).delete(location)
+    except Exception as e:
+        logger.error(f"Error deleting {location}: {e}")
+        return False
+
+# The last holder out deletes the file. A file with no holder set predates
+# tracking (or its set expired), so it may be shared and is kept.
+_RELEASE_FILE_LUA = """
+redis.call('srem', KEYS[2], ARGV[2])
+if redis.call('exists', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('srem', KEYS[1], ARGV[1])
+return redis.call('scard', KEYS[1]) == 0 and 1 or 0
+"""
+_RELEASE_FILE_SCRIPT = redis_client.register_script(_RELEASE_FILE_LUA)
+_RELEASE_FILE_SCRIPT_ASYNC = async_redis_client.register_script(_RELEASE_FILE_LUA)
+
+def _holders_key(location: str) -> str:
+    return f"stored_file:{location}:holders"
+
+def _held_files_key(presentation_id: str) -> str:
+    return f"presentation:{presentation_id}:files"
+
+def _queue_hold(pipe, presentation_id: str, location: str) -> None:
+    pipe.sadd(_holders_key(location), presentation_id)
+    pipe.expire(_holders_key(location), settings.PRESENTATION_TTL)
+    pipe.sadd(_held_files_key(presentation_id), location)
+    pipe.expire(_held_files_key(presentation_id), settings.PRESENTATION_TTL)
+
+def hold_file(presentation_id: str, location: str) -> None:
+    """Record that a presentation serves the file at ``location``"""
+    try:
+        pipe = redis_client.pipeline()
+        _queue_hold(pipe, presentation_id, location)
+        pipe.execute()
+    except Exception as e:
+        # Untracked files are never deleted, so this only leaves one behind
+        logger.warning(f"Could not record {presentation_id} as a holder of {location}: {e}")
+
+def release_file(presentation_id: str, location: str) -> bool:
+    """Drop a presentation's hold on a file and delete it if no other presentation holds it"""
+    try:
+        last = _RELEASE_FILE_SCRIPT(
+            keys=[_holders_key(location), _held_files_key(presentation_id)],
+            args=[presentation_id, location]
+        )
+    except Exception as e:
+        logger.warning(f"Could not release {location} for {presentation_id}: {e}")
+        return False
+    return delete_location(location) if last else False
+
+def release_held_files(presentation_id: str, keep: Optional[str] = None) -> None:
+    """Release every file a presentation holds except ``keep``"""
+    for location in redis_client.smembers(_held_files_key(presentation_id)):
+        if location != keep:
+            release_file(presentation_id, location)
+
+# Async variants used by the API tier; storage clients are blocking, so the
+# caller deletes the file when release_file_async returns True
+
+async def hold_file_async(presentation_id: str, location: str) -> None:
+    try:
+        pipe = async_redis_client.pipeline()
+        _queue_hold(pipe, presentation_id, location)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not record {presentation_id} as a holder of {location}: {e}")
+
+async def release_file_async(presentation_id: str, location: str) -> bool:
+    """Drop a presentation's hold on a file; True when it was the last holder and the file should go"""
+    try:
+        return bool(await _RELEASE_FILE_SCRIPT_ASYNC(
+            keys=[_holders_key(location), _held_files_key(presentation_id)],
+            args=[presentation_id, location]
+        ))
+    except Exception as e:
+        logger.warning(f"Could not release {location} for {presentation_id}: {e}")
+        return False
+
+async def get_held_files_async(presentation_id: str) -> Set[str]:
+    """Every file a presentation holds: its current deck, and revisions an edit uploaded but never finished"""
+    return await async_redis_client.smembers(_held_files_key(presentation_id))
+
+def resolve_download(location: str) -> Tuple[str, str]:
+    """
+    How to hand a stored deck to a client: ``("file", path)`` for local files,
+    ``("url", url)`` for anything fetched over HTTP
+    """
+    backend = storage_for(location)
+    if isinstance(backend, LocalStorage):
+        return "file", backend.path(location)
+    return "url", backend.url(location)
@@ -0,0 +1,228 @@
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import settings
+from .image_cache import normalize_query
+from .metrics import record_suggestion_lookup
+from .redis import async_redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "suggestions:"
+
+# Where a request was answered from, in lookup order
+SOURCES = ("memory", "redis", "prefix", "llm")
+
+def normalize_prefix(text: str) -> str:
+    """Lowercase and collapse punctuation/whitespace, keeping word order so prefixes still line up"""
+    return " ".join(re.findall(r"[a-z0-9]+", (text or "").lower()))
+
+def suggestion_context(industry: Optional[str], audience: Optional[str]) -> str:
+    return f"{normalize_query(industry)}|{normalize_query(audience)}"
+
+def suggestion_cache_key(topic: str, industry: Optional[str] = None, audience: Optional[str] = None) -> str:
+    content = f"{normalize_query(topic)}|{suggestion_context(industry, audience)}"
+    return hashlib.sha256(content.encode()).hexdigest()
+
+class _TrieNode:
+    __slots__ = ("children", "key")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.key: Optional[str] = None
+
+class SuggestionIndex:
+    """
+    In-process LRU of suggestion lists with a TTL, plus a character trie per
+    (industry, audience) context over the topics they were generated for, so a
+    partially typed topic can be answered without leaving the process.
+    Not thread-safe; it is only touched from the API event loop.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, prefix_min_chars: int, prefix_scan: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.prefix_min_chars = prefix_min_chars
+        self.prefix_scan = prefix_scan
+        # key -> (expires_at, context, topic, suggestions)
+        self._entries: "OrderedDict[str, Tuple[float, str, str, List[str]]]" = OrderedDict()
+        self._tries: Dict[str, _TrieNode] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[List[str]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[3]
+
+    def put(self, key: str, context: str, topic: str, suggestions: List[str]) -> None:
+        if key in self._entries:
+            self._remove(key)
+        topic = normalize_prefix(topic)
+        self._entries[key] = (time.monotonic() + self.ttl, context, topic, suggestions)
+        self._insert(context, topic, key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def complete(self, context: str, prefix: str) -> Optional[List[str]]:
+        """Suggestions for the shortest known topic starting with ``prefix``"""
+        prefix = normalize_prefix(prefix)
+        if len(prefix) < self.prefix_min_chars:
+            return None
+        node = self._tries.get(context)
+        for char in prefix:
+            node = node.children.get(char) if node else None
+        if node is None:
+            return None
+
+        # Breadth-first so the closest completion wins; bounded so a short
+        # prefix over a large index stays cheap
+        queue = deque([node])
+        visited = 0
+        while queue and visited < self.prefix_scan:
+            current = queue.popleft()
+            visited += 1
+            if current.key is not None:
+                suggestions = self.get(current.key)
+                if suggestions is not None:
+                    return suggestions
+            queue.extend(current.children.values())
+        return None
+
+    def _insert(self, context: str, topic: str, key: str) -> None:
+        node = self._tries.setdefault(context, _TrieNode())
+        for char in topic:
+            node = node.children.setdefault(char, _TrieNode())
+        node.key = key
+
+    def _remove(self, key: str) -> None:
+        _, context, topic, _ = self._entries.pop(key)
+        root = self._tries.get(context)
+        if root is None:
+            return
+        path = [root]
+        for char in topic:
+            child = path[-1].children.get(char)
+            if child is None:
+                return
+            path.append(child)
+        if path[-1].key == key:
+            path[-1].key = None
+        # Prune the branch back up to the first node still in use
+        for depth in range(len(topic), 0, -1):
+            node = path[depth]
+            if node.key is not None or node.children:
+                break
+            del path[depth - 1].children[topic[depth - 1]]
+        if not root.children and root.key is None:
+            del self._tries[context]
+
+_index = SuggestionIndex(
+    max_entries=settings.SUGGESTION_CACHE_SIZE,
+    ttl=settings.SUGGESTION_CACHE_TTL,
+    prefix_min_chars=settings.SUGGESTION_PREFIX_MIN_CHARS,
+    prefix_scan=settings.SUGGESTION_PREFIX_SCAN,
+)
+
+_counts: Dict[str, int] = {source: 0 for source in SOURCES}
+_latencies: Dict[str, deque] = {source: deque(maxlen=settings.SUGGESTION_LATENCY_WINDOW) for source in SOURCES}
+
+def _record(source: str, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    _counts[source] += 1
+    _latencies[source].append(elapsed)
+    record_suggestion_lookup(source, elapsed)
+
+async def _read_shared(key: str) -> Optional[List[str]]:
+    try:
+        data = await async_redis_client.get(f"{KEY_PREFIX}{key}")
+        return json.loads(data) if data else None
+    except Exception as e:
+        logger.warning(f"Suggestion cache unavailable: {e}")
+        return None
+
+async def _write_shared(key: str, suggestions: List[str]) -> None:
+    try:
+        await async_redis_client.setex(f"{KEY_PREFIX}{key}", settings.SUGGESTION_CACHE_TTL, json.dumps(suggestions))
+    except Exception as e:
+        logger.warning(f"Could not cache suggestions: {e}")
+
+async def get_or_generate_suggestions(
+    topic: str,
+    industry: Optional[str],
+    audience: Optional[str],
+    generate: Callable[[], Awaitable[List[str]]],
+    partial: bool = True,
+) -> List[str]:
+    """
+    Answer from the local LRU, then Redis (shared by every API process), then
+    a local prefix match, and only call ``generate`` when all of them miss.
+    Exact answers come first so a longer topic's suggestions never shadow the
+    topic's own; ``partial=False`` marks a finished topic and skips prefix
+    matching altogether.
+    """
+    started = time.perf_counter()
+    key = suggestion_cache_key(topic, industry, audience)
+    context = suggestion_context(industry, audience)
+
+    suggestions = _index.get(key)
+    if suggestions is not None:
+        _record("memory", started)
+        return suggestions
+
+    suggestions = await _read_shared(key)
+    if suggestions is not None:
+        _index.put(key, context, topic, suggestions)
+        _record("redis", started)
+        return suggestions
+
+    if partial:
+        suggestions = _index.complete(context, topic)
+        if suggestions is not None:
+            _record("prefix", started)
+            return suggestions
+
+    suggestions = await generate()
+    if suggestions:
+        _index.put(key, context, topic, suggestions)
+        await _write_shared(key, suggestions)
+    _record("llm", started)
+    return suggestions
+
+def _percentile_ms(samples, pct: int) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+    return round(ordered[index] * 1000, 3)
+
+def get_suggestion_stats() -> Dict:
+    """Hit rate and latency of this process's suggestion lookups"""
+    total = sum(_counts.values())
+    hits = total - _counts["llm"]
+    return {
+        "requests": total,
+        "hits": hits,
+        "misses": _counts["llm"],
+        "hit_rate": round(hits / total, 4) if total else None,
+        "entries": len(_index),
+        "sources": {
+            source: {
+                "count": _counts[source],
+                "p50_ms": _percentile_ms(_latencies[source], 50),
+                "p95_ms": _percentile_ms(_latencies[source], 95),
+            }
+            for source in SOURCES
+        },
+    }
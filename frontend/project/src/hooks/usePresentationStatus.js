@@ -1,9 +1,40 @@
-import { useQuery } from '@tanstack/react-query'
+import { useEffect, useRef, useState } from 'react'
+import { useQuery, useQueryClient } from '@tanstack/react-query'
 
 const API_BASE_URL = 'http://localhost:8000'
 
+const isFinished = (data) => data?.status === 'completed' || data?.status === 'failed'
+
 export const usePresentationStatus = (presentationId, { onComplete, onError } = {}) => {
-  return useQuery({
+  const queryClient = useQueryClient()
+  // Prefer pushed updates; fall back to polling if the event stream can't be used
+  const [streaming, setStreaming] = useState(typeof EventSource !== 'undefined')
+  const notifiedFor = useRef(null)
+
+  useEffect(() => {
+    if (!presentationId || !streaming) {
+      return undefined
+    }
+
+    const source = new EventSource(`${API_BASE_URL}/api/v1/status/${presentationId}/events`)
+
+    source.addEventListener('status', (event) => {
+      const data = JSON.parse(event.data)
+      queryClient.setQueryData(['presentation-status', presentationId], data)
+      if (isFinished(data)) {
+        source.close()
+      }
+    })
+
+    source.onerror = () => {
+      source.close()
+      setStreaming(false)
+    }
+
+    return () => source.close()
+  }, [presentationId, streaming, queryClient])
+
+  const query = useQuery({
     queryKey: ['presentation-status', presentationId],
     queryFn: async () => {
       const response = await fetch(`${API_BASE_URL}/api/v1/status/${presentationId}`)
@@ -16,15 +47,9 @@ export const usePresentationStatus = (presentationId, { onComplete, onError } =
       return data
     },
     enabled: !!presentationId,
-    refetchInterval: (data) => {
-      // Stop polling if completed or failed
-      if (data?.status === 'completed' || data?.status === 'failed') {
-        if (data.status === 'completed' && onComplete) {
-          onComplete(data)
-        }
-        if (data.status === 'failed' && onError) {
-          onError(new Error(data.error || 'Generation failed'))
-        }
+    refetchInterval: (query) => {
+      // No polling while the event stream is delivering updates, or once finished
+      if (streaming || isFinished(query.state.data)) {
         return false
       }
       // Poll every 2 seconds while processing
@@ -38,4 +63,21 @@ export const usePresentationStatus = (presentationId, { onComplete, onError } =
       return failureCount < 3
     },
   })
-}
\ No newline at end of file
+
+  useEffect(() => {
+    const data = query.data
+    if (!isFinished(data) || notifiedFor.current === presentationId) {
+      return
+    }
+    notifiedFor.current = presentationId
+
+    if (data.status === 'completed' && onComplete) {
+      onComplete(data)
+    }
+    if (data.status === 'failed' && onError) {
+      onError(new Error(data.error || 'Generation failed'))
+    }
+  }, [query.data, presentationId, onComplete, onError])
+
+  return query
+}